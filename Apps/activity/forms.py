@@ -5,16 +5,18 @@ class ActivityForm(forms.ModelForm):
     class Meta:
         model = Activity
         fields = '__all__'
-        exclude = ['id', 'event', 'hacker_participants', 'mentor_participants', 'sponsor_participants', 'volunteer_participants', 'admin_participants']
+        exclude = ['id', 'event']
         labels = {
             'name': 'Activity name',
             'type': 'Activity Type',
             'description': 'Activity Description',
             'start_date': 'Start Date',
             'end_date': 'End Date',
+            'capacity': 'Capacity',
         }
         help_texts = {
             'name': 'Activity creation',
+            'capacity': 'Leave it empty for no limit',
         }
         widgets = {
             'start_date': forms.DateTimeInput(attrs={'type': 'datetime-local','class': 'form-input'}),
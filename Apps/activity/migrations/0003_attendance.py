@@ -0,0 +1,103 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+PARTICIPANT_FIELDS = {
+    "HACKER": "hacker_participants",
+    "MENTOR": "mentor_participants",
+    "SPONSOR": "sponsor_participants",
+    "VOLUNTEER": "volunteer_participants",
+    "ADMIN": "admin_participants",
+}
+
+
+def copy_participants_to_attendance(apps, schema_editor):
+    """
+    Copies the rows of the five participant many-to-many tables into the
+    attendance table, with one INSERT ... SELECT per table.
+    """
+    Activity = apps.get_model("activity", "Activity")
+    Attendance = apps.get_model("activity", "Attendance")
+    quote_name = schema_editor.quote_name
+
+    for participant_type, field_name in PARTICIPANT_FIELDS.items():
+        field = Activity._meta.get_field(field_name)
+        through = field.remote_field.through._meta
+        schema_editor.execute(
+            f"INSERT INTO {quote_name(Attendance._meta.db_table)} "
+            "(activity_id, participant_type, participant_id, checked_in_at) "
+            f"SELECT {quote_name(field.m2m_column_name())}, %s, "
+            f"{quote_name(field.m2m_reverse_name())}, CURRENT_TIMESTAMP "
+            f"FROM {quote_name(through.db_table)} "
+            "ON CONFLICT DO NOTHING",
+            [participant_type],
+        )
+
+
+def copy_attendance_to_participants(apps, schema_editor):
+    Activity = apps.get_model("activity", "Activity")
+    Attendance = apps.get_model("activity", "Attendance")
+    quote_name = schema_editor.quote_name
+
+    for participant_type, field_name in PARTICIPANT_FIELDS.items():
+        field = Activity._meta.get_field(field_name)
+        through = field.remote_field.through._meta
+        schema_editor.execute(
+            f"INSERT INTO {quote_name(through.db_table)} "
+            f"({quote_name(field.m2m_column_name())}, "
+            f"{quote_name(field.m2m_reverse_name())}) "
+            "SELECT activity_id, participant_id "
+            f"FROM {quote_name(Attendance._meta.db_table)} "
+            "WHERE participant_type = %s",
+            [participant_type],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0002_rename_admin_particpants_activity_admin_participants_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Attendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_type', models.CharField(choices=[('HACKER', 'Hacker'), ('MENTOR', 'Mentor'), ('VOLUNTEER', 'Volunteer'), ('SPONSOR', 'Sponsor'), ('ADMIN', 'Admin')], max_length=20)),
+                ('participant_id', models.UUIDField()),
+                ('checked_in_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendances', to='activity.activity')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('activity', 'participant_type', 'participant_id'), name='attendance_unique_checkin'),
+        ),
+        migrations.RunPython(
+            copy_participants_to_attendance, copy_attendance_to_participants
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='admin_participants',
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='hacker_participants',
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='mentor_participants',
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='sponsor_participants',
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='volunteer_participants',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0003_attendance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['event', 'start_date', 'end_date'], name='activity_schedule_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_seats_taken(apps, schema_editor):
+    """
+    Sets the seats taken of every activity to its current attendance.
+    """
+    Activity = apps.get_model("activity", "Activity")
+    Attendance = apps.get_model("activity", "Attendance")
+    Activity.objects.update(
+        seats_taken=Coalesce(
+            Subquery(
+                Attendance.objects.filter(activity=OuterRef("pk"))
+                .values("activity")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0004_activity_schedule_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_seats_taken, migrations.RunPython.noop),
+    ]
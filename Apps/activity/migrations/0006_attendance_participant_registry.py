@@ -0,0 +1,60 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def delete_orphan_attendances(apps, schema_editor):
+    """
+    Deletes the check-ins of participants that no longer exist and sets the seats
+    taken of every activity to its remaining attendance.
+    """
+    Activity = apps.get_model("activity", "Activity")
+    Attendance = apps.get_model("activity", "Attendance")
+    ParticipantRegistry = apps.get_model("participant", "ParticipantRegistry")
+    Attendance.objects.exclude(
+        participant_id__in=ParticipantRegistry.objects.values("id")
+    ).delete()
+    Activity.objects.update(
+        seats_taken=Coalesce(
+            Subquery(
+                Attendance.objects.filter(activity=OuterRef("pk"))
+                .values("activity")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participant', '0006_participant_page_indexes'),
+        ('activity', '0005_activity_capacity'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphan_attendances, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='attendance',
+            name='attendance_unique_checkin',
+        ),
+        migrations.RenameField(
+            model_name='attendance',
+            old_name='participant_id',
+            new_name='participant',
+        ),
+        migrations.AlterField(
+            model_name='attendance',
+            name='participant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendances', to='participant.participantregistry'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('activity', 'participant_type', 'participant'), name='attendance_unique_checkin'),
+        ),
+    ]
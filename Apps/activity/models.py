@@ -1,7 +1,9 @@
 import uuid
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils.timezone import now
 from Apps.activity.Enums.activityEnum import ActivityEnum
+from Apps.participant.Enums.participantTypeEnum import ParticipantTypeEnum
 
 # Create your models here.
 class Activity(models.Model):
@@ -19,26 +21,16 @@ class Activity(models.Model):
     event = models.ForeignKey(
         "event.Event", on_delete=models.CASCADE, blank=False, null=False
     )
-    hacker_participants = models.ManyToManyField(
-        "participant.Hacker",
-        related_name="activities",
-    )
-    mentor_participants = models.ManyToManyField(
-        "participant.Mentor",
-        related_name="activities",
-    )
-    sponsor_participants = models.ManyToManyField(
-        "participant.Sponsor",
-        related_name="activities",
-    )
-    volunteer_participants = models.ManyToManyField(
-        "participant.Volunteer",
-        related_name="activities",
-    )
-    admin_participants = models.ManyToManyField(
-        "participant.Admin",
-        related_name="activities",
-    )
+    capacity = models.PositiveIntegerField(blank=True, null=True)
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["event", "start_date", "end_date"],
+                name="activity_schedule_idx",
+            ),
+        ]
 
     def clean(self):
         """
@@ -47,8 +39,37 @@ class Activity(models.Model):
         super().clean()
         errors = {}
 
-        if self.start_date > self.end_date:
+        if self.start_date and self.end_date and self.start_date > self.end_date:
             errors['start_date'] = "Start date must be before end date."
         
         if errors:
-            raise ValidationError(errors)
\ No newline at end of file
+            raise ValidationError(errors)
+
+
+class Attendance(models.Model):
+    """
+    Model representing the check-in of a participant to an activity. The
+    participant is identified by its type and its entry in the participant
+    registry, whose id is also the id of the participant, so deleting the
+    participant deletes its check-ins.
+    """
+    activity = models.ForeignKey(
+        Activity, on_delete=models.CASCADE, related_name="attendances"
+    )
+    participant_type = models.CharField(
+        max_length=20, choices=ParticipantTypeEnum.choices(), blank=False, null=False
+    )
+    participant = models.ForeignKey(
+        "participant.ParticipantRegistry",
+        on_delete=models.CASCADE,
+        related_name="attendances",
+    )
+    checked_in_at = models.DateTimeField(default=now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["activity", "participant_type", "participant"],
+                name="attendance_unique_checkin",
+            ),
+        ]
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+
+from Apps.activity.services import ActivityService
+from Apps.event.services import EventService
+
+OCCUPANCY_POLL_INTERVAL = 1
+
+OCCUPANCY_REFRESH_INTERVAL = 60
+
+OCCUPANCY_HEARTBEAT_INTERVAL = 15
+
+
+class OccupancyBroadcaster:
+    """
+    This class shares one occupancy feed per event between every dashboard
+    connected to the process. A single task per event watches the check-in version
+    stamp of the event, reads the counters once when it changes and hands the
+    snapshot to every subscriber, so the cost does not grow with the dashboards.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.snapshots = {}
+        self.tasks = {}
+
+    def subscribe(self, event_id):
+        """
+        This method returns a queue that receives the occupancy snapshots of an
+        event, starting with the last one, and starts watching the event if needed.
+        """
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers.setdefault(event_id, set()).add(queue)
+
+        if event_id in self.snapshots:
+            queue.put_nowait(self.snapshots[event_id])
+
+        task = self.tasks.get(event_id)
+
+        if (
+            task is None
+            or task.done()
+            or task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self.tasks[event_id] = asyncio.ensure_future(self.watch(event_id))
+
+        return queue
+
+    def unsubscribe(self, event_id, queue):
+        """
+        This method removes a queue, and stops watching the event when it was the
+        last one.
+        """
+        subscribers = self.subscribers.get(event_id, set())
+        subscribers.discard(queue)
+
+        if not subscribers:
+            self.subscribers.pop(event_id, None)
+            self.snapshots.pop(event_id, None)
+            task = self.tasks.pop(event_id, None)
+
+            if task is not None:
+                task.cancel()
+
+    def publish(self, event_id, snapshot):
+        """
+        This method hands a snapshot to every subscriber of an event. A subscriber
+        that has not read the previous one only keeps the newest.
+        """
+        self.snapshots[event_id] = snapshot
+
+        for queue in self.subscribers.get(event_id, ()):
+            if queue.full():
+                queue.get_nowait()
+
+            queue.put_nowait(snapshot)
+
+    async def watch(self, event_id):
+        """
+        This method publishes the occupancy of an event whenever its check-in
+        version stamp changes. The counters are recounted from the database every
+        OCCUPANCY_REFRESH_INTERVAL seconds, to correct any drift of the cache.
+        """
+        version = None
+        refreshed = None
+
+        while True:
+            current = await sync_to_async(EventService.get_check_in_version)(event_id)
+            refresh = (
+                refreshed is None
+                or time.monotonic() - refreshed >= OCCUPANCY_REFRESH_INTERVAL
+            )
+
+            if current != version or refresh:
+                snapshot = await sync_to_async(ActivityService.get_occupancy)(
+                    event_id, refresh=refresh
+                )
+                version = current
+
+                if refresh:
+                    refreshed = time.monotonic()
+
+                if snapshot != self.snapshots.get(event_id):
+                    self.publish(event_id, snapshot)
+
+            await asyncio.sleep(OCCUPANCY_POLL_INTERVAL)
+
+    async def stream(self, event_id):
+        """
+        This method yields the occupancy of an event as Server-Sent Events, with a
+        comment every OCCUPANCY_HEARTBEAT_INTERVAL seconds to keep the connection
+        open.
+        """
+        queue = self.subscribe(event_id)
+
+        try:
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(
+                        queue.get(), OCCUPANCY_HEARTBEAT_INTERVAL
+                    )
+
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield f"event: occupancy\ndata: {json.dumps(snapshot)}\n\n"
+
+        finally:
+            self.unsubscribe(event_id, queue)
+
+
+broadcaster = OccupancyBroadcaster()
@@ -1,8 +1,83 @@
+import csv
+import hashlib
+import re
+import time
 import uuid
-from django.db.models import Q
-from Apps.activity import models
-from Apps.activity.models import Activity
-from Apps.participant.models import Hacker, Mentor, Sponsor, Volunteer, Admin
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils.timezone import now
+from Apps.activity.Enums.activityEnum import ActivityEnum
+from Apps.activity.forms import ActivityForm
+from Apps.activity.models import Activity, Attendance
+from Apps.event.models import Event
+from Apps.event.services import EventService
+from Apps.participant.models import PARTICIPANT_MODELS, ParticipantRegistry
+from Apps.participant.services import (
+    ATTENDED_STATUSES,
+    CONFIRMED_STATUSES,
+    OCCUPANCY_CACHE_TIMEOUT,
+    ParticipantService,
+)
+from Apps.users.Enums.dietaryEnum import DietaryEnum
+
+PARTICIPANT_TYPES = {model: type for type, model in PARTICIPANT_MODELS.items()}
+
+MEAL_REPORT_CACHE_TIMEOUT = 5 * 60
+
+DIETARY_LABELS = {dietary.name: dietary.value for dietary in DietaryEnum}
+
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+CALENDAR_DATE_FORMAT = "%Y%m%dT%H%M%SZ"
+
+CALENDAR_LINE_LENGTH = 75
+
+CALENDAR_FIELDS = {
+    "SUMMARY": "name",
+    "DESCRIPTION": "description",
+    "CATEGORIES": "type",
+    "DTSTART": "start_date",
+    "DTEND": "end_date",
+}
+
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_FORMATS = ("csv", "ics")
+
+ACTIVITY_TYPE_NAMES = {
+    label.lower(): activity_type.name
+    for activity_type in ActivityEnum
+    for label in (activity_type.name, activity_type.value)
+}
+
+
+def diet_of(user_field):
+    """
+    Returns the diet of the user a participant points to: the free text of
+    dietary_other when it is filled in, otherwise dietary.
+    """
+    return Coalesce(
+        NullIf(f"{user_field}__dietary_other", Value("")),
+        f"{user_field}__dietary",
+        Value("UNKNOWN"),
+    )
+
+
+ATTENDANCE_COUNTS = {
+    "attendance_count": Count("attendances"),
+    **{
+        f"{type.lower()}_count": Count(
+            "attendances", filter=Q(attendances__participant_type=type)
+        )
+        for type in PARTICIPANT_MODELS
+    },
+}
 
 
 class ActivityService:
@@ -14,6 +89,24 @@ class ActivityService:
     def get_activity(activity_id):
         return Activity.objects.filter(id=activity_id).first()
 
+    @staticmethod
+    def get_activity_with_counts(activity_id):
+        """
+        Retrieve an activity together with its attendance counts, in one query.
+        """
+        return ActivityService.annotate_attendance_counts(
+            Activity.objects.filter(id=activity_id)
+        ).first()
+
+    @staticmethod
+    def annotate_attendance_counts(activities):
+        """
+        Annotate activities with their total attendance count and one count per
+        participant type, such as hacker_count, so a whole schedule is counted in
+        the same query that lists it.
+        """
+        return activities.annotate(**ATTENDANCE_COUNTS)
+
     @staticmethod
     def get_all_activities(event):
         """
@@ -47,9 +140,25 @@ class ActivityService:
         if activities is None:
             return None
 
-        return [
-            a for a in activities if a.type.upper() == activity_type.upper()
-        ]
+        return activities.filter(type=activity_type.upper())
+
+    @staticmethod
+    def get_current_activity(event, activity_type, at=None):
+        """
+        Retrieve the activity of a type that is running at a given time, by default
+        now. If several overlap, the one that started last is returned.
+        """
+        at = at or now()
+        return (
+            Activity.objects.filter(
+                event=event,
+                type=activity_type.upper(),
+                start_date__lte=at,
+                end_date__gte=at,
+            )
+            .order_by("-start_date", "id")
+            .first()
+        )
 
     @staticmethod
     def create_activity(form, event):
@@ -59,17 +168,43 @@ class ActivityService:
         activity = form.save(commit=False)
         activity.event = event
         activity.save()
+        ActivityService.touch_schedule(event.id)
         return activity
 
     @staticmethod
     def update_activity(activity, updated_data):
         """
-        Update an existing activity with the provided form data.
+        Update an existing activity with the provided form data. Only the edited
+        fields are saved, and the activity is locked like an admission, so the seats
+        taken by concurrent scans are neither overwritten nor left over a lowered
+        capacity. It raises ValidationError if the capacity is below the seats
+        already taken.
         """
-        for key, value in updated_data.items():
-            setattr(activity, key, value)
+        with transaction.atomic():
+            seats_taken = (
+                Activity.objects.select_for_update()
+                .values_list("seats_taken", flat=True)
+                .get(id=activity.id)
+            )
+            capacity = updated_data.get("capacity", activity.capacity)
 
-        activity.save()
+            if capacity is not None and capacity < seats_taken:
+                raise ValidationError(
+                    {
+                        "capacity": (
+                            f"Capacity can not be lower than the {seats_taken} "
+                            "seats already taken."
+                        )
+                    }
+                )
+
+            for key, value in updated_data.items():
+                setattr(activity, key, value)
+
+            activity.seats_taken = seats_taken
+            activity.save(update_fields=[*updated_data])
+
+        ActivityService.touch_schedule(activity.event_id)
         return activity
 
     @staticmethod
@@ -79,62 +214,570 @@ class ActivityService:
         """
         if activity:
             activity.delete()
+            ActivityService.touch_schedule(activity.event_id)
             return True
         return False
 
     @staticmethod
     def checkin_participant(activity, participant):
         """
-        Check in a participant to an activity.
-        """
-        added = False
-        if (
-            isinstance(participant, Hacker)
-            and not activity.hacker_participants.filter(id=participant.id).exists()
-        ):
-            activity.hacker_participants.add(participant)
-            added = True
-
-        elif (
-            isinstance(participant, Mentor)
-            and not activity.mentor_participants.filter(id=participant.id).exists()
-        ):
-            activity.mentor_participants.add(participant)
-            added = True
-
-        elif (
-            isinstance(participant, Sponsor)
-            and not activity.sponsor_participants.filter(id=participant.id).exists()
-        ):
-            activity.sponsor_participants.add(participant)
-            added = True
-
-        elif (
-            isinstance(participant, Volunteer)
-            and not activity.volunteer_participants.filter(id=participant.id).exists()
-        ):
-            activity.volunteer_participants.add(participant)
-            added = True
-
-        elif (
-            isinstance(participant, Admin)
-            and not activity.admin_participants.filter(id=participant.id).exists()
-        ):
-            activity.admin_participants.add(participant)
-            added = True
+        Check in a participant to an activity. It returns whether this scan was
+        new and the participant got a seat.
+        """
+        return ActivityService.admit_participant(activity, participant) == "checked_in"
 
-        activity.save()
-        return added
+    @staticmethod
+    def admit_participant(activity, participant):
+        """
+        Admit a participant to an activity with a single statement: it locks the
+        activity, inserts the check-in only while a seat is left and takes the seat,
+        so concurrent scanners can not go over capacity and no scan counts the
+        check-ins. A repeated scan does nothing. It returns "checked_in",
+        "already_checked_in" or "full".
+        """
+        activity_table = connection.ops.quote_name(Activity._meta.db_table)
+        attendance_table = connection.ops.quote_name(Attendance._meta.db_table)
+        participant_type = PARTICIPANT_TYPES[type(participant)]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH admitted AS ("
+                f"INSERT INTO {attendance_table} "
+                "(activity_id, participant_type, participant_id, checked_in_at) "
+                f"SELECT id, %s, %s, %s FROM {activity_table} "
+                "WHERE id = %s AND (capacity IS NULL OR seats_taken < capacity) "
+                "FOR UPDATE "
+                "ON CONFLICT DO NOTHING RETURNING activity_id"
+                f") UPDATE {activity_table} SET seats_taken = seats_taken + 1 "
+                "WHERE id IN (SELECT activity_id FROM admitted) RETURNING id",
+                [participant_type, participant.id, now(), activity.id],
+            )
+            admitted = cursor.fetchone() is not None
+
+        if admitted:
+            ActivityService.count_check_in(activity)
+            return "checked_in"
+
+        if Attendance.objects.filter(
+            activity_id=activity.id,
+            participant_type=participant_type,
+            participant_id=participant.id,
+        ).exists():
+            return "already_checked_in"
+
+        return "full"
+
+    @staticmethod
+    def count_check_in(activity):
+        """
+        Add a check-in to the occupancy counter of an activity and give the
+        check-ins of its event a new version stamp, once the check-in commits, so a
+        rolled back one is not counted. A missing counter is left alone,
+        get_occupancy creates it from the database.
+        """
+
+        def count():
+            try:
+                cache.incr(f"activity-occupancy:{activity.id}")
+
+            except ValueError:
+                pass
+
+            EventService.touch_check_ins(activity.event_id)
+
+        transaction.on_commit(count)
+
+    @staticmethod
+    def release_participant(participant):
+        """
+        Give back the seats a participant took in activities, before it and its
+        check-ins are deleted, and drop the cached counts that include it once the
+        deletion commits.
+        """
+        activity_ids = list(
+            Activity.objects.filter(
+                attendances__participant_id=participant.id
+            ).values_list("id", flat=True)
+        )
+
+        if activity_ids:
+            Activity.objects.filter(id__in=activity_ids).update(
+                seats_taken=F("seats_taken") - 1
+            )
+
+        def invalidate():
+            cache.delete_many(
+                [f"activity-occupancy:{id}" for id in activity_ids]
+                + [f"event-door:{participant.event_id}"]
+            )
+            EventService.touch_check_ins(participant.event_id)
+
+        transaction.on_commit(invalidate)
+
+    @staticmethod
+    def get_occupancy(event_id, refresh=False):
+        """
+        Get the live occupancy of an event: the door check-ins and the check-ins of
+        every activity. It is read from counters in the cache that check-ins keep
+        up to date, and only counted in the database, with one annotated query,
+        when a counter is missing or refresh is set.
+        """
+        activities = None if refresh else cache.get(f"event-occupancy:{event_id}")
+        counts = {}
+
+        if activities is not None:
+            counts = cache.get_many(
+                [f"activity-occupancy:{id}" for id, name in activities]
+            )
+
+        if activities is None or len(counts) < len(activities):
+            rows = ActivityService.annotate_attendance_counts(
+                Activity.objects.filter(event_id=event_id).order_by("start_date", "id")
+            ).values_list("id", "name", "attendance_count")
+            activities = [(str(id), name) for id, name, count in rows]
+            counts = {f"activity-occupancy:{id}": count for id, name, count in rows}
+            cache.set_many(
+                {f"event-occupancy:{event_id}": activities, **counts},
+                OCCUPANCY_CACHE_TIMEOUT,
+            )
+
+        return {
+            "door": ParticipantService.get_door_count(event_id, refresh=refresh),
+            "activities": [
+                {"id": id, "name": name, "count": counts[f"activity-occupancy:{id}"]}
+                for id, name in activities
+            ],
+        }
+
+    @staticmethod
+    def is_checked_in(activity, participant):
+        """
+        Check whether a participant is checked in to an activity.
+        """
+        return Attendance.objects.filter(
+            activity=activity,
+            participant_type=PARTICIPANT_TYPES[type(participant)],
+            participant_id=participant.id,
+        ).exists()
 
     @staticmethod
     def get_participant_count(activity):
         """
         Get the count of participants in an activity.
         """
+        return activity.attendances.count()
+
+    @staticmethod
+    def get_meal_report(event):
+        """
+        Get the meal planning report of an event: how many confirmed and attended
+        participants have each diet, and for each meal how many of them were
+        expected and how many checked in. It is cached until the next check-in.
+        """
+        return cache.get_or_set(
+            f"meal-report:{event.id}",
+            lambda: ActivityService.compute_meal_report(event),
+            MEAL_REPORT_CACHE_TIMEOUT,
+            version=EventService.get_check_in_version(event.id),
+        )
+
+    @staticmethod
+    def compute_meal_report(event):
+        """
+        Compute the meal planning report of an event. The diets of every
+        participant type are grouped in one UNION ALL query, and the check-ins of
+        every meal in another.
+        """
+        grouped = [
+            model.objects.filter(
+                event=event, status__in=CONFIRMED_STATUSES + ATTENDED_STATUSES
+            )
+            .values(diet=diet_of("user"))
+            .annotate(
+                confirmed=Count("id", filter=Q(status__in=CONFIRMED_STATUSES)),
+                attended=Count("id", filter=Q(status__in=ATTENDED_STATUSES)),
+            )
+            .order_by()
+            for model in PARTICIPANT_MODELS.values()
+        ]
+        diets = {}
+
+        for row in grouped[0].union(*grouped[1:], all=True):
+            counts = diets.setdefault(row["diet"], {"confirmed": 0, "attended": 0})
+            counts["confirmed"] += row["confirmed"]
+            counts["attended"] += row["attended"]
+
+        meals = {
+            activity.id: {
+                "id": str(activity.id),
+                "name": activity.name,
+                "start_date": activity.start_date,
+                "end_date": activity.end_date,
+                "diets": {},
+            }
+            for activity in Activity.objects.filter(
+                event=event, type=ActivityEnum.MEAL.name
+            ).order_by("start_date", "id")
+        }
+        check_ins = (
+            Attendance.objects.filter(
+                activity__event=event, activity__type=ActivityEnum.MEAL.name
+            )
+            .values(
+                "activity_id",
+                diet=Subquery(
+                    ParticipantRegistry.objects.filter(
+                        id=OuterRef("participant_id")
+                    ).values(diet=diet_of("user"))[:1]
+                ),
+            )
+            .annotate(actual=Count("id"))
+            .order_by()
+        )
+
+        for row in check_ins:
+            meals[row["activity_id"]]["diets"][row["diet"] or "UNKNOWN"] = row[
+                "actual"
+            ]
+
+        def label(diet):
+            return DIETARY_LABELS.get(diet, diet)
+
+        expected = {
+            diet: counts["confirmed"] + counts["attended"]
+            for diet, counts in diets.items()
+        }
+
+        for meal in meals.values():
+            actual = meal["diets"]
+            meal["diets"] = [
+                {
+                    "diet": label(diet),
+                    "expected": expected.get(diet, 0),
+                    "actual": actual.get(diet, 0),
+                }
+                for diet in sorted(set(expected) | set(actual))
+            ]
+            meal["expected"] = sum(expected.values())
+            meal["actual"] = sum(actual.values())
+
+        return {
+            "diets": [
+                {
+                    "diet": label(diet),
+                    "confirmed": counts["confirmed"],
+                    "attended": counts["attended"],
+                    "expected": expected[diet],
+                }
+                for diet, counts in sorted(diets.items())
+            ],
+            "confirmed": sum(counts["confirmed"] for counts in diets.values()),
+            "attended": sum(counts["attended"] for counts in diets.values()),
+            "expected": sum(expected.values()),
+            "meals": list(meals.values()),
+        }
+
+    @staticmethod
+    def get_schedule_version(event_id):
+        """
+        Get the version stamp of the schedule of an event, the time in nanoseconds of
+        the last change to one of its activities.
+        """
+        return cache.get_or_set(
+            f"activity-schedule:{uuid.UUID(str(event_id))}", time.time_ns, None
+        )
+
+    @staticmethod
+    def touch_schedule(event_id):
+        """
+        Record the time of the last change to the schedule of an event and give it a
+        new version stamp, so the calendar cached under the old one is not read
+        again, and drop its cached list of activities.
+        """
+        event_id = uuid.UUID(str(event_id))
+        Event.objects.filter(id=event_id).update(schedule_updated_at=now())
+        cache.set(f"activity-schedule:{event_id}", time.time_ns(), None)
+        cache.delete(f"event-occupancy:{event_id}")
+
+    @staticmethod
+    def get_calendar(event):
+        """
+        Get the schedule of an event as an iCalendar feed: a dictionary with its
+        content, its ETag and the timestamp of its last change. It is cached until the
+        event or one of its activities changes.
+        """
+        event_version = EventService.get_event_cache_version(event.id)
+        schedule_version = ActivityService.get_schedule_version(event.id)
+
+        return cache.get_or_set(
+            f"activity-calendar:{event.id}:{event_version}:{schedule_version}",
+            lambda: ActivityService.compute_calendar(event),
+            CALENDAR_CACHE_TIMEOUT,
+        )
+
+    @staticmethod
+    def compute_calendar(event):
+        """
+        Build the iCalendar feed of the schedule of an event. The time of the last
+        change to the schedule, stored with the event, is used as the stamp of every
+        entry and as the Last-Modified time, and the ETag is a hash of the content,
+        so every process serves the same values until the schedule changes.
+        """
+        last_modified = int(
+            Event.objects.values_list("schedule_updated_at", flat=True)
+            .get(id=event.id)
+            .timestamp()
+        )
+        stamp = datetime.fromtimestamp(last_modified, dt_timezone.utc).strftime(
+            CALENDAR_DATE_FORMAT
+        )
+        text = ActivityService.calendar_text
+        lines = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//Mybits2//Activities//EN",
+            "CALSCALE:GREGORIAN",
+            "X-WR-CALNAME:" + text(event.name),
+        ]
+        activities = (
+            Activity.objects.filter(event_id=event.id)
+            .only("id", "name", "type", "description", "start_date", "end_date")
+            .order_by("start_date", "id")
+        )
+
+        for activity in activities:
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{activity.id}",
+                "DTSTAMP:" + stamp,
+                "DTSTART:"
+                + activity.start_date.astimezone(dt_timezone.utc).strftime(
+                    CALENDAR_DATE_FORMAT
+                ),
+                "DTEND:"
+                + activity.end_date.astimezone(dt_timezone.utc).strftime(
+                    CALENDAR_DATE_FORMAT
+                ),
+                "SUMMARY:" + text(activity.name),
+                "CATEGORIES:" + text(activity.get_type_display()),
+            ]
+
+            if activity.description:
+                lines.append("DESCRIPTION:" + text(activity.description))
+
+            lines.append("END:VEVENT")
+
+        lines.append("END:VCALENDAR")
+        content = "".join(
+            ActivityService.fold_calendar_line(line) + "\r\n" for line in lines
+        )
+
+        return {
+            "content": content,
+            "etag": f'"{hashlib.sha1(content.encode()).hexdigest()}"',
+            "last_modified": last_modified,
+        }
+
+    @staticmethod
+    def calendar_text(value):
+        """
+        Escape a text value of an iCalendar property.
+        """
+        return (
+            value.replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\r\n", "\\n")
+            .replace("\n", "\\n")
+        )
+
+    @staticmethod
+    def fold_calendar_line(line):
+        """
+        Fold an iCalendar line into lines of at most 75 octets, without splitting a
+        character. Each continuation line starts with a space.
+        """
+        parts = []
+        part = ""
+        size = 0
+
+        for char in line:
+            char_size = len(char.encode())
+
+            if size + char_size > CALENDAR_LINE_LENGTH:
+                parts.append(part)
+                part = " "
+                size = 1
+
+            part += char
+            size += char_size
+
+        parts.append(part)
+        return "\r\n".join(parts)
+
+    @staticmethod
+    def read_import_rows(file, import_format):
+        """
+        Get the rows of a CSV or iCalendar text file as dictionaries of activity
+        fields.
+        """
+        if import_format == "csv":
+            return csv.DictReader(file)
+
+        if import_format == "ics":
+            return ActivityService.read_calendar_rows(file)
+
+        raise ValueError("Unsupported import format")
+
+    @staticmethod
+    def read_calendar_rows(file):
+        """
+        Get the events of an iCalendar file as rows of activity fields. Properties of
+        components nested in an event, such as alarms, are skipped, and an event
+        without categories is a normal activity.
+        """
+        row = None
+        depth = 0
+
+        for line in ActivityService.unfold_calendar_lines(file):
+            name, _, value = line.partition(":")
+            name, *params = name.split(";")
+            name = name.upper()
+
+            if name == "BEGIN" and value.upper() == "VEVENT" and row is None:
+                row = {"type": ActivityEnum.NORMALACTIVITY.name}
+
+            elif row is None:
+                continue
+
+            elif name == "BEGIN":
+                depth += 1
+
+            elif name == "END" and depth:
+                depth -= 1
+
+            elif name == "END":
+                yield row
+                row = None
+
+            elif not depth and name in ("DTSTART", "DTEND"):
+                row[CALENDAR_FIELDS[name]] = ActivityService.parse_calendar_date(
+                    value, params
+                )
+
+            elif not depth and name == "CATEGORIES":
+                row["type"] = ActivityService.parse_calendar_text(
+                    re.split(r"(?<!\\),", value)[0]
+                )
+
+            elif not depth and name in CALENDAR_FIELDS:
+                row[CALENDAR_FIELDS[name]] = ActivityService.parse_calendar_text(value)
+
+    @staticmethod
+    def unfold_calendar_lines(file):
+        """
+        Get the lines of an iCalendar file, joining each folded line with the one it
+        continues.
+        """
+        line = None
+
+        for raw in file:
+            raw = raw.rstrip("\r\n")
+
+            if line is not None and raw[:1] in (" ", "\t"):
+                line += raw[1:]
+                continue
+
+            if line:
+                yield line
+
+            line = raw
+
+        if line:
+            yield line
+
+    @staticmethod
+    def parse_calendar_text(value):
+        """
+        Unescape a text value of an iCalendar property.
+        """
+        return re.sub(
+            r"\\([\\;,nN])",
+            lambda match: "\n" if match.group(1) in "nN" else match.group(1),
+            value,
+        )
+
+    @staticmethod
+    def parse_calendar_date(value, params):
+        """
+        Parse the date of an iCalendar property, in UTC, in the time zone of its TZID
+        parameter, or in the current time zone. Values that cannot be parsed are
+        returned as they are, so the activity form rejects them.
+        """
+        params = dict(param.partition("=")[::2] for param in params)
+
+        try:
+            if len(value) == 8:
+                date = datetime.strptime(value, "%Y%m%d")
+
+            else:
+                date = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+
+            if value.endswith("Z"):
+                return date.replace(tzinfo=dt_timezone.utc)
+
+            if params.get("TZID"):
+                return date.replace(tzinfo=ZoneInfo(params["TZID"].strip('"')))
+
+        except (ValueError, ZoneInfoNotFoundError):
+            return value
+
+        return date
+
+    @staticmethod
+    def import_activities(event, rows, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Create activities in an event from rows of activity fields. Rows are validated
+        with the activity form and inserted with bulk_create in batches. It returns the
+        number of activities created and the list of rejected rows with their errors.
+        """
+        rows = enumerate(rows, start=1)
+        created = 0
+        rejected = []
+
+        while True:
+            batch = list(islice(rows, batch_size))
+
+            if not batch:
+                break
+
+            activities = []
+
+            for line, row in batch:
+                row = dict(row)
+                activity_type = str(row.get("type") or "").strip().lower()
+                row["type"] = ACTIVITY_TYPE_NAMES.get(activity_type, row.get("type"))
+                form = ActivityForm(row)
+
+                if not form.is_valid():
+                    rejected.append(
+                        {
+                            "row": line,
+                            "errors": {
+                                field: list(errors)
+                                for field, errors in form.errors.items()
+                            },
+                        }
+                    )
+                    continue
+
+                activity = form.save(commit=False)
+                activity.event = event
+                activities.append(activity)
+
+            created += len(Activity.objects.bulk_create(activities))
+
+        if created:
+            ActivityService.touch_schedule(event.id)
 
-        count = activity.hacker_participants.all().count()
-        count = count + activity.mentor_participants.all().count()
-        count = count + activity.sponsor_participants.all().count()
-        count = count + activity.volunteer_participants.all().count()
-        count = count + activity.admin_participants.all().count()
-        return count
+        return created, rejected
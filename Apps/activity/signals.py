@@ -0,0 +1,16 @@
+from django.db.models.signals import pre_delete
+
+from Apps.participant.models import PARTICIPANT_MODELS
+from .services import ActivityService
+
+
+def release_participant(sender, instance, **kwargs):
+    """
+    Gives back the activity seats of a participant about to be deleted. Its
+    check-ins are deleted with its registry entry.
+    """
+    ActivityService.release_participant(instance)
+
+
+for model in PARTICIPANT_MODELS.values():
+    pre_delete.connect(release_participant, sender=model)
@@ -1,11 +1,22 @@
+import io
+import json
 import uuid
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
 from django.test import TestCase
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
 
 from Apps.activity.forms import ActivityForm
-from Apps.activity.models import Activity
+from Apps.activity.models import Activity, Attendance
 from Apps.activity.services import ActivityService
 from Apps.event.models import Event
 from Apps.participant.models import Admin, Hacker, Mentor, Sponsor, Volunteer
+from Apps.participant.services import ParticipantService
 from Apps.users.models import CustomUser
 
 
@@ -406,6 +417,172 @@ class ServiceActivityTestCase(TestCase):
         )
         self.assertEqual(len(filtered_activities), 0)
 
+    def test_get_meal_report(self):
+        """
+        Test the diets expected and served at the meals of an event.
+        """
+        user2 = CustomUser.objects.create(
+            email="vegan@a.com",
+            username="vegan",
+            first_name="vegan",
+            last_name="a",
+            gender="OTHER",
+            pronoun="they/them",
+            date_of_birth="2000-01-01",
+            dietary="VEGAN",
+            origin="Spain",
+        )
+        self.hacker.status = "CONFIRMED"
+        self.hacker.save()
+        self.mentor.user = user2
+        self.mentor.status = "Attended"
+        self.mentor.save()
+        lunch = Activity.objects.create(
+            name="Lunch",
+            type="MEAL",
+            start_date="2023-10-01T13:00:00Z",
+            end_date="2023-10-01T15:00:00Z",
+            event=self.event,
+        )
+        Activity.objects.create(
+            name="Workshop",
+            type="WORKSHOP",
+            start_date="2023-10-01T13:00:00Z",
+            end_date="2023-10-01T15:00:00Z",
+            event=self.event,
+        )
+        ActivityService.checkin_participant(lunch, self.mentor)
+
+        with self.assertNumQueries(3):
+            report = ActivityService.get_meal_report(self.event)
+
+        self.assertEqual(report["expected"], 2)
+        self.assertEqual(report["confirmed"], 1)
+        self.assertEqual(report["attended"], 1)
+        self.assertEqual(
+            report["diets"],
+            [
+                {"diet": "None", "confirmed": 1, "attended": 0, "expected": 1},
+                {"diet": "Vegan", "confirmed": 0, "attended": 1, "expected": 1},
+            ],
+        )
+        self.assertEqual(len(report["meals"]), 1)
+        self.assertEqual(report["meals"][0]["name"], "Lunch")
+        self.assertEqual(report["meals"][0]["actual"], 1)
+        self.assertEqual(
+            report["meals"][0]["diets"],
+            [
+                {"diet": "None", "expected": 1, "actual": 0},
+                {"diet": "Vegan", "expected": 1, "actual": 1},
+            ],
+        )
+
+        with self.assertNumQueries(0):
+            ActivityService.get_meal_report(self.event)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ActivityService.checkin_participant(lunch, self.hacker)
+
+        report = ActivityService.get_meal_report(self.event)
+        self.assertEqual(report["meals"][0]["actual"], 2)
+
+    def test_get_occupancy(self):
+        """
+        Test the live occupancy read from the check-in counters.
+        """
+        activity = Activity.objects.create(
+            name="Workshop",
+            type="WORKSHOP",
+            start_date="2023-10-01T13:00:00Z",
+            end_date="2023-10-01T15:00:00Z",
+            event=self.event,
+        )
+        ActivityService.checkin_participant(activity, self.hacker)
+
+        with self.assertNumQueries(2):
+            occupancy = ActivityService.get_occupancy(self.event.id, refresh=True)
+
+        self.assertEqual(
+            occupancy,
+            {
+                "door": 0,
+                "activities": [
+                    {"id": str(activity.id), "name": "Workshop", "count": 1}
+                ],
+            },
+        )
+
+        self.mentor.status = "CONFIRMED"
+        self.mentor.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ActivityService.checkin_participant(activity, self.mentor)
+            ParticipantService.check_in_participant(self.mentor)
+
+        with self.assertNumQueries(0):
+            occupancy = ActivityService.get_occupancy(self.event.id)
+
+        self.assertEqual(occupancy["door"], 1)
+        self.assertEqual(occupancy["activities"][0]["count"], 2)
+
+        # A check-in that is rolled back is not counted
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    ActivityService.checkin_participant(activity, self.sponsor)
+                    raise RuntimeError
+
+            except RuntimeError:
+                pass
+
+        occupancy = ActivityService.get_occupancy(self.event.id)
+        self.assertEqual(occupancy["activities"][0]["count"], 2)
+        self.assertFalse(ActivityService.is_checked_in(activity, self.sponsor))
+
+    def test_get_current_activity(self):
+        """
+        Test resolving the activity of a type that is running at a time.
+        """
+        breakfast = Activity.objects.create(
+            name="Breakfast",
+            type="MEAL",
+            start_date="2023-10-01T08:00:00Z",
+            end_date="2023-10-01T10:00:00Z",
+            event=self.event,
+        )
+        lunch = Activity.objects.create(
+            name="Lunch",
+            type="MEAL",
+            start_date="2023-10-01T13:00:00Z",
+            end_date="2023-10-01T15:00:00Z",
+            event=self.event,
+        )
+        Activity.objects.create(
+            name="Workshop",
+            type="WORKSHOP",
+            start_date="2023-10-01T13:00:00Z",
+            end_date="2023-10-01T15:00:00Z",
+            event=self.event,
+        )
+
+        self.assertEqual(
+            ActivityService.get_current_activity(
+                self.event, "meal", parse_datetime("2023-10-01T09:00:00Z")
+            ),
+            breakfast,
+        )
+        self.assertEqual(
+            ActivityService.get_current_activity(
+                self.event, "MEAL", parse_datetime("2023-10-01T14:00:00Z")
+            ),
+            lunch,
+        )
+        self.assertIsNone(
+            ActivityService.get_current_activity(
+                self.event, "MEAL", parse_datetime("2023-10-01T11:00:00Z")
+            )
+        )
+
     def test_create_activity(self):
         """
         Test the creation of an activity using the service.
@@ -463,6 +640,42 @@ class ServiceActivityTestCase(TestCase):
         self.assertEqual(str(updated_activity.start_date), "2023-10-01 12:00:00+00:00")
         self.assertEqual(str(updated_activity.end_date), "2023-10-01 13:00:00+00:00")
 
+    def test_update_activity_keeps_seats_taken(self):
+        """
+        Test that an update does not overwrite the seats taken since the activity
+        was read, nor lowers the capacity under them.
+        """
+        activity = Activity.objects.create(
+            name="Test Activity",
+            type="MEAL",
+            start_date="2023-10-01T10:00:00Z",
+            end_date="2023-10-01T11:00:00Z",
+            capacity=2,
+            event=self.event,
+        )
+        stale = ActivityService.get_activity(activity.id)
+        ActivityService.admit_participant(activity, self.hacker)
+        ActivityService.admit_participant(activity, self.mentor)
+
+        ActivityService.update_activity(stale, {"name": "Renamed"})
+        activity.refresh_from_db()
+        self.assertEqual(activity.name, "Renamed")
+        self.assertEqual(activity.seats_taken, 2)
+        self.assertEqual(
+            ActivityService.admit_participant(activity, self.sponsor), "full"
+        )
+
+        with self.assertRaises(ValidationError):
+            ActivityService.update_activity(stale, {"capacity": 1})
+
+        activity.refresh_from_db()
+        self.assertEqual(activity.capacity, 2)
+
+        ActivityService.update_activity(stale, {"capacity": 3})
+        self.assertEqual(
+            ActivityService.admit_participant(activity, self.sponsor), "checked_in"
+        )
+
     def test_delete_activity(self):
         """
         Test the deletion of an activity using the service.
@@ -494,20 +707,92 @@ class ServiceActivityTestCase(TestCase):
         )
         activity.save()
 
-        ActivityService.checkin_participant(activity, self.hacker)
-        self.assertIn(self.hacker, activity.hacker_participants.all())
+        self.assertTrue(ActivityService.checkin_participant(activity, self.hacker))
+        self.assertTrue(ActivityService.is_checked_in(activity, self.hacker))
 
-        ActivityService.checkin_participant(activity, self.mentor)
-        self.assertIn(self.mentor, activity.mentor_participants.all())
+        self.assertTrue(ActivityService.checkin_participant(activity, self.mentor))
+        self.assertTrue(ActivityService.is_checked_in(activity, self.mentor))
+
+        self.assertTrue(ActivityService.checkin_participant(activity, self.sponsor))
+        self.assertTrue(ActivityService.is_checked_in(activity, self.sponsor))
+
+        self.assertTrue(ActivityService.checkin_participant(activity, self.volunteer))
+        self.assertTrue(ActivityService.is_checked_in(activity, self.volunteer))
+
+        self.assertTrue(ActivityService.checkin_participant(activity, self.admin))
+        self.assertTrue(ActivityService.is_checked_in(activity, self.admin))
+
+        with self.assertNumQueries(2):
+            self.assertFalse(ActivityService.checkin_participant(activity, self.hacker))
+
+        self.assertEqual(
+            Attendance.objects.get(activity=activity, participant_id=self.hacker.id)
+            .participant_type,
+            "HACKER",
+        )
 
-        ActivityService.checkin_participant(activity, self.sponsor)
-        self.assertIn(self.sponsor, activity.sponsor_participants.all())
+    def test_admit_participant_capacity(self):
+        """
+        Test that a full activity turns participants away.
+        """
+        activity = Activity(
+            name="Test Activity",
+            type="MEAL",
+            description="This is a test activity.",
+            start_date="2023-10-01T10:00:00Z",
+            end_date="2023-10-01T11:00:00Z",
+            capacity=1,
+            event=self.event,
+        )
+        activity.save()
 
-        ActivityService.checkin_participant(activity, self.volunteer)
-        self.assertIn(self.volunteer, activity.volunteer_participants.all())
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                ActivityService.admit_participant(activity, self.hacker), "checked_in"
+            )
 
-        ActivityService.checkin_participant(activity, self.admin)
-        self.assertIn(self.admin, activity.admin_participants.all())
+        self.assertEqual(
+            ActivityService.admit_participant(activity, self.hacker),
+            "already_checked_in",
+        )
+        self.assertEqual(ActivityService.admit_participant(activity, self.mentor), "full")
+        self.assertFalse(ActivityService.is_checked_in(activity, self.mentor))
+
+        activity.refresh_from_db()
+        self.assertEqual(activity.seats_taken, 1)
+
+    def test_delete_participant_releases_attendance(self):
+        """
+        Test that deleting a participant deletes its check-ins and gives back their
+        seats.
+        """
+        activity = Activity.objects.create(
+            name="Test Activity",
+            type="MEAL",
+            start_date="2023-10-01T10:00:00Z",
+            end_date="2023-10-01T11:00:00Z",
+            capacity=1,
+            event=self.event,
+        )
+        ActivityService.checkin_participant(activity, self.hacker)
+        occupancy = ActivityService.get_occupancy(self.event.id, refresh=True)
+        self.assertEqual(occupancy["activities"][0]["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hacker.delete()
+
+        activity.refresh_from_db()
+        self.assertEqual(activity.seats_taken, 0)
+        self.assertFalse(Attendance.objects.filter(activity=activity).exists())
+        self.assertEqual(ActivityService.get_participant_count(activity), 0)
+        self.assertEqual(
+            ActivityService.get_activity_with_counts(activity.id).hacker_count, 0
+        )
+        occupancy = ActivityService.get_occupancy(self.event.id)
+        self.assertEqual(occupancy["activities"][0]["count"], 0)
+        self.assertEqual(
+            ActivityService.admit_participant(activity, self.mentor), "checked_in"
+        )
 
     def test_get_participant_count(self):
         """
@@ -529,6 +814,144 @@ class ServiceActivityTestCase(TestCase):
         count = ActivityService.get_participant_count(activity)
         self.assertEqual(count, 2)
 
+    def test_annotate_attendance_counts(self):
+        """
+        Test counting the attendance of every activity in one query.
+        """
+        activities = Activity.objects.bulk_create(
+            [
+                Activity(
+                    name=f"Test Activity {index}",
+                    type="MEAL",
+                    start_date="2023-10-01T10:00:00Z",
+                    end_date="2023-10-01T11:00:00Z",
+                    event=self.event,
+                )
+                for index in range(3)
+            ]
+        )
+        ActivityService.checkin_participant(activities[0], self.hacker)
+        ActivityService.checkin_participant(activities[0], self.mentor)
+        ActivityService.checkin_participant(activities[1], self.hacker)
+
+        with self.assertNumQueries(1):
+            counted = {
+                activity.id: activity
+                for activity in ActivityService.annotate_attendance_counts(
+                    ActivityService.get_all_activities(self.event)
+                )
+            }
+
+        self.assertEqual(counted[activities[0].id].attendance_count, 2)
+        self.assertEqual(counted[activities[0].id].hacker_count, 1)
+        self.assertEqual(counted[activities[0].id].mentor_count, 1)
+        self.assertEqual(counted[activities[1].id].attendance_count, 1)
+        self.assertEqual(counted[activities[1].id].mentor_count, 0)
+        self.assertEqual(counted[activities[2].id].attendance_count, 0)
+
+        activity = ActivityService.get_activity_with_counts(activities[0].id)
+        self.assertEqual(activity.attendance_count, 2)
+        self.assertEqual(activity.admin_count, 0)
+
+    def test_get_calendar(self):
+        """
+        Test building and caching the calendar feed of an event.
+        """
+        activity = Activity.objects.create(
+            name="Lunch, pizza; drinks",
+            type="MEAL",
+            description="Line one\nLine two " + "x" * 80,
+            start_date="2023-10-01T12:00:00Z",
+            end_date="2023-10-01T13:00:00Z",
+            event=self.event,
+        )
+
+        with self.assertNumQueries(2):
+            calendar = ActivityService.get_calendar(self.event)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ActivityService.get_calendar(self.event), calendar)
+
+        # Another process or a restart, with its own version stamps, serves the
+        # same feed
+        cache.clear()
+        self.assertEqual(ActivityService.get_calendar(self.event), calendar)
+
+        content = calendar["content"]
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn(f"UID:{activity.id}\r\n", content)
+        self.assertIn("DTSTART:20231001T120000Z\r\n", content)
+        self.assertIn("SUMMARY:Lunch\\, pizza\\; drinks\r\n", content)
+        self.assertIn("CATEGORIES:Meal\r\n", content)
+        self.assertTrue(
+            all(len(line.encode()) <= 75 for line in content.split("\r\n"))
+        )
+
+        rows = list(ActivityService.read_calendar_rows(io.StringIO(content)))
+        self.assertEqual(rows[0]["name"], activity.name)
+        self.assertEqual(rows[0]["description"], activity.description)
+        self.assertEqual(rows[0]["type"], "Meal")
+
+        ActivityService.update_activity(activity, {"name": "Dinner"})
+        updated = ActivityService.get_calendar(self.event)
+        self.assertIn("SUMMARY:Dinner\r\n", updated["content"])
+        self.assertNotEqual(updated["etag"], calendar["etag"])
+        self.assertGreaterEqual(updated["last_modified"], calendar["last_modified"])
+
+    def test_import_activities(self):
+        """
+        Test importing activities from CSV and iCalendar files.
+        """
+        csv_file = io.StringIO(
+            "name,type,description,start_date,end_date,capacity\r\n"
+            "Breakfast,meal,,2023-10-01T08:00:00Z,2023-10-01T09:00:00Z,100\r\n"
+            "Talk,Workshop,About Django,2023-10-01T10:00:00Z,2023-10-01T11:00:00Z,\r\n"
+            "Broken,MEAL,,2023-10-01T12:00:00Z,2023-10-01T11:00:00Z,\r\n"
+            "Unknown,PARTY,,2023-10-01T12:00:00Z,2023-10-01T13:00:00Z,\r\n"
+        )
+        rows = ActivityService.read_import_rows(csv_file, "csv")
+
+        with self.assertNumQueries(2):
+            created, rejected = ActivityService.import_activities(self.event, rows)
+
+        self.assertEqual(created, 2)
+        self.assertEqual([row["row"] for row in rejected], [3, 4])
+        self.assertIn("start_date", rejected[0]["errors"])
+        self.assertIn("type", rejected[1]["errors"])
+        self.assertEqual(Activity.objects.get(name="Breakfast").capacity, 100)
+
+        ics_file = io.StringIO(
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            "SUMMARY:Opening\\, keynote\r\n"
+            "DTSTART;TZID=Europe/Madrid:20231001T090000\r\n"
+            "DTEND;TZID=Europe/Madrid:20231001T10\r\n"
+            " 0000\r\n"
+            "BEGIN:VALARM\r\n"
+            "DESCRIPTION:Reminder\r\n"
+            "END:VALARM\r\n"
+            "END:VEVENT\r\n"
+            "BEGIN:VEVENT\r\n"
+            "SUMMARY:No end\r\n"
+            "DTSTART:20231001T090000Z\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n"
+        )
+        created, rejected = ActivityService.import_activities(
+            self.event, ActivityService.read_import_rows(ics_file, "ics")
+        )
+
+        self.assertEqual(created, 1)
+        self.assertEqual(rejected[0]["row"], 2)
+        opening = Activity.objects.get(name="Opening, keynote")
+        self.assertEqual(opening.type, "NORMALACTIVITY")
+        self.assertEqual(opening.description, "")
+        self.assertEqual(opening.start_date, parse_datetime("2023-10-01T07:00:00Z"))
+        self.assertEqual(opening.end_date, parse_datetime("2023-10-01T08:00:00Z"))
+
+        with self.assertRaises(ValueError):
+            ActivityService.read_import_rows(csv_file, "xlsx")
+
 
 class ViewActivityTestCase(TestCase):
     """
@@ -667,6 +1090,13 @@ class ViewActivityTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "activities.html")
 
+        activity = Activity.objects.create(**self.activity_data, event=self.event)
+        ActivityService.checkin_participant(activity, self.hacker)
+        response = self.client.get(f"{self.base_url}")
+        activities = list(response.context["activities"])
+        self.assertEqual(activities[0].attendance_count, 1)
+        self.assertEqual(activities[0].hacker_count, 1)
+
     def test_activity_create_view_get(self):
         """
         Test the activity create view GET method.
@@ -757,6 +1187,7 @@ class ViewActivityTestCase(TestCase):
         response = self.client.get(f"{self.base_url}{activity.id}/")
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "activityEdit.html")
+        self.assertEqual(response.context["count"], 0)
 
     def test_activity_CRUD_view_post(self):
         """
@@ -802,6 +1233,14 @@ class ViewActivityTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+        ActivityService.admit_participant(activity, self.hacker)
+        response = self.client.post(
+            f"{self.base_url}{activity.id}/",
+            data={**self.activity_data, "capacity": 0},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("capacity", response.context["form"].errors)
+
     def test_activity_CRUD_view_delete(self):
         """
         Test the activity CRUD view DELETE method.
@@ -880,6 +1319,15 @@ class ViewActivityTestCase(TestCase):
         response = self.client.post(f"{self.base_url}{activity.id}/checkin/", {"qrResult": "00000000-0000-0000-0000-000000000000"}, content_type="application/json")
         self.assertEqual(response.status_code, 404)
 
+        response = self.client.post(f"{self.base_url}{activity.id}/checkin/", "{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(f"{self.base_url}{activity.id}/checkin/", "[]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(f"{self.base_url}{activity.id}/checkin/", {"qrResult": "not-a-participant"}, content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+
         response = self.client.post(f"{self.base_url}{activity.id}/checkin/",  {"qrResult": f"{self.hacker.id}"}, content_type="application/json")
         self.assertEqual(response.status_code, 401)
 
@@ -889,8 +1337,159 @@ class ViewActivityTestCase(TestCase):
 
         self.admin.save()
         self.client.login(username=self.user2.email, password=self.user2_password)
-        response = self.client.post(f"{self.base_url}{activity.id}/checkin/", {"qrResult": f"{self.hacker.id}"}, content_type="application/json")
+        # Session, user, admin check, activity, registry, participant with its
+        # user for the diet, and the check-in itself
+        with self.assertNumQueries(7):
+            response = self.client.post(f"{self.base_url}{activity.id}/checkin/", {"qrResult": f"{self.hacker.id}"}, content_type="application/json")
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {"diet": self.hacker.user.dietary})
 
-        response = self.client.post(f"{self.base_url}{activity.id}/checkin/", {"qrResult": f"{self.hacker.id}"}, content_type="application/json")
+        with self.assertNumQueries(8):
+            response = self.client.post(f"{self.base_url}{activity.id}/checkin/", {"qrResult": f"{self.hacker.id}"}, content_type="application/json")
         self.assertEqual(response.status_code, 409)
+
+        full = Activity.objects.create(**self.activity_data, capacity=0, event=self.event)
+        response = self.client.post(f"{self.base_url}{full.id}/checkin/", {"qrResult": f"{self.hacker.id}"}, content_type="application/json")
+        self.assertEqual(response.status_code, 422)
+
+    def test_activity_meal_report_view_get(self):
+        """
+        Test the activity meal report view GET method.
+        """
+        response = self.client.get(f"{self.base_url}meals/")
+        self.assertEqual(response.status_code, 302)
+
+        self.admin.save()
+        self.client.login(username=self.user2.email, password=self.user2_password)
+        Activity.objects.create(**self.activity_data, event=self.event)
+        response = self.client.get(f"{self.base_url}meals/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "mealReport.html")
+        self.assertEqual(response.context["report"]["meals"][0]["name"], "New Activity")
+
+    async def test_activity_occupancy_view_get(self):
+        """
+        Test the activity occupancy view GET method.
+        """
+        url = f"{self.base_url}occupancy/"
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+
+        await sync_to_async(self.async_client.force_login)(self.user1)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        await sync_to_async(self.admin.save)()
+        await sync_to_async(self.async_client.force_login)(self.user2)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        events = response.streaming_content
+        message = await events.__anext__()
+        await events.aclose()
+
+        self.assertTrue(message.startswith(b"event: occupancy\ndata: "))
+        self.assertEqual(
+            json.loads(message.split(b"data: ")[1]), {"door": 0, "activities": []}
+        )
+
+    def test_activity_station_view_post(self):
+        """
+        Test the activity station view POST method.
+        """
+        url = f"{self.base_url}station/meal/"
+        qr = {"qrResult": f"{self.hacker.id}"}
+        response = self.client.post(url, qr, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+        self.admin.save()
+        self.client.login(username=self.user2.email, password=self.user2_password)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "activityCheckIn.html")
+
+        response = self.client.get(f"{self.base_url}station/unknown/")
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(url, qr, content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+
+        activity = Activity.objects.create(
+            name="Lunch",
+            type="MEAL",
+            start_date=now() - timedelta(hours=1),
+            end_date=now() + timedelta(hours=1),
+            event=self.event,
+        )
+        response = self.client.post(
+            url, {"qrResult": "not-a-participant"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(url, "{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, "[]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, qr, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["activity"], "Lunch")
+        self.assertTrue(ActivityService.is_checked_in(activity, self.hacker))
+
+        response = self.client.post(url, qr, content_type="application/json")
+        self.assertEqual(response.status_code, 409)
+
+    def test_activity_calendar_view_get(self):
+        """
+        Test the activity calendar view GET method.
+        """
+        response = self.client.get(
+            "/event/00000000-0000-0000-0000-000000000000/activity/calendar.ics"
+        )
+        self.assertEqual(response.status_code, 404)
+
+        Activity.objects.create(**self.activity_data, event=self.event)
+        response = self.client.get(f"{self.base_url}calendar.ics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn(b"SUMMARY:New Activity", response.content)
+
+        response = self.client.get(
+            f"{self.base_url}calendar.ics", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            f"{self.base_url}calendar.ics",
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_activity_import_view_post(self):
+        """
+        Test the activity import view POST method.
+        """
+        file = SimpleUploadedFile(
+            "activities.csv",
+            b"name,type,description,start_date,end_date\n"
+            b"Dinner,MEAL,,2023-10-01T20:00:00Z,2023-10-01T21:00:00Z\n",
+        )
+        response = self.client.post(f"{self.base_url}import/", {"file": file})
+        self.assertEqual(response.status_code, 401)
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        response = self.client.post(f"{self.base_url}import/", {"file": file})
+        self.assertEqual(response.status_code, 403)
+
+        self.admin.save()
+        self.client.login(username=self.user2.email, password=self.user2_password)
+        response = self.client.post(f"{self.base_url}import/")
+        self.assertEqual(response.status_code, 400)
+
+        file.seek(0)
+        response = self.client.post(f"{self.base_url}import/", {"file": file})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {"created": 1, "rejected": []})
+        self.assertTrue(Activity.objects.filter(name="Dinner").exists())
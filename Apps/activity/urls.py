@@ -4,6 +4,23 @@ from . import views
 urlpatterns = [
     path("create/", views.ActivityCreateView.as_view(), name="activity-create"),
     path("<uuid:pk>/checkin/", views.ActivityCheckinView.as_view(), name="activity-join"),
+    path(
+        "occupancy/",
+        views.ActivityOccupancyView.as_view(),
+        name="activity-occupancy",
+    ),
+    path(
+        "calendar.ics",
+        views.ActivityCalendarView.as_view(),
+        name="activity-calendar",
+    ),
+    path("import/", views.ActivityImportView.as_view(), name="activity-import"),
+    path("meals/", views.ActivityMealReportView.as_view(), name="activity-meals"),
+    path(
+        "station/<str:activity_type>/",
+        views.ActivityStationView.as_view(),
+        name="activity-station",
+    ),
     path("<uuid:pk>/", views.ActivityCRUDView.as_view(), name="activity-detail"),
     path("", views.ActivityView.as_view(), name="activity-list"),
 ]
\ No newline at end of file
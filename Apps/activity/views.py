@@ -1,13 +1,40 @@
+import csv
+import io
 import json
-from django.http import HttpResponse
+import os
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.views import View
 
+from Apps.activity.Enums.activityEnum import ActivityEnum
 from Apps.activity.forms import ActivityForm
+from Apps.activity.occupancy import broadcaster
 from Apps.activity.services import ActivityService
-from Apps.event.services import EventService
 from Apps.participant.services import ParticipantService
 
+ACTIVITY_TYPES = [activity_type.name for activity_type in ActivityEnum]
+
+# Sent when a scan finds the activity full, to tell it apart from a repeated scan
+ACTIVITY_FULL_STATUS = 422
+
+
+def get_scanned_qr(request):
+    """
+    Returns the qrResult of a scan sent as a JSON object, or raises ValueError if
+    the body is not a JSON object.
+    """
+    body = json.loads(request.body)
+
+    if not isinstance(body, dict):
+        raise ValueError("Scan body must be a JSON object")
+
+    return body.get("qrResult")
+
+
 # Create your views here.
 class ActivityView(View):
     """
@@ -23,7 +50,7 @@ class ActivityView(View):
         activity_type = request.GET.get("type")
         
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
     
         except ValueError:
             return HttpResponse(status=404)
@@ -31,7 +58,7 @@ class ActivityView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
         activities = ActivityService.get_all_activities(event)
@@ -42,6 +69,10 @@ class ActivityView(View):
         if activity_type:
             activities = ActivityService.filter_by_type(activities, activity_type)
 
+        activities = ActivityService.annotate_attendance_counts(
+            activities.order_by("start_date", "id")
+        )
+
         return render(request, "activities.html", {"activities": activities})
 
 
@@ -57,7 +88,7 @@ class ActivityCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
     
         except ValueError:
             return HttpResponse(status=404)
@@ -65,7 +96,7 @@ class ActivityCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
         form = ActivityForm()
@@ -78,7 +109,7 @@ class ActivityCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
     
         except ValueError:
             return HttpResponse(status=404)
@@ -86,7 +117,7 @@ class ActivityCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
         form = ActivityForm(request.POST)
@@ -110,7 +141,7 @@ class ActivityCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
     
         except ValueError:
             return HttpResponse(status=404)
@@ -118,17 +149,20 @@ class ActivityCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
-        activity = ActivityService.get_activity(activity_id)
+        activity = ActivityService.get_activity_with_counts(activity_id)
 
         if not activity:
             return redirect("/event/" + str(event_id) + "/activity/")
 
         form = ActivityForm(instance=activity)
-        count = ActivityService.get_participant_count(activity)
-        return render(request, "activityEdit.html", {"form": form, "count": count})
+        return render(
+            request,
+            "activityEdit.html",
+            {"form": form, "activity": activity, "count": activity.attendance_count},
+        )
 
     def post(self, request, *args, **kwargs):
         """
@@ -138,7 +172,7 @@ class ActivityCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             activity = ActivityService.get_activity(activity_id)
     
         except ValueError:
@@ -150,13 +184,19 @@ class ActivityCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
         form = ActivityForm(request.POST)
 
         if form.is_valid():
-            ActivityService.update_activity(activity, form.cleaned_data)
+            try:
+                ActivityService.update_activity(activity, form.cleaned_data)
+
+            except ValidationError as error:
+                form.add_error(None, error)
+                return render(request, "activityEdit.html", {"form": form}, status=400)
+
             return render(
                 request,
                 "activityEdit.html",
@@ -173,7 +213,7 @@ class ActivityCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             activity = ActivityService.get_activity(activity_id)
 
         except ValueError:
@@ -185,7 +225,7 @@ class ActivityCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
         if ActivityService.delete_activity(activity):
@@ -207,7 +247,7 @@ class ActivityCheckinView(View):
         event_id = kwargs.get("event_id")
         
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             activity = ActivityService.get_activity(activity_id)
 
         except ValueError:
@@ -219,7 +259,7 @@ class ActivityCheckinView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return redirect("/event/" + str(event_id) + "/")
 
         return render(request, "activityCheckIn.html")
@@ -231,26 +271,274 @@ class ActivityCheckinView(View):
         activity_id = kwargs.get("pk")
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
-            qr = json.loads(request.body).get("qrResult")
+            event = request.event_context.get_event()
             activity = ActivityService.get_activity(activity_id)
-            participant = ParticipantService.get_participant(event_id, qr)
 
         except ValueError:
             return HttpResponse(status=404)
 
-        if not activity or not participant:
+        if not activity:
+            return HttpResponse(status=404)
+
+        try:
+            qr = get_scanned_qr(request)
+
+        except ValueError:
+            return HttpResponse(status=400)
+
+        try:
+            participant = ParticipantService.get_participant(event_id, qr)
+
+        except ValidationError:
+            return HttpResponse(status=404)
+
+        if not participant:
             return HttpResponse(status=404)
 
         if request.user.is_authenticated is False:
             return HttpResponse(status=401)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
         
-        result = ActivityService.checkin_participant(activity, participant)
+        result = ActivityService.admit_participant(activity, participant)
+
+        if result == "full":
+            return HttpResponse(status=ACTIVITY_FULL_STATUS)
+
         diet = ParticipantService.get_participant_diet(participant)
-        if not result:
+
+        if result == "already_checked_in":
             return HttpResponse(status=409, content=json.dumps({"diet": diet}))
 
         return HttpResponse(status=200, content=json.dumps({"diet": diet}))
+
+
+class ActivityMealReportView(View):
+    """
+    View to handle the meal planning report of an event.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to display the diets expected and served at each meal.
+        """
+        event_id = kwargs.get("event_id")
+
+        try:
+            event = request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if request.user.is_authenticated is False:
+            return redirect("/user/login/?next=" + request.path)
+
+        if not request.event_context.is_admin:
+            return redirect("/event/" + str(event_id) + "/")
+
+        report = ActivityService.get_meal_report(event)
+        return render(request, "mealReport.html", {"report": report})
+
+
+class ActivityOccupancyView(View):
+    """
+    View to handle the live occupancy of an event, streamed as Server-Sent Events.
+    It is asynchronous, so under ASGI an open stream does not hold a worker.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to stream the door and activity check-in counts.
+        """
+        status = await sync_to_async(self.get_status)(request)
+
+        if status != 200:
+            return HttpResponse(status=status)
+
+        event = request.event_context.event
+        response = StreamingHttpResponse(
+            broadcaster.stream(event.id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def get_status(self, request):
+        if request.event_context.event is None:
+            return 404
+
+        if not request.user.is_authenticated:
+            return 401
+
+        if not request.event_context.is_admin:
+            return 403
+
+        return 200
+
+
+class ActivityStationView(View):
+    """
+    View to handle the check-in at a station, such as the meal counter. The
+    station has an activity type and each scan is checked in to the activity of
+    that type that is running at the time of the scan.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to display the check-in form of the station.
+        """
+        event_id = kwargs.get("event_id")
+
+        try:
+            request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if kwargs.get("activity_type").upper() not in ACTIVITY_TYPES:
+            return HttpResponse(status=404)
+
+        if request.user.is_authenticated is False:
+            return redirect("/user/login/?next=" + request.path)
+
+        if not request.event_context.is_admin:
+            return redirect("/event/" + str(event_id) + "/")
+
+        return render(request, "activityCheckIn.html")
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests to check in a participant to the running activity.
+        """
+        event_id = kwargs.get("event_id")
+
+        try:
+            event = request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        try:
+            qr = get_scanned_qr(request)
+
+        except ValueError:
+            return HttpResponse(status=400)
+
+        if request.user.is_authenticated is False:
+            return HttpResponse(status=401)
+
+        if not request.event_context.is_admin:
+            return HttpResponse(status=403)
+
+        activity = ActivityService.get_current_activity(
+            event, kwargs.get("activity_type")
+        )
+
+        try:
+            participant = ParticipantService.get_participant(event_id, qr)
+
+        except ValidationError:
+            return HttpResponse(status=404)
+
+        if not activity or not participant:
+            return HttpResponse(status=404)
+
+        result = ActivityService.admit_participant(activity, participant)
+
+        if result == "full":
+            return HttpResponse(status=ACTIVITY_FULL_STATUS)
+
+        content = json.dumps(
+            {
+                "diet": ParticipantService.get_participant_diet(participant),
+                "activity": activity.name,
+            }
+        )
+
+        if result == "already_checked_in":
+            return HttpResponse(
+                status=409, content=content, content_type="application/json"
+            )
+
+        return HttpResponse(
+            status=200, content=content, content_type="application/json"
+        )
+
+
+class ActivityCalendarView(View):
+    """
+    View to handle the calendar feed of the schedule of an event. It is public, so
+    calendar clients can subscribe to it without a session.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to return the schedule as an iCalendar file, or a 304
+        response when the client already has the current one.
+        """
+        try:
+            event = request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        calendar = ActivityService.get_calendar(event)
+        response = HttpResponse(
+            content=calendar["content"], content_type="text/calendar; charset=utf-8"
+        )
+        response["ETag"] = calendar["etag"]
+        response["Last-Modified"] = http_date(calendar["last_modified"])
+
+        return get_conditional_response(
+            request,
+            etag=calendar["etag"],
+            last_modified=calendar["last_modified"],
+            response=response,
+        )
+
+
+class ActivityImportView(View):
+    """
+    View to handle the import of activities into an event.
+    """
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests to create activities from an uploaded CSV or iCalendar
+        file.
+        """
+        try:
+            event = request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if request.user.is_authenticated is False:
+            return HttpResponse(status=401)
+
+        if not request.event_context.is_admin:
+            return HttpResponse(status=403)
+
+        file = request.FILES.get("file")
+
+        if file is None:
+            return HttpResponse(status=400)
+
+        import_format = request.GET.get("format") or os.path.splitext(file.name)[1][1:]
+
+        try:
+            rows = ActivityService.read_import_rows(
+                io.TextIOWrapper(file, encoding="utf-8", newline=""),
+                import_format.lower(),
+            )
+            created, rejected = ActivityService.import_activities(event, rows)
+
+        except (ValueError, UnicodeDecodeError, csv.Error):
+            return HttpResponse(status=400)
+
+        return HttpResponse(
+            status=200,
+            content=json.dumps({"created": created, "rejected": rejected}),
+            content_type="application/json",
+        )
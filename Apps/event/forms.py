@@ -4,7 +4,7 @@ from .models import Event
 class EventForm(forms.ModelForm):
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['hidden']
         labels = {
             'name': 'Event Name',
             'AppName': 'App Name',
@@ -58,3 +58,28 @@ class EventForm(forms.ModelForm):
         for field in self.fields.values():
             if field.widget is not None:
                 field.widget.attrs.update({'class': 'form-input'})
+
+
+class EventCloneForm(forms.Form):
+    """
+    Form with the name and start date of the new edition of an event.
+    """
+    name = forms.CharField(max_length=255, label='Event Name')
+    start_date = forms.DateTimeField(
+        label='Start Date',
+        help_text='Activities and deadlines keep their distance to the start date.',
+        widget=forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.update({'class': 'form-input'})
+
+    def clean_name(self):
+        name = self.cleaned_data['name']
+
+        if Event.objects.filter(name=name).exists():
+            raise forms.ValidationError('Event with this Event Name already exists.')
+
+        return name
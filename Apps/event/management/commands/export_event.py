@@ -0,0 +1,38 @@
+import gzip
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from Apps.event.services import EVENT_SNAPSHOT_BATCH_SIZE, EventService
+
+
+class Command(BaseCommand):
+    """
+    Archives one event to a gzip compressed JSONL file: the event, its participants
+    and their users, teams, projects, valorations, activities with attendance,
+    hardware, warehouses and luggage. Media files are referenced by their path.
+    """
+
+    help = "Export an event and everything related to it to a .jsonl.gz archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_id")
+        parser.add_argument("file")
+        parser.add_argument(
+            "--batch-size", type=int, default=EVENT_SNAPSHOT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = EventService.get_event(options["event_id"])
+
+        except (ValueError, ValidationError):
+            raise CommandError("Event not found")
+
+        with gzip.open(options["file"], "wt", encoding="utf-8") as file:
+            written = EventService.export_event_snapshot(
+                event.id, file, batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{written} rows of {event.name} exported")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from Apps.event.services import EVENT_DELETION_BATCH_SIZE, EventService
+
+
+class Command(BaseCommand):
+    """
+    Resumes the event deletions that did not finish, for example because the server
+    restarted while their background thread was running.
+    """
+
+    help = "Resume the unfinished background deletions of events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=EVENT_DELETION_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        for deletion in EventService.get_unfinished_event_deletions():
+            deletion = EventService.run_event_deletion(
+                deletion.event_id, batch_size=options["batch_size"]
+            )
+            self.stdout.write(
+                f"Deleted event {deletion.event_id}: {deletion.deleted} rows"
+            )
@@ -0,0 +1,31 @@
+import gzip
+from django.core.serializers.base import DeserializationError
+from django.core.management.base import BaseCommand, CommandError
+
+from Apps.event.services import EVENT_SNAPSHOT_BATCH_SIZE, EventService
+
+
+class Command(BaseCommand):
+    """
+    Restores an event from an archive written by the export_event command.
+    """
+
+    help = "Restore an event from a .jsonl.gz archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument(
+            "--batch-size", type=int, default=EVENT_SNAPSHOT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with gzip.open(options["file"], "rt", encoding="utf-8") as file:
+                event = EventService.restore_event_snapshot(
+                    file, batch_size=options["batch_size"]
+                )
+
+        except (ValueError, DeserializationError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(f"Event {event.name} restored"))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0002_event_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDeletion',
+            fields=[
+                ('event_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('step', models.CharField(blank=True, default='', max_length=50)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='hidden',
+            field=models.BooleanField(default=False),
+        ),
+    ]
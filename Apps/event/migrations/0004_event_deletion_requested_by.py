@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('event', '0003_event_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventdeletion',
+            name='requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
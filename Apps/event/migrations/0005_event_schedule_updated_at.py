@@ -0,0 +1,19 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0004_event_deletion_requested_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='schedule_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+TRIGRAM_FIELDS = ("name", "AppName")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Creates trigram indexes on the name and app name of the events, for substring
+    searches. They need the pg_trgm extension, so they are skipped on servers
+    that do not ship it, where the searches still work without an index.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+
+        if cursor.fetchone() is None:
+            return
+
+    Event = apps.get_model("event", "Event")
+    quote_name = schema_editor.quote_name
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for field in TRIGRAM_FIELDS:
+        # The expression matches the UPPER(...) LIKE that icontains compiles to
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote_name(f'event_{field.lower()}_trgm_idx')} "
+            f"ON {quote_name(Event._meta.db_table)} "
+            f"USING gin ((UPPER({quote_name(field)}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS "
+            f"{schema_editor.quote_name(f'event_{field.lower()}_trgm_idx')}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_event_schedule_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
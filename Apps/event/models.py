@@ -1,7 +1,10 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.forms import ValidationError
+from django.utils.timezone import now
 from .Enums.timezoneEnum import TimezoneEnum
+from .search import event_search_vector
 
 # Create your models here.
 class Event(models.Model):
@@ -30,6 +33,8 @@ class Event(models.Model):
     warehouse_enabled = models.BooleanField(default=False)
     hardware_enabled = models.BooleanField(default=False)
     judging_enabled = models.BooleanField(default=False)
+    hidden = models.BooleanField(default=False)
+    schedule_updated_at = models.DateTimeField(default=now, editable=False)
 
     def clean(self):
         """
@@ -55,3 +60,39 @@ class Event(models.Model):
 
         if errors:
             raise ValidationError(errors)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start_date", "id"], name="event_start_idx"),
+            models.Index(fields=["end_date", "id"], name="event_end_idx"),
+            GinIndex(event_search_vector(), name="event_search_idx"),
+        ]
+
+
+class EventDeletion(models.Model):
+    """
+    Model representing the background deletion of an event. It outlives the event,
+    so its progress can still be read and an interrupted deletion can be resumed.
+    """
+    event_id = models.UUIDField(primary_key=True, editable=False)
+    step = models.CharField(max_length=50, blank=True, default="")
+    deleted = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    requested_by = models.ForeignKey(
+        "users.CustomUser", on_delete=models.SET_NULL, blank=True, null=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def progress(self):
+        """
+        Returns the percentage of rows deleted, 100 only once the deletion finished.
+        """
+        if self.finished_at:
+            return 100
+
+        if not self.total:
+            return 0
+
+        return min(99, self.deleted * 100 // self.total)
@@ -0,0 +1,50 @@
+from django.contrib.postgres.search import SearchRank, SearchVector
+from django.db.models import DecimalField, Q
+from django.db.models.functions import Cast
+
+from Apps.users.search import SEARCH_CONFIG, SUBSTRING_MIN_LENGTH, user_search_query
+
+EVENT_SEARCH_FIELDS = ("name", "AppName")
+
+
+def event_search_vector():
+    """
+    Returns the full-text search vector over the name and app name of an event.
+    """
+    return SearchVector(*EVENT_SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def event_search_query(search):
+    """
+    Returns a prefix full-text query matching every word of the search, built the
+    same way as the user search, or None if the search has no searchable words.
+    """
+    return user_search_query(search)
+
+
+def event_search_filter(query, search):
+    """
+    Returns the filter of an event search: the full-text query, or the search found
+    anywhere in the name or app name, such as the end of a compound app name, which
+    the prefix query cannot match. The trigram indexes of the events table serve
+    the second part.
+    """
+    condition = Q(search=query)
+    search = search.strip()
+
+    if len(search) >= SUBSTRING_MIN_LENGTH:
+        for field in EVENT_SEARCH_FIELDS:
+            condition |= Q(**{field + "__icontains": search})
+
+    return condition
+
+
+def event_search_rank(query):
+    """
+    Returns the relevance of an event for a query, as an exact decimal so it can be
+    used in pagination cursors.
+    """
+    return Cast(
+        SearchRank(event_search_vector(), query),
+        output_field=DecimalField(max_digits=12, decimal_places=8),
+    )
@@ -1,9 +1,72 @@
-from django.db.models import Q
+import threading
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from django.core import serializers
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Q
 from django.forms import model_to_dict
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import now
-from .models import Event
+from Apps.activity.models import Activity, Attendance
+from Apps.hardware.models import HardwareItem, HardwareLoan
+from Apps.participant.models import PARTICIPANT_MODELS, ParticipantRegistry
+from Apps.project.models import Project, Valoration
+from Apps.team.models import Team
+from Apps.users.models import CustomUser
+from Apps.warehouse.models import Luggage, Warehouse
+from .models import Event, EventDeletion
+from .search import (
+    event_search_filter,
+    event_search_query,
+    event_search_rank,
+    event_search_vector,
+)
 from .Enums.timezoneEnum import TimezoneEnum  # Adjust the import path as needed
 
+EVENT_CACHE_TIMEOUT = 60 * 60
+
+EVENT_CACHE_STATS = Counter()
+
+EVENTS_PAGE_SIZE = 25
+
+EVENT_DELETION_BATCH_SIZE = 500
+
+EVENT_SNAPSHOT_BATCH_SIZE = 2000
+
+EVENT_SNAPSHOT_USER_FIELDS = (
+    "email",
+    "emailVerified",
+    "username",
+    "first_name",
+    "last_name",
+    "gender",
+    "gender_other",
+    "pronoun",
+    "date_of_birth",
+    "dietary",
+    "dietary_other",
+    "origin",
+)
+
+EVENT_DATE_FIELDS = (
+    "start_date",
+    "end_date",
+    "hacker_deadline",
+    "mentor_deadline",
+    "volunteer_deadline",
+    "sponsor_deadline",
+)
+
+EVENT_LIST_ORDERINGS = {
+    None: ("-start_date", "-id"),
+    "upcoming": ("start_date", "id"),
+    "ongoing": ("end_date", "id"),
+    "past": ("-end_date", "-id"),
+}
+
 
 class EventService:
     @staticmethod
@@ -12,13 +75,153 @@ class EventService:
         event.save()
         return event
 
+    @staticmethod
+    def clone_event(event_id, name, start_date):
+        """
+        This method copies an event, with its activities, hardware items and
+        warehouses, into a new edition that starts at start_date. Every date is
+        shifted by the same offset. Participants and everything they own are not
+        copied. Each table is copied with one bulk insert, in one transaction.
+        """
+        source = EventService.get_event(event_id)
+        offset = start_date - source.start_date
+
+        with transaction.atomic():
+            event = Event.objects.get(id=source.id)
+            event.id = uuid.uuid4()
+            event.name = name
+            event.schedule_updated_at = now()
+            event._state.adding = True
+
+            for field in EVENT_DATE_FIELDS:
+                setattr(event, field, getattr(event, field) + offset)
+
+            event.save(force_insert=True)
+
+            Activity.objects.bulk_create(
+                [
+                    Activity(
+                        name=activity.name,
+                        type=activity.type,
+                        description=activity.description,
+                        capacity=activity.capacity,
+                        start_date=activity.start_date + offset,
+                        end_date=activity.end_date + offset,
+                        event=event,
+                    )
+                    for activity in Activity.objects.filter(event_id=source.id)
+                ]
+            )
+            HardwareItem.objects.bulk_create(
+                [
+                    HardwareItem(
+                        name=item.name,
+                        description=item.description,
+                        quantity=item.quantity,
+                        abreviation=item.abreviation,
+                        image=item.image,
+                        event=event,
+                    )
+                    for item in HardwareItem.objects.filter(event_id=source.id)
+                ]
+            )
+            Warehouse.objects.bulk_create(
+                [
+                    Warehouse(
+                        name=warehouse.name,
+                        rows=warehouse.rows,
+                        columns=warehouse.columns,
+                        event=event,
+                    )
+                    for warehouse in Warehouse.objects.filter(event_id=source.id)
+                ]
+            )
+
+        return event
+
     @staticmethod
     def get_event(event_id):
+        """
+        This method returns an event, read through the cache. The cached copy is
+        stored under the version stamp of the event, which changes whenever the
+        event is saved or deleted.
+        """
         try:
-            return Event.objects.get(id=event_id)
-        except Event.DoesNotExist:
+            event_id = uuid.UUID(str(event_id))
+        except ValueError:
+            raise ValueError("Event not found")
+
+        version = EventService.get_event_cache_version(event_id)
+        event = cache.get(f"event:{event_id}", version=version)
+
+        if event is None:
+            EVENT_CACHE_STATS["misses"] += 1
+
+            try:
+                event = Event.objects.get(id=event_id)
+            except Event.DoesNotExist:
+                raise ValueError("Event not found")
+
+            cache.set(
+                f"event:{event_id}", event, EVENT_CACHE_TIMEOUT, version=version
+            )
+
+        else:
+            EVENT_CACHE_STATS["hits"] += 1
+
+        if event.hidden:
             raise ValueError("Event not found")
 
+        return event
+
+    @staticmethod
+    def get_event_cache_version(event_id):
+        """
+        This method returns the version stamp of the cached event. It lives in the
+        cache, so every worker sharing the cache agrees on it.
+        """
+        return cache.get_or_set(f"event-version:{event_id}", time.time_ns, None)
+
+    @staticmethod
+    def invalidate_event(event_id):
+        """
+        This method gives the event a new version stamp, so no worker reads the
+        cached copy again.
+        """
+        cache.set(f"event-version:{uuid.UUID(str(event_id))}", time.time_ns(), None)
+
+    @staticmethod
+    def get_check_in_version(event_id):
+        """
+        This method returns the version stamp of the check-ins of an event, which
+        changes on every check-in, so reports cached under it expire with it.
+        """
+        return cache.get_or_set(
+            f"event-check-ins:{uuid.UUID(str(event_id))}", time.time_ns, None
+        )
+
+    @staticmethod
+    def touch_check_ins(event_id):
+        """
+        This method gives the check-ins of an event a new version stamp.
+        """
+        cache.set(
+            f"event-check-ins:{uuid.UUID(str(event_id))}", time.time_ns(), None
+        )
+
+    @staticmethod
+    def get_event_cache_stats():
+        """
+        This method returns the event cache hits and misses of this process.
+        """
+        hits = EVENT_CACHE_STATS["hits"]
+        misses = EVENT_CACHE_STATS["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0,
+        }
+
     @staticmethod
     def update_event(event_id, updated_data):
         event = Event.objects.get(id=event_id)
@@ -28,34 +231,491 @@ class EventService:
         return event
 
     @staticmethod
-    def delete_event(event_id):
+    def delete_event(event_id, user=None):
+        """
+        This method hides an event right away and deletes its rows in the background.
+        It returns the deletion, which holds the progress and the user who requested
+        it, who can still read the progress once the admins are deleted.
+        """
         event = EventService.get_event(event_id)
-        return event.delete()
+        Event.objects.filter(id=event.id).update(hidden=True)
+        EventService.invalidate_event(event.id)
+        deletion, created = EventDeletion.objects.get_or_create(
+            event_id=event.id, defaults={"requested_by": user}
+        )
+        transaction.on_commit(lambda: EventService.start_event_deletion(event.id))
+        return deletion
+
+    @staticmethod
+    def start_event_deletion(event_id):
+        """
+        This method runs the deletion of an event in a background thread.
+        """
+        thread = threading.Thread(
+            target=EventService.run_event_deletion_thread, args=(event_id,), daemon=True
+        )
+        thread.start()
+        return thread
+
+    @staticmethod
+    def run_event_deletion_thread(event_id):
+        try:
+            EventService.run_event_deletion(event_id)
+
+        finally:
+            connection.close()
+
+    @staticmethod
+    def get_event_deletion_steps(event_id):
+        """
+        This method returns the rows of an event, grouped in the order they are
+        deleted: children first, so each batch only removes rows nothing else points
+        to and no batch cascades into other tables.
+        """
+        return [
+            (
+                "valorations",
+                Valoration.objects.filter(project__team__event_id=event_id),
+            ),
+            ("projects", Project.objects.filter(team__event_id=event_id)),
+            (
+                "team_members",
+                Team.members.through.objects.filter(team__event_id=event_id),
+            ),
+            ("teams", Team.objects.filter(event_id=event_id)),
+            (
+                "warehouse_luggage",
+                Warehouse.luggage.through.objects.filter(
+                    warehouse__event_id=event_id
+                ),
+            ),
+            ("luggage", Luggage.objects.filter(owner__event_id=event_id)),
+            ("warehouses", Warehouse.objects.filter(event_id=event_id)),
+            (
+                "attendances",
+                Attendance.objects.filter(activity__event_id=event_id),
+            ),
+            ("activities", Activity.objects.filter(event_id=event_id)),
+            (
+                "hardware_loans",
+                HardwareLoan.objects.filter(item__event_id=event_id),
+            ),
+            ("hardware", HardwareItem.objects.filter(event_id=event_id)),
+            *(
+                (type.lower(), model.objects.filter(event_id=event_id))
+                for type, model in PARTICIPANT_MODELS.items()
+            ),
+            ("registry", ParticipantRegistry.objects.filter(event_id=event_id)),
+            ("event", Event.objects.filter(id=event_id)),
+        ]
+
+    @staticmethod
+    def run_event_deletion(event_id, batch_size=EVENT_DELETION_BATCH_SIZE):
+        """
+        This method deletes the rows of an event in batches, committing after each
+        one, and records the progress. It can be run again to resume a deletion
+        that was interrupted.
+        """
+        deletion = EventDeletion.objects.get(event_id=event_id)
+        steps = EventService.get_event_deletion_steps(event_id)
+
+        if not deletion.total:
+            deletion.total = sum(queryset.count() for name, queryset in steps)
+            deletion.save(update_fields=["total"])
+
+        for name, queryset in steps:
+            EventDeletion.objects.filter(event_id=event_id).update(step=name)
+
+            while True:
+                with transaction.atomic():
+                    ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+
+                    if not ids:
+                        break
+
+                    if queryset.model in PARTICIPANT_MODELS.values():
+                        # Deleted here rather than by the participant signal, so
+                        # the registry rows count towards the progress
+                        deleted, _ = ParticipantRegistry.objects.filter(
+                            id__in=ids
+                        ).delete()
+
+                    else:
+                        deleted = 0
+
+                    deleted += queryset.model.objects.filter(pk__in=ids).delete()[0]
+                    EventDeletion.objects.filter(event_id=event_id).update(
+                        deleted=F("deleted") + deleted
+                    )
+
+        EventService.invalidate_event(event_id)
+        EventDeletion.objects.filter(event_id=event_id).update(
+            step="", finished_at=now()
+        )
+        deletion.refresh_from_db()
+        return deletion
+
+    @staticmethod
+    def get_event_snapshot_querysets(event_id):
+        """
+        This method returns the rows of an event and of the users of its
+        participants, parents first, so they can be inserted back in the same order.
+        Many-to-many relations are exported as rows of their through tables.
+        """
+        return [
+            Event.objects.filter(id=event_id),
+            CustomUser.objects.filter(
+                id__in=ParticipantRegistry.objects.filter(event_id=event_id).values(
+                    "user_id"
+                )
+            ),
+            *(
+                model.objects.filter(event_id=event_id)
+                for model in PARTICIPANT_MODELS.values()
+            ),
+            ParticipantRegistry.objects.filter(event_id=event_id),
+            Team.objects.filter(event_id=event_id),
+            Team.members.through.objects.filter(team__event_id=event_id),
+            Project.objects.filter(team__event_id=event_id),
+            Valoration.objects.filter(project__team__event_id=event_id),
+            Activity.objects.filter(event_id=event_id),
+            Attendance.objects.filter(activity__event_id=event_id),
+            HardwareItem.objects.filter(event_id=event_id),
+            HardwareLoan.objects.filter(item__event_id=event_id),
+            Warehouse.objects.filter(event_id=event_id),
+            Luggage.objects.filter(owner__event_id=event_id),
+            Warehouse.luggage.through.objects.filter(warehouse__event_id=event_id),
+        ]
+
+    @staticmethod
+    def export_event_snapshot(event_id, stream, batch_size=EVENT_SNAPSHOT_BATCH_SIZE):
+        """
+        This method writes an event and everything related to it to a stream, one
+        JSON object per line. Rows are read in chunks, so memory does not grow with
+        the size of the event. Images are exported as their media paths. Users are
+        exported with their profile fields only, without passwords or permissions.
+        It returns the number of rows written.
+        """
+        event = EventService.get_event(event_id)
+        written = 0
+
+        for queryset in EventService.get_event_snapshot_querysets(event.id):
+            if queryset.model is CustomUser:
+                fields = EVENT_SNAPSHOT_USER_FIELDS
+
+            else:
+                fields = [
+                    field.name
+                    for field in queryset.model._meta.concrete_fields
+                    if not field.primary_key
+                ]
+
+            serializer = serializers.get_serializer("jsonl")()
+            serializer.serialize(
+                queryset.order_by("pk").iterator(chunk_size=batch_size),
+                stream=stream,
+                fields=fields,
+            )
+            written += queryset.count()
+
+        return written
+
+    @staticmethod
+    def restore_event_snapshot(stream, batch_size=EVENT_SNAPSHOT_BATCH_SIZE):
+        """
+        This method loads an event exported by export_event_snapshot, in one
+        transaction. Rows are read line by line and inserted in batches, so memory
+        does not grow with the size of the event. Users are matched by email: an
+        existing user is kept and the rows of the event point to it, a missing one is
+        created without a usable password. It returns the restored event, or raises
+        ValueError if it already exists or a username belongs to another user.
+        """
+        event_id = None
+        batch = []
+        user_ids = {}
+        user_fields = {}
+
+        def flush():
+            model = type(batch[0])
+
+            if model is CustomUser:
+                EventService.restore_snapshot_users(batch, user_ids)
+
+            else:
+                model.objects.bulk_create(batch, batch_size=batch_size)
+
+            batch.clear()
+
+        with transaction.atomic():
+            for deserialized in serializers.deserialize("jsonl", stream):
+                row = deserialized.object
+
+                if isinstance(row, Event):
+                    if Event.objects.filter(id=row.id).exists():
+                        raise ValueError("Event already exists")
+
+                    event_id = row.id
+
+                if batch and (
+                    type(batch[0]) is not type(row) or len(batch) >= batch_size
+                ):
+                    flush()
+
+                if type(row) not in user_fields:
+                    user_fields[type(row)] = [
+                        field.attname
+                        for field in type(row)._meta.concrete_fields
+                        if field.is_relation and field.related_model is CustomUser
+                    ]
+
+                for attname in user_fields[type(row)]:
+                    user_id = getattr(row, attname)
+                    setattr(row, attname, user_ids.get(user_id, user_id))
+
+                batch.append(row)
+
+            if event_id is None:
+                raise ValueError("Snapshot has no event")
+
+            if batch:
+                flush()
+
+        EventService.invalidate_event(event_id)
+        return Event.objects.get(id=event_id)
+
+    @staticmethod
+    def restore_snapshot_users(users, user_ids):
+        """
+        This method restores a batch of snapshot users. Users whose email already
+        exists are not touched, the others are created without a usable password
+        and with a new id if theirs is taken. The id each snapshot user ends up with
+        is recorded in user_ids. It raises ValueError if a username to create belongs
+        to another user.
+        """
+        existing = dict(
+            CustomUser.objects.filter(
+                email__in=[user.email for user in users]
+            ).values_list("email", "id")
+        )
+        new_users = []
+
+        for user in users:
+            if user.email in existing:
+                user_ids[user.id] = existing[user.email]
+
+            else:
+                new_users.append(user)
+
+        taken_username = (
+            CustomUser.objects.filter(
+                username__in=[user.username for user in new_users]
+            )
+            .values_list("username", flat=True)
+            .first()
+        )
+
+        if taken_username is not None:
+            raise ValueError(
+                f"Username already belongs to another user: {taken_username}"
+            )
+
+        taken_ids = set(
+            CustomUser.objects.filter(
+                id__in=[user.id for user in new_users]
+            ).values_list("id", flat=True)
+        )
+
+        for user in new_users:
+            snapshot_id = user.id
+
+            if user.id in taken_ids:
+                user.id = uuid.uuid4()
+
+            user.set_unusable_password()
+            user_ids[snapshot_id] = user.id
+
+        CustomUser.objects.bulk_create(new_users)
+
+    @staticmethod
+    def get_event_deletion(event_id):
+        """
+        This method returns the deletion of an event, or None if it was not deleted.
+        """
+        try:
+            event_id = uuid.UUID(str(event_id))
+
+        except ValueError:
+            return None
+
+        return EventDeletion.objects.filter(event_id=event_id).first()
+
+    @staticmethod
+    def get_unfinished_event_deletions():
+        """
+        This method returns the deletions that have not finished, oldest first.
+        """
+        return EventDeletion.objects.filter(finished_at__isnull=True).order_by(
+            "created_at"
+        )
 
     @staticmethod
     def get_first_100_events():
         """
         Retrieve the first 100 events from the database.
         """
-        events = Event.objects.all()[:100]
+        events = Event.objects.filter(hidden=False)[:100]
         return events
 
     @staticmethod
-    def find_by_name_and_appName(search):
+    def find_by_name_and_appName(search, events=None):
         """
-        Retrieve events by name or appName.
+        Retrieve events by name or appName, ordered by relevance.
         """
-        events = Event.objects.filter(
-            Q(name__icontains=search) | Q(AppName__icontains=search)
+        query = event_search_query(search)
+
+        if events is None:
+            events = Event.objects.filter(hidden=False)
+
+        if query is None:
+            return events.none()
+
+        events = (
+            events.annotate(search=event_search_vector(), rank=event_search_rank(query))
+            .filter(event_search_filter(query, search))
+            .order_by("-rank", "id")
         )
         return events
 
+    @staticmethod
+    def get_events_page(
+        when=None, search=None, cursor=None, page_size=EVENTS_PAGE_SIZE
+    ):
+        """
+        Retrieve a page of events and the cursor of the next page. Events can be
+        filtered as upcoming, ongoing or past, and searched by name and appName.
+        Search results are ordered by relevance, other pages by date.
+        """
+        current_time = now()
+        events = Event.objects.filter(hidden=False)
+
+        if when == "upcoming":
+            events = events.filter(start_date__gt=current_time)
+
+        elif when == "ongoing":
+            events = events.filter(
+                start_date__lte=current_time, end_date__gte=current_time
+            )
+
+        elif when == "past":
+            events = events.filter(end_date__lt=current_time)
+
+        ordering = EVENT_LIST_ORDERINGS[when]
+
+        if search:
+            events = EventService.find_by_name_and_appName(search, events)
+            ordering = ("-rank", "id")
+
+        if cursor:
+            events = events.filter(EventService.after_cursor(ordering, cursor))
+
+        events = list(events.order_by(*ordering)[: page_size + 1])
+
+        if len(events) > page_size:
+            events = events[:page_size]
+            value = getattr(events[-1], ordering[0].lstrip("-"))
+            value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+            return events, value + "|" + str(events[-1].id)
+
+        return events, None
+
+    @staticmethod
+    def after_cursor(ordering, cursor):
+        """
+        Build the filter of the events that come after a cursor in an ordering.
+        """
+        field, tie_field = ordering
+        value, tie_value = cursor
+        lookup = "lt" if field.startswith("-") else "gt"
+        tie_lookup = "lt" if tie_field.startswith("-") else "gt"
+        field, tie_field = field.lstrip("-"), tie_field.lstrip("-")
+        return Q(**{f"{field}__{lookup}": value}) | Q(
+            **{field: value, f"{tie_field}__{tie_lookup}": tie_value}
+        )
+
+    @staticmethod
+    def decode_cursor(cursor, search=False):
+        """
+        Parse an events page cursor, raising ValueError if it is invalid.
+        """
+        value, separator, event_id = cursor.partition("|")
+
+        if not separator:
+            raise ValueError("Invalid cursor")
+
+        if search:
+            try:
+                value = Decimal(value)
+
+            except InvalidOperation:
+                raise ValueError("Invalid cursor")
+
+        else:
+            value = parse_datetime(value)
+
+            if value is None:
+                raise ValueError("Invalid cursor")
+
+        return value, uuid.UUID(event_id)
+
     @staticmethod
     def get_opened_applications(event_id):
         """
         This method returns the list of opened applications for a specific event.
+        The result is cached until the next deadline passes, under the version
+        stamp of the event, so editing the event also recomputes it.
         """
+        try:
+            event_id = uuid.UUID(str(event_id))
+        except ValueError:
+            raise ValueError("Event not found")
+
+        key = f"event-applications:{event_id}"
+        version = EventService.get_event_cache_version(event_id)
+        opened_applications = cache.get(key, version=version)
+
+        if opened_applications is not None:
+            return opened_applications
+
         event = EventService.get_event(event_id)
+        current_time = now()
+        opened_applications = EventService.compute_opened_applications(
+            event, current_time
+        )
+        boundaries = [
+            date
+            for date in (
+                event.end_date,
+                event.hacker_deadline,
+                event.mentor_deadline,
+                event.sponsor_deadline,
+                event.volunteer_deadline,
+            )
+            if date >= current_time
+        ]
+        timeout = None
+
+        if boundaries:
+            # Rounded down, so the result never outlives the deadline
+            timeout = int((min(boundaries) - current_time).total_seconds())
+
+        cache.set(key, opened_applications, timeout, version=version)
+        return opened_applications
+
+    @staticmethod
+    def compute_opened_applications(event, current_time):
+        """
+        This method computes which applications of an event are opened at a time.
+        """
         opened_applications = {
             "hacker_applications": False,
             "mentor_applications": False,
@@ -63,31 +723,31 @@ class EventService:
             "volunteer_applications": False,
         }
 
-        if event.end_date < now():
+        if event.end_date < current_time:
             return opened_applications
 
-        if event.hacker_deadline > now():
+        if event.hacker_deadline > current_time:
             opened_applications.update(
                 {
                     "hacker_applications": True,
                 }
             )
 
-        if event.mentor_deadline > now():
+        if event.mentor_deadline > current_time:
             opened_applications.update(
                 {
                     "mentor_applications": True,
                 }
             )
 
-        if event.sponsor_deadline > now():
+        if event.sponsor_deadline > current_time:
             opened_applications.update(
                 {
                     "sponsor_applications": True,
                 }
             )
 
-        if event.volunteer_deadline > now():
+        if event.volunteer_deadline > current_time:
             opened_applications.update(
                 {
                     "volunteer_applications": True,
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Event
+from .services import EventService
+
+
+def invalidate_event(sender, instance, **kwargs):
+    """
+    Drops the cached copy of a saved or deleted event, right away and again once
+    the transaction commits, so a read in between cannot cache the old row.
+    """
+    EventService.invalidate_event(instance.id)
+    transaction.on_commit(lambda: EventService.invalidate_event(instance.id))
+
+
+post_save.connect(invalidate_event, sender=Event)
+post_delete.connect(invalidate_event, sender=Event)
@@ -1,10 +1,25 @@
+import gzip
+import io
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+from django.utils.timezone import now
 
-from Apps.event.models import Event
+from Apps.activity.models import Activity
+from Apps.activity.services import ActivityService
+from Apps.event.models import Event, EventDeletion
+from Apps.hardware.models import HardwareItem
 from Apps.event.services import EventService
 from Apps.event.forms import EventForm
 from Apps.participant.models import Admin
+from Apps.participant.services import ParticipantService
 from Apps.users.models import CustomUser
+from Apps.warehouse.models import Warehouse
 
 
 # Create your tests here.
@@ -116,6 +131,32 @@ class ServiceEventTestCase(TestCase):
         self.assertEqual(Event.objects.count(), 2)
         self.assertIsNotNone(Event.objects.filter(name="Service Test Event 2").first())
 
+    def test_event_service_get_event_cache(self):
+        event = Event.objects.create(**self.event_data2)
+        EventService.get_event(event.id)
+        stats = EventService.get_event_cache_stats()
+
+        with self.assertNumQueries(0):
+            cached_event = EventService.get_event(str(event.id))
+
+        self.assertEqual(cached_event, event)
+        self.assertEqual(
+            EventService.get_event_cache_stats()["hits"], stats["hits"] + 1
+        )
+
+        EventService.update_event(event.id, {"name": "Updated Event"})
+        self.assertEqual(EventService.get_event(event.id).name, "Updated Event")
+        self.assertEqual(
+            EventService.get_event_cache_stats()["misses"], stats["misses"] + 1
+        )
+
+        event.delete()
+        with self.assertRaises(ValueError):
+            EventService.get_event(event.id)
+
+        with self.assertRaises(ValueError):
+            EventService.get_event("invalid")
+
     def test_event_service_get_event(self):
         event = Event.objects.create(**self.event_data2)
         retrieved_event = EventService.get_event(event.id)
@@ -164,6 +205,94 @@ class ServiceEventTestCase(TestCase):
         events = EventService.get_first_100_events()
         self.assertEqual(events.count(), 0)
 
+    def test_clone_event(self):
+        Activity.objects.create(
+            name="Opening",
+            type="MEAL",
+            start_date="2023-10-01T10:00:00Z",
+            end_date="2023-10-01T11:00:00Z",
+            event=self.event,
+        )
+        HardwareItem.objects.create(
+            name="Arduino", quantity=5, event=self.event
+        )
+        Warehouse.objects.create(name="Hall", rows=3, columns=4, event=self.event)
+        self.event.refresh_from_db()
+        start_date = self.event.start_date + timedelta(days=365)
+
+        with self.assertNumQueries(11):
+            clone = EventService.clone_event(
+                self.event.id, "Service Test Event 2024", start_date
+            )
+
+        self.assertNotEqual(clone.id, self.event.id)
+        self.assertEqual(clone.name, "Service Test Event 2024")
+        self.assertEqual(clone.AppName, self.event.AppName)
+        self.assertEqual(clone.start_date, start_date)
+        self.assertEqual(
+            clone.end_date, self.event.end_date + timedelta(days=365)
+        )
+        self.assertEqual(
+            clone.hacker_deadline, self.event.hacker_deadline + timedelta(days=365)
+        )
+
+        activity = Activity.objects.get(event=clone)
+        self.assertEqual(activity.name, "Opening")
+        self.assertEqual(activity.start_date.year, 2024)
+        self.assertEqual(
+            HardwareItem.objects.get(event=clone).quantity_available, 5
+        )
+        self.assertEqual(Warehouse.objects.get(event=clone).columns, 4)
+        self.assertEqual(Activity.objects.filter(event=self.event).count(), 1)
+
+    def test_run_event_deletion(self):
+        Activity.objects.bulk_create(
+            [
+                Activity(
+                    name=f"Activity {index}",
+                    type="MEAL",
+                    start_date=self.event.start_date,
+                    end_date=self.event.end_date,
+                    event=self.event,
+                )
+                for index in range(3)
+            ]
+        )
+        user = CustomUser.objects.create(
+            email="deletion@a.com",
+            username="deletion",
+            first_name="deletion",
+            last_name="a",
+            gender="OTHER",
+            pronoun="they/them",
+            date_of_birth="2000-01-01",
+            dietary="NONE",
+            origin="Spain",
+        )
+        ParticipantService.create_default_admin(self.event, user)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            deletion = EventService.delete_event(self.event.id)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(deletion.progress, 0)
+        self.assertTrue(Event.objects.get(id=self.event.id).hidden)
+
+        with self.assertRaises(ValueError):
+            EventService.get_event(self.event.id)
+
+        deletion = EventService.run_event_deletion(self.event.id, batch_size=2)
+
+        self.assertEqual(deletion.total, 6)
+        self.assertEqual(deletion.deleted, 6)
+        self.assertEqual(deletion.progress, 100)
+        self.assertFalse(Event.objects.filter(id=self.event.id).exists())
+        self.assertFalse(Activity.objects.filter(event_id=self.event.id).exists())
+        self.assertFalse(EventService.get_unfinished_event_deletions().exists())
+
+        deletion = EventService.run_event_deletion(self.event.id)
+        self.assertEqual(deletion.deleted, 6)
+
     def test_find_by_name_and_appName(self):
         search = "UnknownName"
         events = EventService.find_by_name_and_appName(search)
@@ -181,6 +310,58 @@ class ServiceEventTestCase(TestCase):
         self.assertEqual(events.first().name, "Service Test Event")
         self.assertEqual(events.first().AppName, "ServiceTestApp")
 
+    def test_get_events_page(self):
+        current_time = now()
+        ongoing = Event.objects.create(
+            **{
+                **self.event_data2,
+                "start_date": current_time - timedelta(days=1),
+                "end_date": current_time + timedelta(days=1),
+            }
+        )
+        upcoming = []
+
+        for day in range(1, 4):
+            upcoming.append(
+                Event.objects.create(
+                    **{
+                        **self.event_data2,
+                        "name": f"Upcoming Event {day}",
+                        "start_date": current_time + timedelta(days=day),
+                        "end_date": current_time + timedelta(days=day + 1),
+                    }
+                )
+            )
+
+        events, cursor = EventService.get_events_page(when="past")
+        self.assertEqual(events, [self.event])
+        self.assertIsNone(cursor)
+
+        events, cursor = EventService.get_events_page(when="ongoing")
+        self.assertEqual(events, [ongoing])
+
+        events, cursor = EventService.get_events_page(when="upcoming", page_size=2)
+        self.assertEqual(events, upcoming[:2])
+        events, cursor = EventService.get_events_page(
+            when="upcoming", cursor=EventService.decode_cursor(cursor), page_size=2
+        )
+        self.assertEqual(events, upcoming[2:])
+        self.assertIsNone(cursor)
+
+        events, cursor = EventService.get_events_page(
+            search="Upcoming", page_size=2
+        )
+        self.assertEqual(len(events), 2)
+        events, cursor = EventService.get_events_page(
+            search="Upcoming",
+            cursor=EventService.decode_cursor(cursor, search=True),
+            page_size=2,
+        )
+        self.assertEqual(len(events), 1)
+
+        with self.assertRaises(ValueError):
+            EventService.decode_cursor("invalid|cursor")
+
     def test_get_opened_applications(self):
         opened_applications = EventService.get_opened_applications(self.event.id)
         self.assertFalse(opened_applications["hacker_applications"])
@@ -221,6 +402,28 @@ class ServiceEventTestCase(TestCase):
         self.assertTrue(opened_applications["sponsor_applications"])
         self.assertTrue(opened_applications["volunteer_applications"])
 
+    def test_get_opened_applications_cache(self):
+        current_time = now()
+        self.event.end_date = current_time + timedelta(days=2)
+        self.event.hacker_deadline = current_time + timedelta(hours=1)
+        self.event.save()
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            opened_applications = EventService.get_opened_applications(self.event.id)
+
+        self.assertTrue(opened_applications["hacker_applications"])
+        self.assertFalse(opened_applications["mentor_applications"])
+        timeout = cache_set.call_args_list[-1][0][2]
+        self.assertTrue(3590 <= timeout <= 3600)
+
+        with self.assertNumQueries(0):
+            EventService.get_opened_applications(self.event.id)
+
+        self.event.mentor_deadline = current_time + timedelta(minutes=30)
+        self.event.save()
+        opened_applications = EventService.get_opened_applications(self.event.id)
+        self.assertTrue(opened_applications["mentor_applications"])
+
     def test_service_event_to_dict(self):
         event_dict = EventService.event_to_dict(self.event)
         print(event_dict)
@@ -328,6 +531,22 @@ class ViewsEventTestCase(TestCase):
         self.assertTemplateUsed(response, "events.html")
         self.assertEqual(len(response.context["events"]), 0)
 
+        response = self.client.get("/event/?when=past")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.event, response.context["events"])
+        self.assertIn("private", response["Cache-Control"])
+
+        response = self.client.get("/event/?when=invalid")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get("/event/?cursor=invalid")
+        self.assertEqual(response.status_code, 400)
+
+        self.client.logout()
+        response = self.client.get("/event/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+
     def test_event_CRUD_view_get(self):
         """
         Test the EventCRUDView GET method for loading an event.
@@ -419,6 +638,78 @@ class ViewsEventTestCase(TestCase):
         response = self.client.delete(f"/event/{self.event.id}/")
         self.assertEqual(response.status_code, 204)
 
+    def test_event_clone_view_post(self):
+        """
+        Test the EventCloneView POST method for cloning an event.
+        """
+        data = {"name": "View Test Event 2024", "start_date": "2024-10-01T09:00"}
+        response = self.client.post(f"/event/{self.event.id}/clone/", data)
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        response = self.client.post(f"/event/{self.event.id}/clone/", data)
+        self.assertEqual(response.status_code, 403)
+
+        ParticipantService.create_default_admin(self.event, self.user1)
+        response = self.client.get(f"/event/{self.event.id}/clone/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "eventClone.html")
+
+        with mock.patch.object(
+            ParticipantService, "create_default_admin", side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            self.client.post(f"/event/{self.event.id}/clone/", data)
+
+        self.assertFalse(Event.objects.filter(name="View Test Event 2024").exists())
+
+        response = self.client.post(f"/event/{self.event.id}/clone/", data)
+        self.assertEqual(response.status_code, 302)
+
+        clone = Event.objects.get(name="View Test Event 2024")
+        self.assertTrue(
+            Admin.objects.filter(event=clone, user=self.user1).exists()
+        )
+
+        response = self.client.post(f"/event/{self.event.id}/clone/", data)
+        self.assertEqual(response.status_code, 400)
+
+    def test_event_deletion_view_get(self):
+        """
+        Test the EventDeletionView GET method for the progress of a deletion.
+        """
+        response = self.client.get(f"/event/{self.event.id}/deletion/")
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        response = self.client.get(f"/event/{self.event.id}/deletion/")
+        self.assertEqual(response.status_code, 403)
+
+        admin = ParticipantService.create_default_admin(self.event, self.user1)
+        response = self.client.get(f"/event/{self.event.id}/deletion/")
+        self.assertEqual(response.status_code, 404)
+
+        deletion = EventDeletion.objects.create(
+            event_id=self.event.id, total=4, deleted=1
+        )
+        admin.delete()
+        response = self.client.get(f"/event/{self.event.id}/deletion/")
+        self.assertEqual(response.status_code, 403)
+
+        deletion.requested_by = self.user1
+        deletion.save()
+        response = self.client.get(f"/event/{self.event.id}/deletion/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "step": "",
+                "deleted": 1,
+                "total": 4,
+                "progress": 25,
+                "finished": False,
+            },
+        )
+
     def test_event_creation_view_get(self):
         """
         Test the EventCreationView GET method for rendering the event creation form.
@@ -450,3 +741,121 @@ class ViewsEventTestCase(TestCase):
 
         response = self.client.post("/event/create/", self.event_data2)
         self.assertEqual(response.status_code, 302)
+
+
+class CommandEventTestCase(TestCase):
+    def test_export_and_restore_event(self):
+        """
+        Test that an exported event is restored with its related rows
+        """
+        event = Event.objects.create(
+            name="Snapshot Test Event",
+            AppName="SnapshotTestApp",
+            description="This is a snapshot test event.",
+            location="Snapshot Test Location",
+            timezone="UTC",
+            start_date="2023-10-01T09:00:00Z",
+            end_date="2023-10-02T18:00:00Z",
+            hacker_deadline="2023-09-25T23:59:59Z",
+            mentor_deadline="2023-09-26T23:59:59Z",
+            volunteer_deadline="2023-09-27T23:59:59Z",
+            sponsor_deadline="2023-09-28T23:59:59Z",
+            terms_and_conditions_link="https://example.com/terms",
+        )
+        user = CustomUser.objects.create(
+            email="snapshot@a.com",
+            username="snapshot",
+            first_name="snapshot",
+            last_name="a",
+            gender="OTHER",
+            pronoun="they/them",
+            date_of_birth="2000-01-01",
+            dietary="NONE",
+            origin="Spain",
+            is_staff=True,
+            is_superuser=True,
+        )
+        user.set_password("123456AA!a")
+        user.save()
+        admin = ParticipantService.create_default_admin(event, user)
+        activity = Activity.objects.create(
+            name="Opening",
+            type="MEAL",
+            start_date="2023-10-01T10:00:00Z",
+            end_date="2023-10-01T11:00:00Z",
+            event=event,
+        )
+        ActivityService.checkin_participant(activity, admin)
+        HardwareItem.objects.create(name="Arduino", quantity=5, event=event)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "event.jsonl.gz")
+            call_command("export_event", str(event.id), path, stdout=io.StringIO())
+
+            with self.assertRaises(CommandError):
+                call_command("restore_event", path, stdout=io.StringIO())
+
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                user_row = next(
+                    line for line in file if '"model": "users.customuser"' in line
+                )
+
+            self.assertIn("snapshot@a.com", user_row)
+            self.assertNotIn("password", user_row)
+            self.assertNotIn("is_superuser", user_row)
+            self.assertNotIn("is_staff", user_row)
+
+            Event.objects.filter(id=event.id).delete()
+            call_command("restore_event", path, batch_size=1, stdout=io.StringIO())
+
+            restored = Event.objects.get(id=event.id)
+            self.assertEqual(restored.name, "Snapshot Test Event")
+            self.assertEqual(Admin.objects.get(event=restored).user, user)
+            self.assertTrue(
+                ActivityService.is_checked_in(
+                    Activity.objects.get(event=restored), admin
+                )
+            )
+            self.assertEqual(
+                HardwareItem.objects.get(event=restored).quantity_available, 5
+            )
+            self.assertEqual(
+                CustomUser.objects.filter(email="snapshot@a.com").count(), 1
+            )
+
+            # A user with the same email under another id gets the participants
+            Event.objects.filter(id=event.id).delete()
+            user.delete()
+            other = CustomUser.objects.create(
+                email="snapshot@a.com",
+                username="snapshot-other",
+                first_name="other",
+                last_name="a",
+                gender="OTHER",
+                pronoun="they/them",
+                date_of_birth="2000-01-01",
+                dietary="NONE",
+                origin="Spain",
+            )
+            call_command("restore_event", path, stdout=io.StringIO())
+            self.assertEqual(Admin.objects.get(event_id=event.id).user, other)
+
+            # A missing user is created without password or permissions
+            Event.objects.filter(id=event.id).delete()
+            other.delete()
+            call_command("restore_event", path, stdout=io.StringIO())
+            restored_user = Admin.objects.get(event_id=event.id).user
+            self.assertEqual(restored_user.username, "snapshot")
+            self.assertFalse(restored_user.has_usable_password())
+            self.assertFalse(restored_user.is_superuser)
+            self.assertFalse(restored_user.is_staff)
+
+            # A username that belongs to another user is refused
+            Event.objects.filter(id=event.id).delete()
+            restored_user.email = "renamed@a.com"
+            restored_user.save()
+
+            with self.assertRaises(CommandError):
+                call_command("restore_event", path, stdout=io.StringIO())
+
+            self.assertFalse(Event.objects.filter(id=event.id).exists())
@@ -3,6 +3,12 @@ from . import views
 
 urlpatterns = [
     path('create/', views.EventCreationView.as_view(), name='event-create'),
-    path('<uuid:pk>/', views.EventCRUDView.as_view(), name='event-detail'),
+    path('<uuid:event_id>/', views.EventCRUDView.as_view(), name='event-detail'),
+    path('<uuid:event_id>/clone/', views.EventCloneView.as_view(), name='event-clone'),
+    path(
+        '<uuid:event_id>/deletion/',
+        views.EventDeletionView.as_view(),
+        name='event-deletion',
+    ),
     path('', views.EventView.as_view(), name='event'),
 ]
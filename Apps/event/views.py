@@ -1,11 +1,16 @@
+import json
+from django.db import transaction
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
+from django.utils.cache import patch_cache_control
 from django.views import View
 from django.utils.timezone import now
 
 from Apps.participant.services import ParticipantService
-from .forms import EventForm
-from .services import EventService
+from .forms import EventCloneForm, EventForm
+from .services import EVENT_LIST_ORDERINGS, EventService
+
+EVENTS_CACHE_MAX_AGE = 60
 
 # TODO: check if user is authenticated and is admin/ view to see your own events / check delete
 
@@ -19,11 +24,42 @@ class EventView(View):
 
     def get(self, request, *args, **kwargs):
         search = request.GET.get("search")
-        if search:
-            events = EventService.find_by_name_and_appName(search)
+        when = request.GET.get("when") or None
+        cursor = request.GET.get("cursor")
+
+        if when not in EVENT_LIST_ORDERINGS:
+            return HttpResponse(status=400)
+
+        try:
+            if cursor:
+                cursor = EventService.decode_cursor(cursor, search=bool(search))
+
+        except ValueError:
+            return HttpResponse(status=400)
+
+        events, next_cursor = EventService.get_events_page(
+            when=when, search=search, cursor=cursor
+        )
+        next_page = None
+
+        if next_cursor:
+            query = request.GET.copy()
+            query["cursor"] = next_cursor
+            next_page = query.urlencode()
+
+        response = render(
+            request,
+            "events.html",
+            {"events": events, "today": now(), "when": when, "next_page": next_page},
+        )
+
+        if request.user.is_authenticated or response.cookies:
+            patch_cache_control(response, private=True)
+
         else:
-            events = EventService.get_first_100_events()
-        return render(request, "events.html", {"events": events, "today": now()})
+            patch_cache_control(response, public=True, max_age=EVENTS_CACHE_MAX_AGE)
+
+        return response
 
 
 class EventCRUDView(View):
@@ -32,25 +68,19 @@ class EventCRUDView(View):
         This method handles the load of an event.
         """
         # TODO: check if user is authenticated and is admin
-        id = kwargs.get("pk")
         if not request.user.is_authenticated:
             return HttpResponse(status=403)
 
         try:
-            event = EventService.get_event(kwargs.get("pk"))
+            event = request.event_context.get_event()
         except ValueError:
             return HttpResponse(status=404)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             form = EventForm(instance=event)
             return render(request, "eventUpdate.html", {"form": form})
         else:
-            is_participant = (
-                ParticipantService.get_participant_by_event_and_user(
-                    event, request.user
-                )
-                is not None
-            )
+            is_participant = request.event_context.participant is not None
             event_fields = EventService.event_to_dict(event)
             return render(
                 request,
@@ -60,17 +90,17 @@ class EventCRUDView(View):
 
     def post(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            event_id = kwargs.get("pk")
+            event_id = kwargs.get("event_id")
             if event_id:
                 try:
-                    event = EventService.get_event(event_id)
+                    event = request.event_context.get_event()
                     form = EventForm(request.POST, instance=event)
 
                 except ValueError:
                     return HttpResponse(status=404)
 
                 if form.is_valid():
-                    if ParticipantService.is_user_admin(event, request.user):
+                    if request.event_context.is_admin:
                         form.instance.id = event_id
                         updated_event = EventService.update_event(
                             event_id, form.cleaned_data
@@ -100,18 +130,16 @@ class EventCRUDView(View):
 
     def delete(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            event_id = kwargs.get("pk")
+            event_id = kwargs.get("event_id")
 
             if event_id:
                 try:
-                    EventService.get_event(event_id)
+                    request.event_context.get_event()
 
-                    if not ParticipantService.is_user_admin(
-                        EventService.get_event(event_id), request.user
-                    ):
+                    if not request.event_context.is_admin:
                         return HttpResponse(status=403)
 
-                    EventService.delete_event(event_id)
+                    EventService.delete_event(event_id, request.user)
                     return HttpResponse(status=204)
 
                 except ValueError:
@@ -124,6 +152,96 @@ class EventCRUDView(View):
             return redirect("/event")
 
 
+class EventDeletionView(View):
+    """
+    This view returns the progress of the background deletion of an event to its
+    admins and to the user who requested it.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return HttpResponse(status=403)
+
+        deletion = EventService.get_event_deletion(kwargs.get("event_id"))
+
+        if not request.event_context.is_admin and (
+            deletion is None or deletion.requested_by_id != request.user.id
+        ):
+            return HttpResponse(status=403)
+
+        if deletion is None:
+            return HttpResponse(status=404)
+
+        return HttpResponse(
+            status=200,
+            content=json.dumps(
+                {
+                    "step": deletion.step,
+                    "deleted": deletion.deleted,
+                    "total": deletion.total,
+                    "progress": deletion.progress,
+                    "finished": deletion.finished_at is not None,
+                }
+            ),
+            content_type="application/json",
+        )
+
+
+class EventCloneView(View):
+    """
+    This view handles the clone of an event into a new edition.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        This method renders the form of the new edition.
+        """
+        if not request.user.is_authenticated:
+            return HttpResponse(status=403)
+
+        try:
+            request.event_context.get_event()
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if not request.event_context.is_admin:
+            return HttpResponse(status=403)
+
+        return render(request, "eventClone.html", {"form": EventCloneForm()})
+
+    def post(self, request, *args, **kwargs):
+        """
+        This method clones the event and makes the user admin of the new edition.
+        """
+        if not request.user.is_authenticated:
+            return HttpResponse(status=403)
+
+        try:
+            event = request.event_context.get_event()
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if not request.event_context.is_admin:
+            return HttpResponse(status=403)
+
+        form = EventCloneForm(request.POST)
+
+        if not form.is_valid():
+            return render(request, "eventClone.html", {"form": form}, status=400)
+
+        # The admin is created in the transaction of the clone, so a clone never
+        # exists without one
+        with transaction.atomic():
+            clone = EventService.clone_event(
+                event.id, form.cleaned_data["name"], form.cleaned_data["start_date"]
+            )
+            admin = ParticipantService.create_default_admin(clone, request.user)
+
+        return redirect(
+            "/event/" + str(clone.id) + "/participant/" + str(admin.id) + "/"
+        )
+
+
 class EventCreationView(View):
     """
     This view handles the render of the event form.
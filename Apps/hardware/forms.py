@@ -6,18 +6,18 @@ class HardwareItemForm(forms.ModelForm):
     class Meta:
         model = HardwareItem
         fields = "__all__"
-        exclude = ["id", "event", "borrowers"]
+        exclude = ["id", "event"]
         labels = {
             "name": "Hardware item name",
             "description": "Description",
-            "quantity_available": "Quantity Available",
+            "quantity": "Quantity",
             "abreviation": "Abbreviation",
             "image": "Image",
         }
         help_texts = {
             "name": "Hardware item creation",
             "description": "",
-            "quantity_available": "",
+            "quantity": "Total units, including the ones on loan",
             "abreviation": "",
             "image": "",
         }
@@ -0,0 +1,94 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def copy_borrowers_to_loans(apps, schema_editor):
+    """
+    Copies the rows of the borrowers many-to-many table into open loans, and
+    adds the units on loan back to the quantity of each item, which now holds
+    the total.
+    """
+    HardwareItem = apps.get_model("hardware", "HardwareItem")
+    HardwareLoan = apps.get_model("hardware", "HardwareLoan")
+    quote_name = schema_editor.quote_name
+    field = HardwareItem._meta.get_field("borrowers")
+    schema_editor.execute(
+        f"INSERT INTO {quote_name(HardwareLoan._meta.db_table)} "
+        "(item_id, participant_id, borrowed_at) "
+        f"SELECT {quote_name(field.m2m_column_name())}, "
+        f"{quote_name(field.m2m_reverse_name())}, CURRENT_TIMESTAMP "
+        f"FROM {quote_name(field.remote_field.through._meta.db_table)}"
+    )
+    HardwareItem.objects.update(
+        quantity_on_loan=Coalesce(
+            Subquery(
+                HardwareLoan.objects.filter(item=OuterRef("pk"))
+                .values("item")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+    HardwareItem.objects.update(quantity=F("quantity") + F("quantity_on_loan"))
+
+
+def copy_loans_to_borrowers(apps, schema_editor):
+    HardwareItem = apps.get_model("hardware", "HardwareItem")
+    HardwareLoan = apps.get_model("hardware", "HardwareLoan")
+    quote_name = schema_editor.quote_name
+    field = HardwareItem._meta.get_field("borrowers")
+    schema_editor.execute(
+        f"INSERT INTO {quote_name(field.remote_field.through._meta.db_table)} "
+        f"({quote_name(field.m2m_column_name())}, "
+        f"{quote_name(field.m2m_reverse_name())}) "
+        "SELECT DISTINCT item_id, participant_id "
+        f"FROM {quote_name(HardwareLoan._meta.db_table)} "
+        "WHERE returned_at IS NULL"
+    )
+    HardwareItem.objects.update(quantity=F("quantity") - F("quantity_on_loan"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participant', '0006_participant_page_indexes'),
+        ('hardware', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='hardwareitem',
+            old_name='quantity_available',
+            new_name='quantity',
+        ),
+        migrations.AddField(
+            model_name='hardwareitem',
+            name='quantity_on_loan',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='HardwareLoan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('borrowed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('returned_at', models.DateTimeField(blank=True, null=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loans', to='hardware.hardwareitem')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hardware_loans', to='participant.hacker')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='hardwareloan',
+            constraint=models.UniqueConstraint(condition=models.Q(('returned_at__isnull', True)), fields=('item', 'participant'), name='hardware_loan_unique_open'),
+        ),
+        migrations.RunPython(copy_borrowers_to_loans, copy_loans_to_borrowers),
+        migrations.RemoveField(
+            model_name='hardwareitem',
+            name='borrowers',
+        ),
+    ]
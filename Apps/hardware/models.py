@@ -1,18 +1,21 @@
 import uuid
 from django.db import models
 from django.forms import ValidationError
+from django.utils.timezone import now
 
 # Create your models here.
 class HardwareItem(models.Model):
     """
     Model representing a hardware item available for loan during an event.
-    Each item has a name, description, and a quantity available.
+    Each item has a name, description, its total quantity and how many units are
+    on loan, from which the quantity available is derived.
     """
 
     id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
     name = models.CharField(max_length=255, blank=False, null=False)
     description = models.TextField(blank=True, null=True)
-    quantity_available = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    quantity_on_loan = models.PositiveIntegerField(default=0, editable=False)
     abreviation = models.CharField(max_length=10, blank=True, null=True)
     image = models.ImageField(
         upload_to="hardware_images/", blank=True, null=True
@@ -20,10 +23,10 @@ class HardwareItem(models.Model):
     event = models.ForeignKey(
         "event.Event", on_delete=models.CASCADE, blank=False, null=False
     )
-    borrowers = models.ManyToManyField(
-        "participant.Hacker",
-        related_name="borrowed_hardware_items",
-    )
+
+    @property
+    def quantity_available(self):
+        return max(self.quantity - self.quantity_on_loan, 0)
 
     def clean(self):
         """
@@ -32,8 +35,33 @@ class HardwareItem(models.Model):
         super().clean()
         errors = {}
 
-        if self.quantity_available < 0:
-            errors["quantity_available"] = "Quantity available cannot be negative."
+        if self.quantity < 0:
+            errors["quantity"] = "Quantity cannot be negative."
 
         if errors:
             raise ValidationError(errors)
+
+
+class HardwareLoan(models.Model):
+    """
+    Model representing the loan of a hardware item to a hacker. A loan is open
+    until it has a return date, and a hacker can only have one open loan of each
+    item.
+    """
+    item = models.ForeignKey(
+        HardwareItem, on_delete=models.CASCADE, related_name="loans"
+    )
+    participant = models.ForeignKey(
+        "participant.Hacker", on_delete=models.CASCADE, related_name="hardware_loans"
+    )
+    borrowed_at = models.DateTimeField(default=now)
+    returned_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "participant"],
+                condition=models.Q(returned_at__isnull=True),
+                name="hardware_loan_unique_open",
+            ),
+        ]
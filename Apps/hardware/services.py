@@ -1,7 +1,11 @@
 
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.forms import model_to_dict
-from Apps.hardware.models import HardwareItem
-from django.db.models import Q
+from django.utils.timezone import now
+from Apps.hardware.models import HardwareItem, HardwareLoan
+from Apps.participant.models import Hacker
+from django.db.models import F, Q
 
 class HardwareItemService:
     @staticmethod
@@ -34,7 +38,7 @@ class HardwareItemService:
         :param hardware_items: A queryset of hardware items.
         :return: A queryset of available hardware items.
         """
-        return hardware_items.filter(quantity_available__gt=0)
+        return hardware_items.filter(quantity__gt=F("quantity_on_loan"))
 
     @staticmethod
     def create_hardware_item(form, event):
@@ -61,25 +65,48 @@ class HardwareItemService:
     @staticmethod
     def update_hardware_item(form, hardware_item):
         """
-        Update an existing hardware item.
+        Update an existing hardware item. The item is locked like a loan, so the
+        quantity can not be lowered below the units a concurrent loan just took.
         :param form: The form containing the updated hardware item data.
         :param hardware_item: The hardware item instance to update.
         :return: The updated hardware item instance.
-        """
-        for key, value in form.cleaned_data.items():
-            setattr(hardware_item, key, value)
-
-        if form.cleaned_data['image'] is not None:
-            if form.cleaned_data['image'] == False:
-                hardware_item.image = None
+        :raises ValidationError: If the quantity is below the units on loan.
+        """
+        with transaction.atomic():
+            quantity_on_loan = (
+                HardwareItem.objects.select_for_update()
+                .values_list("quantity_on_loan", flat=True)
+                .get(id=hardware_item.id)
+            )
+            quantity = form.cleaned_data.get("quantity", hardware_item.quantity)
+
+            if quantity < quantity_on_loan:
+                raise ValidationError(
+                    {
+                        "quantity": (
+                            f"Quantity can not be lower than the {quantity_on_loan} "
+                            "units on loan."
+                        )
+                    }
+                )
+
+            for key, value in form.cleaned_data.items():
+                setattr(hardware_item, key, value)
+
+            if form.cleaned_data['image'] is not None:
+                if form.cleaned_data['image'] == False:
+                    hardware_item.image = None
+
+                else:
+                    hardware_item.image = form.cleaned_data['image']
 
             else:
-                hardware_item.image = form.cleaned_data['image']
+                hardware_item.image = hardware_item.image
 
-        else:
-            hardware_item.image = hardware_item.image
+            # The units on loan are left out, so a loan made meanwhile is not undone
+            hardware_item.quantity_on_loan = quantity_on_loan
+            hardware_item.save(update_fields=[*form.cleaned_data, "image"])
 
-        hardware_item.save()
         return hardware_item
 
     @staticmethod
@@ -94,34 +121,85 @@ class HardwareItemService:
     @staticmethod
     def borrow_hardware_item(hardware_item, participant):
         """
-        Check if a participant can borrow a hardware item.
-        :param hardware_item: The hardware item to check.
+        Lend a unit of a hardware item to a hacker, opening a loan. The unit is taken
+        with a conditional update, so two loans of the last unit cannot both succeed,
+        and the open loan constraint rejects a second loan to the same hacker.
+        :param hardware_item: The hardware item to borrow.
         :param participant: The participant trying to borrow the item.
-        :return: True if the participant can borrow the item, False otherwise.
+        :return: The hardware item if the loan was opened, None otherwise.
         """
-        if hardware_item and (not participant in hardware_item.borrowers.all()) and (hardware_item.quantity_available > 0):
-            hardware_item.borrowers.add(participant)
-            hardware_item.quantity_available -= 1
-            hardware_item.save()
-            return hardware_item
+        if (
+            not hardware_item
+            or not isinstance(participant, Hacker)
+            or HardwareLoan.objects.filter(
+                item=hardware_item, participant=participant, returned_at=None
+            ).exists()
+        ):
+            return None
+
+        try:
+            with transaction.atomic():
+                taken = HardwareItem.objects.filter(
+                    id=hardware_item.id, quantity__gt=F("quantity_on_loan")
+                ).update(quantity_on_loan=F("quantity_on_loan") + 1)
+
+                if not taken:
+                    return None
 
-        return None
+                HardwareLoan.objects.create(item=hardware_item, participant=participant)
+
+        except IntegrityError:
+            return None
+
+        hardware_item.refresh_from_db(fields=["quantity", "quantity_on_loan"])
+        return hardware_item
 
     @staticmethod
     def return_hardware_item(hardware_item, participant):
         """
-        Return a borrowed hardware item.
+        Return a borrowed hardware item, closing the open loan of the participant.
+        Only the request that closes the loan gives the unit back.
         :param hardware_item: The hardware item to return.
         :param participant: The participant returning the item.
-        :return: True if the item was successfully returned, False otherwise.
+        :return: The hardware item if the loan was closed, False otherwise.
+        """
+        if not hardware_item or not isinstance(participant, Hacker):
+            return False
+
+        with transaction.atomic():
+            returned = HardwareLoan.objects.filter(
+                item=hardware_item, participant=participant, returned_at=None
+            ).update(returned_at=now())
+
+            if not returned:
+                return False
+
+            HardwareItem.objects.filter(id=hardware_item.id).update(
+                quantity_on_loan=F("quantity_on_loan") - 1
+            )
+
+        hardware_item.refresh_from_db(fields=["quantity", "quantity_on_loan"])
+        return hardware_item
+
+    @staticmethod
+    def release_participant_loans(participant):
         """
-        if hardware_item and participant in hardware_item.borrowers.all():
-            hardware_item.borrowers.remove(participant)
-            hardware_item.quantity_available += 1
-            hardware_item.save()
-            return hardware_item
+        Give back the units a hacker has on loan, before it and its loans are
+        deleted. The open loans are locked, so a return running meanwhile either
+        closes its loan first or finds it gone, and no unit is given back twice.
+        :param participant: The hacker about to be deleted.
+        """
+        with transaction.atomic():
+            item_ids = list(
+                HardwareLoan.objects.select_for_update()
+                .filter(participant_id=participant.id, returned_at=None)
+                .values_list("item_id", flat=True)
+            )
 
-        return False
+            if item_ids:
+                HardwareItem.objects.filter(id__in=item_ids).update(
+                    quantity_on_loan=F("quantity_on_loan") - 1
+                )
 
     @staticmethod
     def hardware_item_to_dict(hardware_item):
@@ -132,7 +210,6 @@ class HardwareItemService:
         """
         excluded_fields = {
             "id",
-            "borrowers",
             "image",
             "event",
         }
@@ -142,4 +219,7 @@ class HardwareItemService:
             for key, value in hardware_item_dict.items()
             if key not in excluded_fields
         ]
+        hardware_item_fields.append(
+            {"name": "quantity_available", "value": hardware_item.quantity_available}
+        )
         return hardware_item_fields
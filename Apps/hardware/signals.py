@@ -0,0 +1,15 @@
+from django.db.models.signals import pre_delete
+
+from Apps.participant.models import Hacker
+from .services import HardwareItemService
+
+
+def release_participant_loans(sender, instance, **kwargs):
+    """
+    Gives back the hardware a hacker about to be deleted has on loan. Its loans
+    are deleted with it.
+    """
+    HardwareItemService.release_participant_loans(instance)
+
+
+pre_delete.connect(release_participant_loans, sender=Hacker)
@@ -1,8 +1,11 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils.timezone import now
 
 from Apps.event.models import Event
 from Apps.hardware.forms import HardwareItemForm
-from Apps.hardware.models import HardwareItem
+from Apps.hardware.models import HardwareItem, HardwareLoan
 from Apps.hardware.services import HardwareItemService
 from Apps.participant.models import Admin, Hacker
 from Apps.users.models import CustomUser
@@ -80,11 +83,10 @@ class ModelHardwareItemTestCase(TestCase):
         hardware_item = HardwareItem(
             name="Test Hardware",
             description="This is a test hardware item.",
-            quantity_available=10,
+            quantity=10,
             abreviation="THW",
             event=self.event
         )
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
         hardware_item = HardwareItem.objects.get(name="Test Hardware")
@@ -99,7 +101,7 @@ class ModelHardwareItemTestCase(TestCase):
         hardware_item = HardwareItem(
             name="Test Hardware",
             description="This is a test hardware item.",
-            quantity_available=-5,
+            quantity=-5,
             abreviation="THW",
             event=self.event
         )
@@ -107,6 +109,18 @@ class ModelHardwareItemTestCase(TestCase):
             hardware_item.full_clean()
             hardware_item.save()
 
+    def test_hardware_loan_unique_open(self):
+        hardware_item = HardwareItem.objects.create(
+            name="Test Hardware", quantity=10, event=self.event
+        )
+        HardwareLoan.objects.create(
+            item=hardware_item, participant=self.hacker, returned_at=now()
+        )
+        HardwareLoan.objects.create(item=hardware_item, participant=self.hacker)
+
+        with self.assertRaises(IntegrityError):
+            HardwareLoan.objects.create(item=hardware_item, participant=self.hacker)
+
 class ServiceHardwareItemTestCase(TestCase):
     """
     Test case for the HardwareItem service.
@@ -179,7 +193,7 @@ class ServiceHardwareItemTestCase(TestCase):
         self.hardware_data = {
             "name": "Test Hardware",
             "description": "This is a test hardware item.",
-            "quantity_available": 10,
+            "quantity": 10,
             "abreviation": "THW",
             "event": self.event
         }
@@ -208,8 +222,8 @@ class ServiceHardwareItemTestCase(TestCase):
         hardware_item = HardwareItem(
             **self.hardware_data
         )
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.save(using='default')
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         items = HardwareItemService.get_hardware_items(self.event)
         self.assertIn(hardware_item, items)
@@ -220,9 +234,9 @@ class ServiceHardwareItemTestCase(TestCase):
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         search_results = HardwareItemService.search_hardware_items(self.event, "Test")
         self.assertIn(hardware_item, search_results)
@@ -237,15 +251,15 @@ class ServiceHardwareItemTestCase(TestCase):
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         available_items = HardwareItemService.available_hardware_items(HardwareItem.objects.all())
         self.assertIn(hardware_item, available_items)
         self.assertEqual(available_items.count(), 1)
 
-        hardware_item.quantity_available = 0
+        hardware_item.quantity = 1
         hardware_item.save()
         available_items = HardwareItemService.available_hardware_items(HardwareItem.objects.all())
         self.assertNotIn(hardware_item, available_items)
@@ -266,9 +280,9 @@ class ServiceHardwareItemTestCase(TestCase):
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         retrieved_item = HardwareItemService.get_hardware_item(hardware_item.id)
         self.assertEqual(retrieved_item, hardware_item)
@@ -278,33 +292,45 @@ class ServiceHardwareItemTestCase(TestCase):
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
+        stale_item = HardwareItemService.get_hardware_item(hardware_item.id)
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         updated_data = {
             "name": "Updated Hardware",
             "description": "This is an updated hardware item.",
-            "quantity_available": 20,
+            "quantity": 20,
             "abreviation": "UHW",
         }
         form = HardwareItemForm(updated_data)
         form.is_valid()
-        updated_item = HardwareItemService.update_hardware_item(form, hardware_item)
+        updated_item = HardwareItemService.update_hardware_item(form, stale_item)
 
         self.assertEqual(updated_item.name, "Updated Hardware")
         self.assertEqual(updated_item.description, "This is an updated hardware item.")
-        self.assertEqual(updated_item.quantity_available, 20)
+        self.assertEqual(updated_item.quantity, 20)
+        self.assertEqual(
+            HardwareItem.objects.get(id=hardware_item.id).quantity_available, 19
+        )
         self.assertEqual(updated_item.abreviation, "UHW")
 
+        form = HardwareItemForm({**updated_data, "quantity": 0})
+        form.is_valid()
+
+        with self.assertRaises(ValidationError):
+            HardwareItemService.update_hardware_item(form, stale_item)
+
+        self.assertEqual(HardwareItem.objects.get(id=hardware_item.id).quantity, 20)
+
     def test_delete_hardware_item(self):
         hardware_item = HardwareItem(
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         result = HardwareItemService.delete_hardware_item(hardware_item)
         self.assertTrue(result)
@@ -314,41 +340,74 @@ class ServiceHardwareItemTestCase(TestCase):
         hardware_item = HardwareItem(
             **self.hardware_data
         )
+        hardware_item.quantity = 1
         hardware_item.full_clean()
         hardware_item.save()
 
         borrowed_item = HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
-        self.assertEqual(borrowed_item.quantity_available, 9)
-        self.assertIn(self.hacker, borrowed_item.borrowers.all())
+        self.assertEqual(borrowed_item.quantity, 1)
+        self.assertEqual(borrowed_item.quantity_available, 0)
+        self.assertTrue(
+            HardwareLoan.objects.filter(
+                item=hardware_item, participant=self.hacker, returned_at=None
+            ).exists()
+        )
+
+        with self.assertNumQueries(1):
+            null = HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
+        self.assertIsNone(null)
 
+        HardwareLoan.objects.all().delete()
         null = HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
         self.assertIsNone(null)
+        self.assertFalse(HardwareLoan.objects.exists())
 
     def test_return_hardware_item(self):
         hardware_item = HardwareItem(
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
 
         HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
         returned_item = HardwareItemService.return_hardware_item(hardware_item, self.hacker)
-        self.assertEqual(returned_item.quantity_available, 11)
-        self.assertNotIn(self.hacker, returned_item.borrowers.all())
+        self.assertEqual(returned_item.quantity_available, 10)
+        self.assertIsNotNone(HardwareLoan.objects.get(participant=self.hacker).returned_at)
 
         null = HardwareItemService.return_hardware_item(hardware_item, self.hacker)
         self.assertFalse(null)
+        self.assertEqual(HardwareItem.objects.get(id=hardware_item.id).quantity_on_loan, 0)
+
+        borrowed_item = HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
+        self.assertEqual(borrowed_item.quantity_available, 9)
+        self.assertEqual(HardwareLoan.objects.filter(participant=self.hacker).count(), 2)
+
+    def test_release_participant_loans(self):
+        hardware_item = HardwareItem(
+            **self.hardware_data
+        )
+        hardware_item.full_clean()
+        hardware_item.save()
+        other_item = HardwareItem.objects.create(**self.hardware_data)
+
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
+        HardwareItemService.borrow_hardware_item(other_item, self.hacker)
+        HardwareItemService.return_hardware_item(other_item, self.hacker)
+        self.hacker.delete()
+
+        self.assertFalse(HardwareLoan.objects.exists())
+        self.assertEqual(HardwareItem.objects.get(id=hardware_item.id).quantity_on_loan, 0)
+        self.assertEqual(HardwareItem.objects.get(id=other_item.id).quantity_on_loan, 0)
 
     def test_hardware_item_to_dict(self):
         hardware_item = HardwareItem(
             **self.hardware_data
         )
         self.hacker.save()
-        hardware_item.borrowers.add(self.hacker)
         hardware_item.full_clean()
         hardware_item.save()
+        HardwareItemService.borrow_hardware_item(hardware_item, self.hacker)
 
         item_dict = HardwareItemService.hardware_item_to_dict(hardware_item)
         self.assertIn("Test Hardware", str(item_dict[0].values()))
@@ -445,7 +504,7 @@ class ViewHardwareItemTestCase(TestCase):
         self.hardware_data = {
             "name": "Test Hardware",
             "description": "This is a test hardware item.",
-            "quantity_available": 10,
+            "quantity": 10,
             "abreviation": "THW",
             "event": self.event
         }
@@ -457,7 +516,7 @@ class ViewHardwareItemTestCase(TestCase):
         self.hardware_data2 = {
             "name": "Not Available Hardware",
             "description": "This is a test hardware item.",
-            "quantity_available": 0,
+            "quantity": 0,
             "abreviation": "THW",
             "event": self.event
         }
@@ -559,7 +618,7 @@ class ViewHardwareItemTestCase(TestCase):
         response = self.client.post(f'{self.base_url}create/', data={
             "name": "New Hardware",
             "description": "This is a new hardware item.",
-            "quantity_available": 5,
+            "quantity": 5,
             "abreviation": "NHW",
         })
         self.assertEqual(response.status_code, 302)
@@ -567,7 +626,7 @@ class ViewHardwareItemTestCase(TestCase):
         response = self.client.post(f'{self.base_url}create/', data={
             "name": "New Hardware",
             "description": "This is a new hardware item.",
-            "quantity_available": -5,
+            "quantity": -5,
             "abreviation": "NHW",
         })
         self.assertEqual(response.status_code, 400)
@@ -630,6 +689,12 @@ class ViewHardwareItemTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "hardwareItemEdit.html")
 
+        self.hacker.save()
+        HardwareItemService.borrow_hardware_item(self.hardware_item, self.hacker)
+        response = self.client.post(f'{self.base_url}{self.hardware_item.id}/', {**self.hardware_data, "quantity": 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", response.context["form"].errors)
+
     def test_hardware_item_CRUD_view_delete(self):
         response = self.client.delete(f'/event/00000000-0000-0000-0000-000000000000/hardware/{self.hardware_item.id}/')
         self.assertEqual(response.status_code, 404)
@@ -779,8 +844,7 @@ class ViewHardwareItemTestCase(TestCase):
         content_type="application/json")
         self.assertEqual(response.status_code, 400)
 
-        self.hardware_item.borrowers.add(self.hacker)
-        self.hardware_item.save()
+        HardwareItemService.borrow_hardware_item(self.hardware_item, self.hacker)
         response = self.client.post(f'{self.base_url}{self.hardware_item.id}/return/', {"qrResult":str(self.hacker.id)},
         content_type="application/json")
         self.assertEqual(response.status_code, 200)
@@ -1,9 +1,9 @@
 import json
+from django.core.exceptions import ValidationError
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.views import View
 
-from Apps.event.services import EventService
 from Apps.hardware.forms import HardwareItemForm
 from Apps.hardware.services import HardwareItemService
 from Apps.participant.services import ParticipantService
@@ -22,7 +22,7 @@ class HardwareItemView(View):
         search = request.GET.get("search")
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -30,9 +30,7 @@ class HardwareItemView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
@@ -43,7 +41,7 @@ class HardwareItemView(View):
         else:
             hardware_items = HardwareItemService.get_hardware_items(event)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return render(
                 request, "hardwareItems.html", {"hardware_items": hardware_items}
             )
@@ -64,14 +62,14 @@ class HardwareItemCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
         except ValueError:
             return HttpResponse(status=404)
 
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = HardwareItemForm()
@@ -84,14 +82,14 @@ class HardwareItemCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
         except ValueError:
             return HttpResponse(status=404)
 
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = HardwareItemForm(request.POST, request.FILES)
@@ -116,7 +114,7 @@ class HardwareItemCRUDView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             hardware_item = HardwareItemService.get_hardware_item(hardware_item_id)
 
         except ValueError:
@@ -125,7 +123,7 @@ class HardwareItemCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             fields = HardwareItemService.hardware_item_to_dict(hardware_item)
             return render(request, "hardwareItemDetail.html", {"fields": fields})
 
@@ -144,7 +142,7 @@ class HardwareItemCRUDView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             hardware_item = HardwareItemService.get_hardware_item(hardware_item_id)
         except ValueError:
             return HttpResponse(status=404)
@@ -152,15 +150,26 @@ class HardwareItemCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = HardwareItemForm(request.POST, request.FILES)
 
         if form.is_valid():
-            updated_hardware_item = HardwareItemService.update_hardware_item(
-                form, hardware_item
-            )
+            try:
+                updated_hardware_item = HardwareItemService.update_hardware_item(
+                    form, hardware_item
+                )
+
+            except ValidationError as error:
+                form.add_error(None, error)
+                return render(
+                    request,
+                    "hardwareItemEdit.html",
+                    {"form": form, "hardware_item": hardware_item},
+                    status=400,
+                )
+
             form = HardwareItemForm(instance=updated_hardware_item)
             return render(
                 request,
@@ -184,7 +193,7 @@ class HardwareItemCRUDView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             hardware_item = HardwareItemService.get_hardware_item(hardware_item_id)
         except ValueError:
             return HttpResponse(status=404)
@@ -192,7 +201,7 @@ class HardwareItemCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         HardwareItemService.delete_hardware_item(hardware_item)
@@ -212,7 +221,7 @@ class HardwareItemBorrowView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             HardwareItemService.get_hardware_item(hardware_item_id)
 
         except ValueError:
@@ -221,7 +230,7 @@ class HardwareItemBorrowView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         return render(request, "hardwareItemBorrow.html")
@@ -234,7 +243,7 @@ class HardwareItemBorrowView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             hardware_item = HardwareItemService.get_hardware_item(hardware_item_id)
             qr = json.loads(request.body).get("qrResult")
 
@@ -249,7 +258,7 @@ class HardwareItemBorrowView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         if HardwareItemService.borrow_hardware_item(hardware_item, participant):
@@ -272,7 +281,7 @@ class HardwareItemReturnView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             HardwareItemService.get_hardware_item(hardware_item_id)
 
         except ValueError:
@@ -281,7 +290,7 @@ class HardwareItemReturnView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         return render(request, "hardwareItemReturn.html")
@@ -294,7 +303,7 @@ class HardwareItemReturnView(View):
         hardware_item_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             hardware_item = HardwareItemService.get_hardware_item(hardware_item_id)
             qr = json.loads(request.body).get("qrResult")
 
@@ -309,7 +318,7 @@ class HardwareItemReturnView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         if HardwareItemService.return_hardware_item(hardware_item, participant):
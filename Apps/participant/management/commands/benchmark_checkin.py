@@ -0,0 +1,280 @@
+import json
+import logging
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from Apps.activity.models import Activity
+from Apps.event.models import Event
+from Apps.hardware.models import HardwareItem
+from Apps.participant.models import Hacker, ParticipantRegistry
+from Apps.participant.services import ParticipantService
+from Apps.users.models import CustomUser
+
+TARGETS = ("participant", "activity", "hardware")
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the door-rush scan endpoints: the participant check-in, the activity
+    check-in and the hardware borrow. It seeds a throwaway event with confirmed
+    hackers, replays their scans from concurrent scanners through the full request
+    stack and prints the latency, throughput, queries per scan and conflict rate
+    of each endpoint as JSON. The seeded data is deleted afterwards.
+    """
+
+    help = "Benchmark the check-in and borrow endpoints with concurrent scanners."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participants", type=int, default=500)
+        parser.add_argument("--scanners", type=int, default=8)
+        parser.add_argument(
+            "--duplicate-rate",
+            type=float,
+            default=0.1,
+            help="Share of participants scanned twice, to measure conflicts.",
+        )
+        parser.add_argument(
+            "--target", choices=TARGETS, action="append", dest="targets"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results to this file.")
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the seeded data."
+        )
+
+    def handle(self, *args, **options):
+        if options["participants"] < 1 or options["scanners"] < 1:
+            raise CommandError("Use at least one participant and one scanner")
+
+        self.scanners = options["scanners"]
+        # Expected 409 responses would otherwise log a warning per duplicate scan
+        request_logger = logging.getLogger("django.request")
+        request_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        random_generator = random.Random(options["seed"])
+        event, admin, hackers = self.seed(options["participants"])
+
+        try:
+            hacker_ids = [str(hacker.id) for hacker in hackers]
+            scans = hacker_ids + random_generator.choices(
+                hacker_ids, k=round(len(hacker_ids) * options["duplicate_rate"])
+            )
+            random_generator.shuffle(scans)
+
+            activity = Activity.objects.create(
+                name="Door rush benchmark",
+                type="MEAL",
+                start_date=event.start_date,
+                end_date=event.end_date,
+                event=event,
+            )
+            hardware_item = HardwareItem.objects.create(
+                name="Door rush benchmark",
+                quantity=len(scans),
+                event=event,
+            )
+            urls = {
+                "participant": f"/event/{event.id}/participant/checkin/",
+                "activity": f"/event/{event.id}/activity/{activity.id}/checkin/",
+                "hardware": f"/event/{event.id}/hardware/{hardware_item.id}/borrow/",
+            }
+            results = {
+                target: self.run_target(urls[target], scans, admin)
+                for target in options["targets"] or TARGETS
+            }
+
+        finally:
+            request_logger.setLevel(request_level)
+
+            if not options["keep"]:
+                event.delete()
+                CustomUser.objects.filter(
+                    id__in=[admin.id, *(hacker.user_id for hacker in hackers)]
+                ).delete()
+
+        report = json.dumps(
+            {
+                "timestamp": now().isoformat(),
+                "database": connection.vendor,
+                "participants": options["participants"],
+                "scanners": self.scanners,
+                "duplicate_rate": options["duplicate_rate"],
+                "results": results,
+            },
+            indent=2,
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(report)
+
+        self.stdout.write(report)
+
+    def seed(self, participants):
+        """
+        This method creates the benchmark event, its admin and the confirmed hackers.
+        """
+        run = uuid.uuid4().hex[:8]
+        start_date = now()
+        event = Event.objects.create(
+            name=f"Door rush benchmark {run}",
+            AppName="Benchmark",
+            description="Door rush benchmark",
+            location="Benchmark",
+            timezone="UTC",
+            start_date=start_date,
+            end_date=start_date + timedelta(days=1),
+            hacker_deadline=start_date,
+            mentor_deadline=start_date,
+            volunteer_deadline=start_date,
+            sponsor_deadline=start_date,
+            terms_and_conditions_link="https://example.com/terms",
+            activities_enabled=True,
+            hardware_enabled=True,
+        )
+        password = make_password(None)
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    email=f"benchmark-{run}-{index}@example.com",
+                    username=f"benchmark-{run}-{index}",
+                    password=password,
+                    first_name="Benchmark",
+                    last_name=str(index),
+                    gender="OTHER",
+                    pronoun="they/them",
+                    date_of_birth="2000-01-01",
+                    dietary="NONE",
+                    origin="Benchmark",
+                )
+                for index in range(participants + 1)
+            ]
+        )
+        admin = users.pop()
+        ParticipantService.create_default_admin(event, admin)
+        hackers = Hacker.objects.bulk_create(
+            [
+                Hacker(
+                    event=event,
+                    user=user,
+                    phone_number="+00000000000",
+                    type="HACKER",
+                    status="CONFIRMED",
+                    accepted_terms_and_conditions=True,
+                    t_shirt_size="M",
+                    origin="Benchmark",
+                    university="Benchmark",
+                    degree="Benchmark",
+                    graduation_year=2030,
+                    under_age=False,
+                    lenny_face="( ͡° ͜ʖ ͡°)",
+                    hear_about_us="Benchmark",
+                    why_excited="Benchmark",
+                    first_hackathon=False,
+                    personal_projects="Benchmark",
+                    share_cv=False,
+                    subscribe=False,
+                )
+                for user in users
+            ]
+        )
+        ParticipantRegistry.objects.bulk_create(
+            [
+                ParticipantRegistry(
+                    id=hacker.id, type="HACKER", event=event, user_id=hacker.user_id
+                )
+                for hacker in hackers
+            ]
+        )
+        return event, admin, hackers
+
+    def run_target(self, url, scans, admin):
+        """
+        This method replays the scans against one endpoint, split between the
+        scanners, and returns its metrics.
+        """
+        started = time.perf_counter()
+
+        if self.scanners == 1:
+            samples = self.run_scanner(url, scans, admin)
+
+        else:
+            with ThreadPoolExecutor(max_workers=self.scanners) as executor:
+                batches = executor.map(
+                    lambda scanner: self.run_scanner(
+                        url, scans[scanner :: self.scanners], admin, threaded=True
+                    ),
+                    range(self.scanners),
+                )
+                samples = [sample for batch in batches for sample in batch]
+
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latency for latency, queries, status in samples)
+        queries = [queries for latency, queries, status in samples]
+        statuses = {}
+
+        for latency, query_count, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        return {
+            "scans": len(samples),
+            "seconds": round(elapsed, 3),
+            "throughput": round(len(samples) / elapsed, 1),
+            "latency_ms": {
+                "p50": self.percentile(latencies, 50),
+                "p95": self.percentile(latencies, 95),
+                "p99": self.percentile(latencies, 99),
+                "max": self.percentile(latencies, 100),
+            },
+            "queries_per_scan": {
+                "mean": round(sum(queries) / len(queries), 2),
+                "max": max(queries),
+            },
+            "statuses": statuses,
+            "conflict_rate": round(statuses.get("409", 0) / len(samples), 4),
+        }
+
+    def run_scanner(self, url, scans, admin, threaded=False):
+        """
+        This method posts the scans of one scanner, one after the other, and returns
+        the latency, query count and status of each one.
+        """
+        client = Client(HTTP_HOST="localhost")
+        client.force_login(admin)
+        samples = []
+
+        try:
+            for qr in scans:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.post(
+                        url, {"qrResult": qr}, content_type="application/json"
+                    )
+                    latency = time.perf_counter() - started
+
+                samples.append((latency, len(queries), response.status_code))
+
+        finally:
+            client.logout()
+
+            if threaded:
+                connection.close()
+
+        return samples
+
+    @staticmethod
+    def percentile(values, percent):
+        """
+        This method returns the nearest-rank percentile of sorted values in ms.
+        """
+        index = max(0, -(-len(values) * percent // 100) - 1)
+        return round(values[index] * 1000, 3)
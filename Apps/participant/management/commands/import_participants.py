@@ -0,0 +1,58 @@
+import os
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from Apps.event.services import EventService
+from Apps.participant.services import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    PARTICIPANT_FORMS,
+    ParticipantService,
+)
+
+
+class Command(BaseCommand):
+    """
+    Imports the participants of one type into an event from a CSV or JSONL file.
+    Each row holds the email of an existing user and the application fields.
+    """
+
+    help = "Import participants of one type into an event from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_id")
+        parser.add_argument(
+            "type", choices=[type.lower() for type in PARTICIPANT_FORMS]
+        )
+        parser.add_argument("file")
+        parser.add_argument("--format", choices=IMPORT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            event = EventService.get_event(options["event_id"])
+
+        except (ValueError, ValidationError):
+            raise CommandError("Event not found")
+
+        import_format = options["format"] or os.path.splitext(options["file"])[1][1:]
+
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("Use --format to set the format of the file")
+
+        with open(options["file"], encoding="utf-8", newline="") as file:
+            created, rejected = ParticipantService.import_participants(
+                event,
+                options["type"],
+                ParticipantService.read_import_rows(file, import_format),
+                batch_size=options["batch_size"],
+            )
+
+        for row in rejected:
+            self.stderr.write(f"Row {row['row']} rejected: {row['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{created} participants imported, {len(rejected)} rejected"
+            )
+        )
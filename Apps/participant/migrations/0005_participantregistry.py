@@ -0,0 +1,54 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_registry(apps, schema_editor):
+    ParticipantRegistry = apps.get_model("participant", "ParticipantRegistry")
+
+    for type, model_name in (
+        ("HACKER", "Hacker"),
+        ("MENTOR", "Mentor"),
+        ("VOLUNTEER", "Volunteer"),
+        ("SPONSOR", "Sponsor"),
+        ("ADMIN", "Admin"),
+    ):
+        model = apps.get_model("participant", model_name)
+        ParticipantRegistry.objects.bulk_create(
+            [
+                ParticipantRegistry(
+                    id=id, type=type, event_id=event_id, user_id=user_id
+                )
+                for id, event_id, user_id in model.objects.values_list(
+                    "id", "event_id", "user_id"
+                ).iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('participant', '0004_alter_admin_user_alter_hacker_user_alter_mentor_user_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantRegistry',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('HACKER', 'Hacker'), ('MENTOR', 'Mentor'), ('VOLUNTEER', 'Volunteer'), ('SPONSOR', 'Sponsor'), ('ADMIN', 'Admin')], max_length=20)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='event.event')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'user'], name='participant_event_user_idx')],
+            },
+        ),
+        migrations.RunPython(populate_registry, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participant', '0005_participantregistry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='admin',
+            index=models.Index(fields=['event', 'application_date', 'id'], name='participant_admin_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hacker',
+            index=models.Index(fields=['event', 'application_date', 'id'], name='participant_hacker_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mentor',
+            index=models.Index(fields=['event', 'application_date', 'id'], name='participant_mentor_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sponsor',
+            index=models.Index(fields=['event', 'application_date', 'id'], name='participant_sponsor_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteer',
+            index=models.Index(fields=['event', 'application_date', 'id'], name='participant_volunteer_page_idx'),
+        ),
+    ]
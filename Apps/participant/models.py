@@ -71,6 +71,12 @@ class Participant(models.Model):
 
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(
+                fields=["event", "application_date", "id"],
+                name="%(app_label)s_%(class)s_page_idx",
+            ),
+        ]
 
 
 class Hacker(Participant):
@@ -222,3 +228,48 @@ class Admin(Participant):
             raise ValidationError(
                 "Participant type must be Admin to fill this application."
             )
+
+
+PARTICIPANT_MODELS = {
+    ParticipantTypeEnum.HACKER.name: Hacker,
+    ParticipantTypeEnum.MENTOR.name: Mentor,
+    ParticipantTypeEnum.VOLUNTEER.name: Volunteer,
+    ParticipantTypeEnum.SPONSOR.name: Sponsor,
+    ParticipantTypeEnum.ADMIN.name: Admin,
+}
+
+
+class ParticipantRegistry(models.Model):
+    """
+    Model indexing every participant of every type by its id and by (event, user).
+    Each row points to the concrete participant table through its type, so a
+    participant is resolved with two primary key lookups: the registry row and
+    then the row of its concrete table.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    type = models.CharField(
+        max_length=20, choices=ParticipantTypeEnum.choices(), blank=False, null=False
+    )
+    event = models.ForeignKey(
+        "event.Event", on_delete=models.CASCADE, blank=False, null=False
+    )
+    user = models.ForeignKey(
+        "users.CustomUser", on_delete=models.SET_NULL, blank=True, null=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event", "user"], name="participant_event_user_idx"),
+        ]
+
+    def get_participant(self):
+        """
+        Returns the concrete participant row this entry points to, with its user.
+        """
+        return (
+            PARTICIPANT_MODELS[self.type]
+            .objects.select_related("user")
+            .filter(id=self.id)
+            .first()
+        )
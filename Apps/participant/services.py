@@ -1,10 +1,113 @@
-from itertools import chain
+import csv
+import hashlib
+import io
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import chain, islice
+from django.core import signing
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Q
 from django.forms import model_to_dict
-from django.utils.timezone import now
+from django.utils.dateparse import parse_datetime
+from django.utils.crypto import constant_time_compare
+from django.utils.timezone import is_naive, make_aware, now
+from Apps.event.services import EventService
+from Apps.users.models import CustomUser
+from Apps.users.search import (
+    user_search_filter,
+    user_search_query,
+    user_search_rank,
+    user_search_vector,
+)
 from .Enums.participantTypeEnum import ParticipantTypeEnum
+from .Enums.statusEnum import StatusEnum
 from .forms import HackerForm, MentorForm, VolunteerForm, SponsorForm, AdminForm
-from .models import Hacker, Mentor, Volunteer, Sponsor, Admin
+from .models import (
+    PARTICIPANT_MODELS,
+    Hacker,
+    Mentor,
+    Volunteer,
+    Sponsor,
+    Admin,
+    ParticipantRegistry,
+)
+
+PARTICIPANTS_PAGE_SIZE = 50
+
+REVIEWABLE_STATUSES = (
+    StatusEnum.UNDER_REVIEW,
+    StatusEnum.WAITLISTED,
+    StatusEnum.INVITED,
+)
+
+TRANSITION_STATUSES = (
+    StatusEnum.CONFIRMED.name,
+    StatusEnum.REJECTED.name,
+    StatusEnum.WAITLISTED.name,
+    StatusEnum.INVITED.name,
+)
+
+CONFIRMED_STATUSES = (StatusEnum.CONFIRMED.name, StatusEnum.CONFIRMED.value)
+
+ATTENDED_STATUSES = (StatusEnum.ATTENDED.name, StatusEnum.ATTENDED.value)
+
+OCCUPANCY_CACHE_TIMEOUT = 60 * 60 * 24
+
+CHECK_IN_ROSTER_SALT = "participant-check-in-roster"
+
+CHECK_IN_SYNC_MAX_SCANS = 1000
+
+EXPORT_CHUNK_SIZE = 2000
+
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+PARTICIPANT_FORMS = {
+    ParticipantTypeEnum.HACKER.name: HackerForm,
+    ParticipantTypeEnum.MENTOR.name: MentorForm,
+    ParticipantTypeEnum.VOLUNTEER.name: VolunteerForm,
+    ParticipantTypeEnum.SPONSOR.name: SponsorForm,
+    ParticipantTypeEnum.ADMIN.name: AdminForm,
+}
+
+EXPORT_FIELDS = (
+    "id",
+    "type",
+    "status",
+    "application_date",
+    "accepted_date",
+    "phone_number",
+    "t_shirt_size",
+    "origin",
+    "user__id",
+    "user__username",
+    "user__first_name",
+    "user__last_name",
+    "user__email",
+    "user__pronoun",
+    "user__gender",
+    "user__dietary",
+    "user__dietary_other",
+)
+
+PARTICIPANT_LIST_FIELDS = (
+    "id",
+    "user__id",
+    "user__username",
+    "user__first_name",
+    "user__last_name",
+    "user__email",
+    "user__pronoun",
+    "type",
+    "status",
+    "application_date",
+)
 
 
 class ParticipantService:
@@ -14,13 +117,7 @@ class ParticipantService:
 
     @staticmethod
     def create_participant(form, event, user):
-        if (
-            Hacker.objects.filter(event=event, user=user).first()
-            or Mentor.objects.filter(event=event, user=user).first()
-            or Volunteer.objects.filter(event=event, user=user).first()
-            or Sponsor.objects.filter(event=event, user=user).first()
-            or Admin.objects.filter(event=event, user=user).first()
-        ):
+        if ParticipantRegistry.objects.filter(event=event, user=user).exists():
             raise ValidationError("You have already applied to this event!")
         participant = form.save(commit=False)
         participant.event = event
@@ -64,79 +161,369 @@ class ParticipantService:
         """
         This method returns the list of participants for a specific event.
         """
-
-        participants = Hacker.objects.filter(event_id=event_id).first()
         participants = list(
             chain(
-                Hacker.objects.select_related("user")
-                .filter(event_id=event_id)
-                .values(
-                    "id",
-                    "user__id",
-                    "user__username",
-                    "user__first_name",
-                    "user__last_name",
-                    "user__email",
-                    "user__pronoun",
-                    "type",
-                    "status",
-                ),
-                Mentor.objects.select_related("user")
-                .filter(event_id=event_id)
-                .values(
-                    "id",
-                    "user__id",
-                    "user__username",
-                    "user__first_name",
-                    "user__last_name",
-                    "user__email",
-                    "user__pronoun",
-                    "type",
-                    "status",
-                ),
-                Sponsor.objects.select_related("user")
-                .filter(event_id=event_id)
-                .values(
-                    "id",
-                    "user__id",
-                    "user__username",
-                    "user__first_name",
-                    "user__last_name",
-                    "user__email",
-                    "user__pronoun",
-                    "type",
-                    "status",
-                ),
-                Volunteer.objects.select_related("user")
-                .filter(event_id=event_id)
-                .values(
-                    "id",
-                    "user__id",
-                    "user__username",
-                    "user__first_name",
-                    "user__last_name",
-                    "user__email",
-                    "user__pronoun",
-                    "type",
-                    "status",
-                ),
-                Admin.objects.select_related("user")
-                .filter(event_id=event_id)
-                .values(
-                    "id",
-                    "user__id",
-                    "user__username",
-                    "user__first_name",
-                    "user__last_name",
-                    "user__email",
-                    "user__pronoun",
-                    "type",
-                    "status",
-                ),
+                *(
+                    ParticipantService.participant_values(
+                        model.objects.filter(event_id=event_id)
+                    )
+                    for model in (Hacker, Mentor, Sponsor, Volunteer, Admin)
+                )
             )
         )
         return participants
 
+    @staticmethod
+    def participant_values(participants, *extra_fields):
+        """
+        This method returns the fields of the participant list from a queryset.
+        """
+        return participants.values(*PARTICIPANT_LIST_FIELDS, *extra_fields)
+
+    @staticmethod
+    def filter_event_participants(
+        event_id, search=None, participant_type=None, status=None
+    ):
+        """
+        This method returns one filtered queryset per participant table of an event.
+        When searching, each participant is annotated with the relevance of its user.
+        """
+        if participant_type:
+            models = [
+                model
+                for type, model in PARTICIPANT_MODELS.items()
+                if type == participant_type.upper()
+            ]
+
+        else:
+            models = list(PARTICIPANT_MODELS.values())
+
+        conditions = Q(event_id=event_id)
+        annotations = {}
+
+        if search:
+            query = user_search_query(search)
+
+            if query is None:
+                return []
+
+            annotations = {
+                "search": user_search_vector("user__"),
+                "rank": user_search_rank(query, "user__"),
+            }
+            conditions &= user_search_filter(query, search, "user__")
+
+        if status:
+            conditions &= Q(status__iexact=status.replace("_", " ")) | Q(
+                status__iexact=status.replace(" ", "_")
+            )
+
+        return [
+            model.objects.annotate(**annotations).filter(conditions)
+            for model in models
+        ]
+
+    @staticmethod
+    def get_event_participants_page(
+        event_id,
+        search=None,
+        participant_type=None,
+        status=None,
+        cursor=None,
+        page_size=PARTICIPANTS_PAGE_SIZE,
+    ):
+        """
+        This method returns a page of participants for a specific event and the cursor
+        of the next page. Every participant table is filtered in SQL and merged in a
+        single UNION ALL query ordered by application date and id, or by relevance
+        first when searching.
+        """
+        querysets = ParticipantService.filter_event_participants(
+            event_id, search, participant_type, status
+        )
+
+        if not querysets:
+            return [], None
+
+        extra_fields = []
+        ordering = ["application_date", "id"]
+
+        if search:
+            extra_fields = ["rank"]
+            ordering = ["-rank", "application_date", "id"]
+
+        if cursor:
+            rank, application_date, participant_id = cursor
+            after = Q(application_date__gt=application_date) | Q(
+                application_date=application_date, id__gt=participant_id
+            )
+
+            if search and rank is not None:
+                after = Q(rank__lt=rank) | (Q(rank=rank) & after)
+
+            querysets = [queryset.filter(after) for queryset in querysets]
+
+        querysets = [
+            ParticipantService.participant_values(queryset, *extra_fields)
+            for queryset in querysets
+        ]
+        participants = querysets[0]
+
+        if len(querysets) > 1:
+            participants = participants.union(*querysets[1:], all=True)
+
+        participants = list(participants.order_by(*ordering)[: page_size + 1])
+
+        if len(participants) > page_size:
+            participants = participants[:page_size]
+            return participants, ParticipantService.encode_cursor(participants[-1])
+
+        return participants, None
+
+    @staticmethod
+    def encode_cursor(participant):
+        """
+        This method returns the pagination cursor pointing after a participant.
+        """
+        cursor = [participant["application_date"].isoformat(), str(participant["id"])]
+
+        if "rank" in participant:
+            cursor.insert(0, str(participant["rank"]))
+
+        return "|".join(cursor)
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        This method parses a pagination cursor into its rank, application date and id,
+        raising ValueError if it is invalid.
+        """
+        parts = cursor.split("|")
+
+        if len(parts) == 2:
+            parts.insert(0, None)
+
+        if len(parts) != 3:
+            raise ValueError("Invalid cursor")
+
+        rank, application_date, participant_id = parts
+
+        try:
+            rank = Decimal(rank) if rank is not None else None
+
+        except InvalidOperation:
+            raise ValueError("Invalid cursor")
+
+        return rank, datetime.fromisoformat(application_date), uuid.UUID(participant_id)
+
+    @staticmethod
+    def export_event_participants(event_id, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        This method yields the participants of every type of an event, joined with their
+        user, reading each table through a server-side cursor.
+        """
+        for model in PARTICIPANT_MODELS.values():
+            yield from (
+                model.objects.filter(event_id=event_id)
+                .order_by("application_date", "id")
+                .values(*EXPORT_FIELDS)
+                .iterator(chunk_size=chunk_size)
+            )
+
+    @staticmethod
+    def participants_to_csv(participants):
+        """
+        This method yields the participants as CSV lines, starting with the header.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        rows = chain(
+            [EXPORT_FIELDS],
+            (
+                [participant[field] for field in EXPORT_FIELDS]
+                for participant in participants
+            ),
+        )
+
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    @staticmethod
+    def participants_to_ndjson(participants):
+        """
+        This method yields the participants as newline delimited JSON objects.
+        """
+        for participant in participants:
+            yield json.dumps(participant, cls=DjangoJSONEncoder) + "\n"
+
+    @staticmethod
+    def read_import_rows(file, import_format):
+        """
+        This method returns the rows of a CSV or JSONL text file as dictionaries.
+        Lines of a JSONL file that are not valid JSON are returned as None.
+        """
+        if import_format == "csv":
+            return csv.DictReader(file)
+
+        if import_format == "jsonl":
+            return (
+                ParticipantService.parse_json_line(line)
+                for line in file
+                if line.strip()
+            )
+
+        raise ValueError("Unsupported import format")
+
+    @staticmethod
+    def parse_json_line(line):
+        """
+        This method parses a JSONL line, returning None if it is not valid JSON.
+        """
+        try:
+            return json.loads(line)
+
+        except ValueError:
+            return None
+
+    @staticmethod
+    def import_participants(
+        event, participant_type, rows, batch_size=IMPORT_BATCH_SIZE
+    ):
+        """
+        This method creates participants of a type from rows holding the user email and
+        the application fields. Rows are validated with the fields of the application
+        form and inserted in batches. It returns the number of participants
+        created and the list of rejected rows with their errors.
+        """
+        participant_type = participant_type.upper()
+
+        if participant_type not in PARTICIPANT_FORMS:
+            raise ValueError("Invalid participant type")
+
+        rows = enumerate(rows, start=1)
+        created = 0
+        rejected = []
+
+        while True:
+            batch = list(islice(rows, batch_size))
+
+            if not batch:
+                return created, rejected
+
+            created += ParticipantService.import_participants_batch(
+                event, participant_type, batch, rejected, batch_size
+            )
+
+    @staticmethod
+    def import_participants_batch(
+        event, participant_type, batch, rejected, batch_size=IMPORT_BATCH_SIZE
+    ):
+        """
+        This method validates and inserts a batch of numbered import rows, appending the
+        rejected ones to the rejected list. It returns the number of participants
+        created.
+        """
+        emails = [row.get("email") for _, row in batch if isinstance(row, dict)]
+        users = dict(
+            CustomUser.objects.filter(email__in=emails).values_list("email", "id")
+        )
+        applied_users = set(
+            ParticipantRegistry.objects.filter(
+                event=event, user_id__in=users.values()
+            ).values_list("user_id", flat=True)
+        )
+        form = PARTICIPANT_FORMS[participant_type]()
+        participants = []
+
+        for line, row in batch:
+            if not isinstance(row, dict):
+                rejected.append({"row": line, "errors": {"__all__": ["Invalid row."]}})
+                continue
+
+            user_id = users.get(row.get("email"))
+
+            if user_id is None:
+                rejected.append(
+                    {"row": line, "errors": {"email": ["No user with this email."]}}
+                )
+                continue
+
+            if user_id in applied_users:
+                rejected.append(
+                    {"row": line, "errors": {"email": ["User has already applied."]}}
+                )
+                continue
+
+            participant = PARTICIPANT_MODELS[participant_type](
+                type=form.instance.type, event=event, user_id=user_id
+            )
+            errors = ParticipantService.clean_import_row(form, row, participant)
+
+            if errors:
+                rejected.append({"row": line, "errors": errors})
+                continue
+
+            participants.append(participant)
+            applied_users.add(user_id)
+
+        with transaction.atomic():
+            PARTICIPANT_MODELS[participant_type].objects.bulk_create(
+                participants, batch_size=batch_size
+            )
+            ParticipantRegistry.objects.bulk_create(
+                [
+                    ParticipantRegistry(
+                        id=participant.id,
+                        type=participant_type,
+                        event=event,
+                        user_id=participant.user_id,
+                    )
+                    for participant in participants
+                ],
+                batch_size=batch_size,
+            )
+
+        return len(participants)
+
+    @staticmethod
+    def clean_import_row(form, row, participant):
+        """
+        This method validates an import row with the fields of an application form and
+        the rules of the participant model, filling the participant with the cleaned
+        values. The form is built once per batch and only its fields are used, since
+        building and validating a whole form per row is what makes large imports slow.
+        It returns the errors of the row by field.
+        """
+        errors = {}
+
+        for name, field in form.fields.items():
+            try:
+                value = field.clean(field.widget.value_from_datadict(row, {}, name))
+
+            except ValidationError as error:
+                errors[name] = list(error.messages)
+                continue
+
+            setattr(participant, name, value)
+
+        if errors:
+            return errors
+
+        try:
+            participant.clean()
+
+        except ValidationError as error:
+            if hasattr(error, "error_dict"):
+                return error.message_dict
+
+            return {"__all__": list(error.messages)}
+
+        return {}
+
     @staticmethod
     def filter_by_name_and_email(search, participants):
         """
@@ -192,28 +579,53 @@ class ParticipantService:
         """
         This method returns a specific participant for a specific event.
         """
-        participant = (
-            Hacker.objects.filter(event_id=event_id, id=participant_id).first()
-            or Mentor.objects.filter(event_id=event_id, id=participant_id).first()
-            or Volunteer.objects.filter(event_id=event_id, id=participant_id).first()
-            or Sponsor.objects.filter(event_id=event_id, id=participant_id).first()
-            or Admin.objects.filter(event_id=event_id, id=participant_id).first()
-        )
-        return participant
+        entry = ParticipantRegistry.objects.filter(
+            event_id=event_id, id=participant_id
+        ).first()
+
+        if entry is None:
+            return None
+
+        return entry.get_participant()
 
     @staticmethod
     def get_participant_by_event_and_user(event, user):
         """
         This method returns a specific participant for a specific event.
         """
-        participant = (
-            Hacker.objects.filter(event=event, user=user).first()
-            or Mentor.objects.filter(event=event, user=user).first()
-            or Volunteer.objects.filter(event=event, user=user).first()
-            or Sponsor.objects.filter(event=event, user=user).first()
-            or Admin.objects.filter(event=event, user=user).first()
+        return ParticipantService.get_registry_participant(
+            ParticipantService.get_user_registry(event, user)
         )
-        return participant
+
+    @staticmethod
+    def get_user_registry(event, user):
+        """
+        This method returns the registry entries of a user in an event, one for
+        each type the user has applied as.
+        """
+        return list(ParticipantRegistry.objects.filter(event=event, user=user))
+
+    @staticmethod
+    def get_registry_participant(entries):
+        """
+        This method returns the participant of the registry entry with the highest
+        priority type, or None if there are no entries.
+        """
+        entry = min(
+            entries, key=lambda e: list(PARTICIPANT_MODELS).index(e.type), default=None
+        )
+
+        if entry is None:
+            return None
+
+        return entry.get_participant()
+
+    @staticmethod
+    def is_admin_in_registry(entries):
+        """
+        This method checks if any of the registry entries is an admin.
+        """
+        return any(entry.type == ParticipantTypeEnum.ADMIN.name for entry in entries)
 
     @staticmethod
     def get_participant_form(participant):
@@ -295,7 +707,9 @@ class ParticipantService:
         """
         This method checks if the user is an admin.
         """
-        return Admin.objects.filter(event=event, user=user).first() is not None
+        return ParticipantRegistry.objects.filter(
+            event=event, user=user, type=ParticipantTypeEnum.ADMIN.name
+        ).exists()
 
     @staticmethod
     def get_participant_admin(event, user):
@@ -358,13 +772,246 @@ class ParticipantService:
         """
         This method checks in a participant.
         """
-        if participant.status.lower() == "attended":
+        updated = (
+            type(participant)
+            .objects.filter(pk=participant.pk)
+            .exclude(status__in=ATTENDED_STATUSES)
+            .update(status=StatusEnum.ATTENDED.name)
+        )
+
+        if not updated:
             return False
 
-        participant.status = "ATTENDED"
-        participant.save()
+        participant.status = StatusEnum.ATTENDED.name
+        ParticipantService.count_door_check_ins(participant.event_id)
         return True
 
+    @staticmethod
+    def count_door_check_ins(event_id, count=1):
+        """
+        This method adds check-ins to the door counter of an event and gives the
+        check-ins of the event a new version stamp, once the check-ins commit, so
+        rolled back ones are not counted. The counter lives in the cache and is only
+        created by get_door_count, so a missing one is left alone.
+        """
+
+        def add():
+            try:
+                cache.incr(f"event-door:{event_id}", count)
+
+            except ValueError:
+                pass
+
+            EventService.touch_check_ins(event_id)
+
+        transaction.on_commit(add)
+
+    @staticmethod
+    def get_door_count(event_id, refresh=False):
+        """
+        This method returns how many participants of an event were checked in at
+        the door. It reads the cached counter, and counts every participant type in
+        one UNION ALL query when the counter is missing or refresh is set.
+        """
+        count = None if refresh else cache.get(f"event-door:{event_id}")
+
+        if count is None:
+            counts = [
+                model.objects.filter(event_id=event_id, status__in=ATTENDED_STATUSES)
+                .values("event_id")
+                .annotate(count=Count("id"))
+                .values("count")
+                .order_by()
+                for model in PARTICIPANT_MODELS.values()
+            ]
+            count = sum(
+                row["count"] for row in counts[0].union(*counts[1:], all=True)
+            )
+            cache.set(f"event-door:{event_id}", count, OCCUPANCY_CACHE_TIMEOUT)
+
+        return count
+
+    @staticmethod
+    def get_check_in_scan(event_id, user, participant_id):
+        """
+        This method resolves a check-in scan with one query. It returns whether the
+        user is an admin of the event and the type of the scanned participant, which
+        is None if the participant is not in the event. Hidden events have neither.
+        """
+        is_admin = False
+        participant_type = None
+
+        for id, type, user_id in ParticipantRegistry.objects.filter(
+            Q(id=participant_id) | Q(user=user, type=ParticipantTypeEnum.ADMIN.name),
+            event_id=event_id,
+            event__hidden=False,
+        ).values_list("id", "type", "user_id"):
+            if type == ParticipantTypeEnum.ADMIN.name and user_id == user.id:
+                is_admin = True
+
+            if id == participant_id:
+                participant_type = type
+
+        return is_admin, participant_type
+
+    @staticmethod
+    def check_in_participant_by_id(event_id, participant_type, participant_id):
+        """
+        This method checks in a confirmed participant with a single conditional
+        UPDATE, so concurrent scans of the same badge check it in only once.
+        It returns "checked_in", "attended" or "not_confirmed".
+        """
+        participants = PARTICIPANT_MODELS[participant_type].objects.filter(
+            event_id=event_id, id=participant_id
+        )
+
+        if participants.filter(status__in=CONFIRMED_STATUSES).update(
+            status=StatusEnum.ATTENDED.name
+        ):
+            ParticipantService.count_door_check_ins(event_id)
+            return "checked_in"
+
+        if participants.filter(status__in=ATTENDED_STATUSES).exists():
+            return "attended"
+
+        return "not_confirmed"
+
+    @staticmethod
+    def get_check_in_roster(event_id):
+        """
+        This method returns the check-in roster of an event for offline kiosks: the
+        ids of the confirmed and attended participants, a version hashed from them
+        and the signature of the event and version.
+        """
+        querysets = [
+            model.objects.filter(
+                event_id=event_id, status__in=CONFIRMED_STATUSES + ATTENDED_STATUSES
+            ).values_list("id", "status")
+            for model in PARTICIPANT_MODELS.values()
+        ]
+        confirmed = []
+        attended = []
+
+        for id, status in (
+            querysets[0].union(*querysets[1:], all=True).order_by("id")
+        ):
+            if status in ATTENDED_STATUSES:
+                attended.append(id.hex)
+
+            else:
+                confirmed.append(id.hex)
+
+        version = hashlib.sha256(
+            f"{','.join(confirmed)}|{','.join(attended)}".encode()
+        ).hexdigest()[:32]
+
+        return {
+            "event": str(event_id),
+            "version": version,
+            "confirmed": confirmed,
+            "attended": attended,
+            "signature": signing.Signer(salt=CHECK_IN_ROSTER_SALT).signature(
+                f"{event_id}:{version}"
+            ),
+        }
+
+    @staticmethod
+    def verify_check_in_roster(event_id, version, signature):
+        """
+        This method checks that a roster version and signature sent by a kiosk were
+        issued for the event by get_check_in_roster.
+        """
+        if not isinstance(version, str) or not isinstance(signature, str):
+            return False
+
+        return constant_time_compare(
+            signature,
+            signing.Signer(salt=CHECK_IN_ROSTER_SALT).signature(
+                f"{event_id}:{version}"
+            ),
+        )
+
+    @staticmethod
+    def sync_check_ins(event_id, scans):
+        """
+        This method applies a batch of queued kiosk scans in one transaction.
+        Scans are applied from the oldest to the newest, so the first scan of a
+        participant checks it in and the later ones are duplicates, whatever order
+        the batch arrives in. It returns the result of each scan in batch order:
+        "checked_in", "attended", "not_confirmed", "not_found", "duplicate" or
+        "invalid".
+        """
+        results = ["invalid"] * len(scans)
+        pending = []
+
+        for index, scan in enumerate(scans):
+            try:
+                participant_id = uuid.UUID(str(scan["id"]))
+                scanned_at = parse_datetime(str(scan["scanned_at"]))
+
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            if scanned_at is None:
+                continue
+
+            if is_naive(scanned_at):
+                scanned_at = make_aware(scanned_at)
+
+            pending.append((scanned_at, participant_id, index))
+
+        first_scans = {}
+
+        for scanned_at, participant_id, index in sorted(pending):
+            if participant_id in first_scans:
+                results[index] = "duplicate"
+
+            else:
+                first_scans[participant_id] = index
+                results[index] = "not_found"
+
+        ids_by_type = {}
+
+        for participant_id, type in ParticipantRegistry.objects.filter(
+            event_id=event_id, id__in=list(first_scans)
+        ).values_list("id", "type"):
+            ids_by_type.setdefault(type, []).append(participant_id)
+
+        with transaction.atomic():
+            for type, ids in ids_by_type.items():
+                participants = PARTICIPANT_MODELS[type].objects.filter(id__in=ids)
+                statuses = dict(
+                    participants.select_for_update()
+                    .order_by("id")
+                    .values_list("id", "status")
+                )
+                checked_in = [
+                    participant_id
+                    for participant_id, status in statuses.items()
+                    if status in CONFIRMED_STATUSES
+                ]
+                if checked_in:
+                    participants.filter(id__in=checked_in).update(
+                        status=StatusEnum.ATTENDED.name
+                    )
+                    ParticipantService.count_door_check_ins(
+                        event_id, len(checked_in)
+                    )
+
+                for participant_id, status in statuses.items():
+                    if status in CONFIRMED_STATUSES:
+                        result = "checked_in"
+
+                    elif status in ATTENDED_STATUSES:
+                        result = "attended"
+
+                    else:
+                        result = "not_confirmed"
+
+                    results[first_scans[participant_id]] = result
+
+        return results
+
     @staticmethod
     def is_participant_under_review(participant):
         """
@@ -395,6 +1042,70 @@ class ParticipantService:
             return True
         return False
 
+    @staticmethod
+    def get_event_participant_ids(
+        event_id, search=None, participant_type=None, status=None
+    ):
+        """
+        This method returns the ids of the event participants matching the filters.
+        """
+        return list(
+            chain(
+                *(
+                    queryset.values_list("id", flat=True)
+                    for queryset in ParticipantService.filter_event_participants(
+                        event_id, search, participant_type, status
+                    )
+                )
+            )
+        )
+
+    @staticmethod
+    def transition_participants(event_id, participant_ids, target_status):
+        """
+        This method moves a batch of participants under review, waitlisted or invited
+        to the target status, with one conditional UPDATE per participant table.
+        It returns the result for each id: "updated", "conflict" or "not_found".
+        """
+        target_status = StatusEnum[target_status]
+        results = {
+            str(participant_id): "not_found" for participant_id in participant_ids
+        }
+        ids_by_type = {}
+
+        for participant_id, type in ParticipantRegistry.objects.filter(
+            event_id=event_id, id__in=participant_ids
+        ).values_list("id", "type"):
+            ids_by_type.setdefault(type, []).append(participant_id)
+            results[str(participant_id)] = "conflict"
+
+        changes = {"status": target_status.name}
+
+        if target_status == StatusEnum.CONFIRMED:
+            changes["accepted_date"] = now()
+
+        source_statuses = [
+            status
+            for enum in REVIEWABLE_STATUSES
+            if enum != target_status
+            for status in (enum.name, enum.value)
+        ]
+
+        with transaction.atomic():
+            for type, ids in ids_by_type.items():
+                participants = PARTICIPANT_MODELS[type].objects.filter(
+                    id__in=ids, status__in=source_statuses
+                )
+                updated_ids = list(
+                    participants.select_for_update().values_list("id", flat=True)
+                )
+                participants.filter(id__in=updated_ids).update(**changes)
+
+                for participant_id in updated_ids:
+                    results[str(participant_id)] = "updated"
+
+        return results
+
     @staticmethod
     def get_participant_diet(participant):
         """
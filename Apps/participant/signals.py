@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+
+from .models import PARTICIPANT_MODELS, ParticipantRegistry
+
+
+def register_participant(sender, instance, created, **kwargs):
+    """
+    Keeps the participant registry in sync when a participant is saved.
+    """
+    if created:
+        ParticipantRegistry.objects.create(
+            id=instance.id,
+            type=PARTICIPANT_TYPES[sender],
+            event_id=instance.event_id,
+            user_id=instance.user_id,
+        )
+
+    else:
+        ParticipantRegistry.objects.filter(id=instance.id).update(
+            event_id=instance.event_id, user_id=instance.user_id
+        )
+
+
+def unregister_participant(sender, instance, **kwargs):
+    """
+    Removes a deleted participant from the participant registry.
+    """
+    ParticipantRegistry.objects.filter(id=instance.id).delete()
+
+
+PARTICIPANT_TYPES = {model: type for type, model in PARTICIPANT_MODELS.items()}
+
+for model in PARTICIPANT_MODELS.values():
+    post_save.connect(register_participant, sender=model)
+    post_delete.connect(unregister_participant, sender=model)
@@ -1,7 +1,15 @@
+import csv
+import io
+import json
+import uuid
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.forms import ValidationError
 from django.test import TestCase
 
 from Apps.event.models import Event
+from Apps.event.services import EventService
 from Apps.participant.Enums.participantTypeEnum import ParticipantTypeEnum
 from Apps.participant.forms import (
     AdminForm,
@@ -10,7 +18,14 @@ from Apps.participant.forms import (
     SponsorForm,
     VolunteerForm,
 )
-from Apps.participant.models import Admin, Hacker, Mentor, Sponsor, Volunteer
+from Apps.participant.models import (
+    Admin,
+    Hacker,
+    Mentor,
+    ParticipantRegistry,
+    Sponsor,
+    Volunteer,
+)
 from Apps.participant.services import ParticipantService
 from Apps.users.models import CustomUser
 from django.test import RequestFactory
@@ -576,6 +591,78 @@ class ServiceParticipantTestCase(TestCase):
         )
         self.assertEqual(len(waitlisted_participants), 0)
 
+    def test_get_event_participants_page(self):
+        """
+        Test getting a filtered page of participants with a keyset cursor
+        """
+        Hacker(**self.hacker_data, user=self.user1, event=self.event).save()
+        Mentor(**self.mentor_data, user=self.user1, event=self.event).save()
+        Sponsor(**self.sponsor_data, user=self.user1, event=self.event).save()
+        Volunteer(**self.volunteer_data, user=self.user1, event=self.event).save()
+        admin = Admin(**self.admin_data, user=self.user1, event=self.event)
+        admin.status = "CONFIRMED"
+        admin.save()
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, page_size=3
+        )
+        self.assertEqual(len(participants), 3)
+        self.assertIsNotNone(cursor)
+
+        next_participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id,
+            cursor=ParticipantService.decode_cursor(cursor),
+            page_size=3,
+        )
+        self.assertEqual(len(next_participants), 2)
+        self.assertIsNone(cursor)
+        self.assertEqual(
+            len({p["id"] for p in participants + next_participants}), 5
+        )
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, search="albert a", participant_type="Mentor"
+        )
+        self.assertEqual(len(participants), 1)
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, status="Under Review"
+        )
+        self.assertEqual(len(participants), 4)
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, status="Confirmed", participant_type="admin"
+        )
+        self.assertEqual(participants[0]["id"], admin.id)
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, search="alb", page_size=4
+        )
+        self.assertEqual(len(participants), 4)
+        self.assertIn("rank", participants[0])
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id,
+            search="alb",
+            cursor=ParticipantService.decode_cursor(cursor),
+            page_size=4,
+        )
+        self.assertEqual(len(participants), 1)
+        self.assertIsNone(cursor)
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, search="nonexistent"
+        )
+        self.assertEqual(len(participants), 0)
+
+        participants, cursor = ParticipantService.get_event_participants_page(
+            self.event.id, search="a.com", participant_type="Mentor"
+        )
+        self.assertEqual(len(participants), 1)
+
+        with self.assertRaises(ValueError):
+            ParticipantService.decode_cursor("invalid")
+
     def test_get_participant(self):
         """
         Test getting a participant by ID
@@ -620,6 +707,34 @@ class ServiceParticipantTestCase(TestCase):
         )
         self.assertEqual(retrieved_participants, hacker)
 
+    def test_participant_registry_sync(self):
+        """
+        Test the participant registry follows creation, update and deletion
+        """
+        mentor = Mentor(**self.mentor_data, user=self.user1, event=self.event)
+        mentor.save()
+        entry = ParticipantRegistry.objects.get(id=mentor.id)
+        self.assertEqual(entry.type, "MENTOR")
+        self.assertEqual(entry.user, self.user1)
+        self.assertEqual(entry.get_participant(), mentor)
+
+        ParticipantService.delete_user_from_participant(self.user1)
+        entry.refresh_from_db()
+        self.assertIsNone(entry.user)
+
+        mentor.delete()
+        self.assertFalse(ParticipantRegistry.objects.filter(id=mentor.id).exists())
+
+        with self.assertNumQueries(2):
+            self.assertIsNone(
+                ParticipantService.get_participant(self.event.id, mentor.id)
+            )
+            self.assertIsNone(
+                ParticipantService.get_participant_by_event_and_user(
+                    self.event, self.user1
+                )
+            )
+
     def test_get_participant_form(self):
         """
         Test getting the form for a participant
@@ -798,6 +913,129 @@ class ServiceParticipantTestCase(TestCase):
 
         self.assertFalse(ParticipantService.check_in_participant(hacker))
 
+    def test_check_in_participant_by_id(self):
+        """
+        Test checking in a scanned participant with at most two queries
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user1, event=self.event)
+        hacker.save()
+        self.assertEqual(
+            ParticipantService.get_check_in_scan(self.event.id, self.user1, hacker.id),
+            (False, "HACKER"),
+        )
+
+        admin = Admin(**self.admin_data, user=self.user1, event=self.event)
+        admin.save()
+        self.assertEqual(
+            ParticipantService.get_check_in_scan(self.event.id, self.user1, uuid.uuid4()),
+            (True, None),
+        )
+        self.assertEqual(
+            ParticipantService.check_in_participant_by_id(
+                self.event.id, "HACKER", hacker.id
+            ),
+            "not_confirmed",
+        )
+
+        hacker.status = "CONFIRMED"
+        hacker.save()
+
+        with self.assertNumQueries(2):
+            is_admin, participant_type = ParticipantService.get_check_in_scan(
+                self.event.id, self.user1, hacker.id
+            )
+            result = ParticipantService.check_in_participant_by_id(
+                self.event.id, participant_type, hacker.id
+            )
+
+        self.assertTrue(is_admin)
+        self.assertEqual(result, "checked_in")
+        hacker.refresh_from_db()
+        self.assertEqual(hacker.status, "ATTENDED")
+        self.assertEqual(
+            ParticipantService.check_in_participant_by_id(
+                self.event.id, "HACKER", hacker.id
+            ),
+            "attended",
+        )
+
+    def test_get_check_in_roster(self):
+        """
+        Test the roster of confirmed and attended participants
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user1, event=self.event)
+        hacker.save()
+        mentor = Mentor(**self.mentor_data, user=self.user1, event=self.event)
+        mentor.status = "CONFIRMED"
+        mentor.save()
+
+        roster = ParticipantService.get_check_in_roster(self.event.id)
+        self.assertEqual(roster["confirmed"], [mentor.id.hex])
+        self.assertEqual(roster["attended"], [])
+
+        ParticipantService.check_in_participant(mentor)
+        new_roster = ParticipantService.get_check_in_roster(self.event.id)
+        self.assertEqual(new_roster["confirmed"], [])
+        self.assertEqual(new_roster["attended"], [mentor.id.hex])
+        self.assertNotEqual(new_roster["version"], roster["version"])
+        self.assertNotEqual(new_roster["signature"], roster["signature"])
+        self.assertTrue(
+            ParticipantService.verify_check_in_roster(
+                self.event.id, roster["version"], roster["signature"]
+            )
+        )
+        self.assertFalse(
+            ParticipantService.verify_check_in_roster(
+                uuid.uuid4(), roster["version"], roster["signature"]
+            )
+        )
+        self.assertFalse(
+            ParticipantService.verify_check_in_roster(
+                self.event.id, new_roster["version"], roster["signature"]
+            )
+        )
+
+    def test_sync_check_ins(self):
+        """
+        Test applying a batch of offline scans in scan order
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user1, event=self.event)
+        hacker.status = "CONFIRMED"
+        hacker.save()
+        mentor = Mentor(**self.mentor_data, user=self.user1, event=self.event)
+        mentor.save()
+
+        results = ParticipantService.sync_check_ins(
+            self.event.id,
+            [
+                {"id": str(hacker.id), "scanned_at": "2023-10-01T10:05:00Z"},
+                {"id": str(hacker.id), "scanned_at": "2023-10-01T10:00:00Z"},
+                {"id": str(mentor.id), "scanned_at": "2023-10-01T10:01:00Z"},
+                {"id": str(uuid.uuid4()), "scanned_at": "2023-10-01T10:02:00Z"},
+                {"id": "invalid", "scanned_at": "2023-10-01T10:03:00Z"},
+                {"id": str(hacker.id)},
+            ],
+        )
+        self.assertEqual(
+            results,
+            [
+                "duplicate",
+                "checked_in",
+                "not_confirmed",
+                "not_found",
+                "invalid",
+                "invalid",
+            ],
+        )
+        hacker.refresh_from_db()
+        self.assertEqual(hacker.status, "ATTENDED")
+
+        results = ParticipantService.sync_check_ins(
+            self.event.id,
+            [{"id": str(hacker.id), "scanned_at": "2023-10-01T09:00:00"}],
+        )
+        self.assertEqual(results, ["attended"])
+
     def test_is_participant_under_review(self):
         """
         Test checking if a participant is under review
@@ -842,6 +1080,87 @@ class ServiceParticipantTestCase(TestCase):
         self.assertEqual(hacker.status, "REJECTED")
         self.assertIsNone(hacker.accepted_date)
 
+    def test_transition_participants(self):
+        """
+        Test moving a batch of participants to a new status
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user1, event=self.event)
+        hacker.save()
+        mentor = Mentor(**self.mentor_data, user=self.user1, event=self.event)
+        mentor.status = "REJECTED"
+        mentor.save()
+        missing_id = "00000000-0000-0000-0000-000000000000"
+
+        results = ParticipantService.transition_participants(
+            self.event.id, [hacker.id, mentor.id, missing_id], "CONFIRMED"
+        )
+        self.assertEqual(
+            results,
+            {
+                str(hacker.id): "updated",
+                str(mentor.id): "conflict",
+                missing_id: "not_found",
+            },
+        )
+        hacker.refresh_from_db()
+        self.assertEqual(hacker.status, "CONFIRMED")
+        self.assertIsNotNone(hacker.accepted_date)
+
+        results = ParticipantService.transition_participants(
+            self.event.id, [hacker.id], "REJECTED"
+        )
+        self.assertEqual(results, {str(hacker.id): "conflict"})
+
+        ids = ParticipantService.get_event_participant_ids(
+            self.event.id, participant_type="Mentor", status="Rejected"
+        )
+        self.assertEqual(ids, [mentor.id])
+
+    def test_import_participants(self):
+        """
+        Test importing participants from CSV and JSONL rows
+        """
+        header = "email,phone_number,accepted_terms_and_conditions,t_shirt_size,origin,"
+        header += "university,degree,graduation_year,under_age,lenny_face,hear_about_us,"
+        header += "why_excited,first_hackathon,personal_projects,share_cv,subscribe"
+        row = "+1234567890,True,M,Spain,UPC,CS,2025,False,:),friend,code,True,apps,"
+        row += "False,False"
+        file = io.StringIO(
+            "\n".join(
+                [
+                    header,
+                    "a@a.com," + row,
+                    "a@a.com," + row,
+                    "unknown@a.com," + row,
+                    "a@a.com," + row.replace("2025", "2000"),
+                ]
+            )
+        )
+
+        created, rejected = ParticipantService.import_participants(
+            self.event,
+            "hacker",
+            ParticipantService.read_import_rows(file, "csv"),
+            batch_size=2,
+        )
+        self.assertEqual(created, 1)
+        self.assertEqual([r["row"] for r in rejected], [2, 3, 4])
+        hacker = Hacker.objects.get(event=self.event, user=self.user1)
+        self.assertEqual(hacker.type, "Hacker")
+        self.assertTrue(ParticipantRegistry.objects.filter(id=hacker.id).exists())
+
+        file = io.StringIO(
+            json.dumps({"email": "a@a.com", **self.sponsor_data}) + "\n{invalid\n"
+        )
+        created, rejected = ParticipantService.import_participants(
+            self.event, "sponsor", ParticipantService.read_import_rows(file, "jsonl")
+        )
+        self.assertEqual(created, 0)
+        self.assertEqual(len(rejected), 2)
+
+        with self.assertRaises(ValueError):
+            ParticipantService.import_participants(self.event, "unknown", [])
+
     def test_get_participant_diet(self):
         """
         Test getting the diet of a participant
@@ -1033,8 +1352,12 @@ class ViewParticipantTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "participants.html")
+
         self.assertContains(response, "albert")
 
+        response = self.client.get(f"{self.base_url}?cursor=invalid")
+        self.assertEqual(response.status_code, 400)
+
     def test_participant_CRUD_view_get(self):
         """
         Test the participant CRUD view GET method
@@ -1362,6 +1685,89 @@ class ViewParticipantTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 409)
 
+        Event.objects.filter(id=self.event.id).update(hidden=True)
+        EventService.invalidate_event(self.event.id)
+        response = self.client.post(
+            f"{self.base_url}checkin/",
+            {"qrResult": f"{hacker.id}"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_participant_checkin_roster_view_get(self):
+        """
+        Test the participant check-in roster view GET method
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user2, event=self.event)
+        hacker.status = "CONFIRMED"
+        hacker.save()
+
+        response = self.client.get(
+            "/event/00000000-0000-0000-0000-000000000000/participant/checkin/roster/"
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(f"{self.base_url}checkin/roster/")
+        self.assertEqual(response.status_code, 403)
+
+        self.admin.save()
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        response = self.client.get(f"{self.base_url}checkin/roster/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["confirmed"], [hacker.id.hex])
+
+        response = self.client.get(
+            f"{self.base_url}checkin/roster/",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_participant_checkin_sync_view_post(self):
+        """
+        Test the participant check-in sync view POST method
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user2, event=self.event)
+        hacker.status = "CONFIRMED"
+        hacker.save()
+        roster = ParticipantService.get_check_in_roster(self.event.id)
+        scans = {
+            "scans": [{"id": str(hacker.id), "scanned_at": "2023-10-01T10:00Z"}],
+            "version": roster["version"],
+            "signature": roster["signature"],
+        }
+
+        response = self.client.post(
+            f"{self.base_url}checkin/sync/", scans, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+        self.admin.save()
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        response = self.client.post(
+            f"{self.base_url}checkin/sync/",
+            {"scans": "invalid"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            f"{self.base_url}checkin/sync/", "[]", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            f"{self.base_url}checkin/sync/",
+            {**scans, "signature": "forged"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(
+            f"{self.base_url}checkin/sync/", scans, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"results": ["checked_in"]})
+
     def test_participant_accept_view_post(self):
         """
         Test the participant accept view POST method
@@ -1393,6 +1799,141 @@ class ViewParticipantTestCase(TestCase):
         response = self.client.post(f"{self.base_url}{hacker.id}/accept/")
         self.assertEqual(response.status_code, 403)
 
+    def test_participant_transition_view_post(self):
+        """
+        Test the participant transition view POST method
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user2, event=self.event)
+        hacker.save()
+        url = f"{self.base_url}transition/"
+        body = {"ids": [str(hacker.id)], "status": "WAITLISTED"}
+
+        response = self.client.post(
+            "/event/00000000-0000-0000-0000-000000000000/participant/transition/",
+            body,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        self.admin.save()
+        response = self.client.post(
+            url, {"ids": ["invalid"], "status": "WAITLISTED"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url, {"ids": [str(hacker.id)], "status": "ATTENDED"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"results": {str(hacker.id): "updated"}})
+
+        response = self.client.post(
+            url,
+            {"filter": {"type": "Hacker", "status": "Waitlisted"}, "status": "INVITED"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"results": {str(hacker.id): "updated"}})
+
+    def test_participant_export_view_get(self):
+        """
+        Test the participant export view GET method
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user2, event=self.event)
+        hacker.save()
+        url = f"{self.base_url}export/"
+
+        response = self.client.get(
+            "/event/00000000-0000-0000-0000-000000000000/participant/export/"
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        self.admin.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("id,type,status"))
+        self.assertIn(str(hacker.id), lines[1])
+
+        response = self.client.get(f"{url}?format=ndjson")
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])["user__email"], self.user2.email)
+        self.assertEqual(len(lines), 2)
+
+        response = self.client.get(f"{url}?format=xml")
+        self.assertEqual(response.status_code, 400)
+
+    async def test_participant_export_view_get_asgi(self):
+        """
+        Test that the participant export view streams asynchronously under ASGI
+        """
+        hacker = Hacker(**self.hacker_data, user=self.user2, event=self.event)
+        await sync_to_async(hacker.save)()
+        await sync_to_async(self.admin.save)()
+        await sync_to_async(self.async_client.force_login)(self.user1)
+
+        response = await self.async_client.get(f"{self.base_url}export/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        lines = content.decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn(str(hacker.id), lines[1])
+
+    def test_participant_import_view_post(self):
+        """
+        Test the participant import view POST method
+        """
+        url = f"{self.base_url}import/?type=sponsor"
+        row = {"email": self.user2.email, **self.sponsor_data}
+        file = SimpleUploadedFile(
+            "sponsors.jsonl", json.dumps(row).encode(), "application/x-ndjson"
+        )
+
+        response = self.client.post(url, {"file": file})
+        self.assertEqual(response.status_code, 401)
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        self.admin.save()
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+
+        file.seek(0)
+        response = self.client.post(url, {"file": file})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"created": 1, "rejected": []})
+        self.assertTrue(Sponsor.objects.filter(user=self.user2).exists())
+
+    def test_participant_import_view_post_malformed_csv(self):
+        """
+        Test the participant import view POST method with a malformed CSV file
+        """
+        url = f"{self.base_url}import/?type=sponsor"
+        content = b"email,name\n" + b"a" * (csv.field_size_limit() + 1) + b",row\n"
+        file = SimpleUploadedFile("sponsors.csv", content, "text/csv")
+
+        self.client.login(username=self.user1.email, password=self.user1_password)
+        self.admin.save()
+        response = self.client.post(url, {"file": file})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Sponsor.objects.filter(event=self.event).exists())
+
     def test_participant_reject_view_post(self):
         """
         Test the participant reject view POST method
@@ -1423,3 +1964,32 @@ class ViewParticipantTestCase(TestCase):
 
         response = self.client.post(f"{self.base_url}{hacker.id}/reject/")
         self.assertEqual(response.status_code, 403)
+
+
+class CommandParticipantTestCase(TestCase):
+    def test_benchmark_checkin(self):
+        """
+        Test the door-rush benchmark report
+        """
+        output = io.StringIO()
+        call_command(
+            "benchmark_checkin",
+            participants=5,
+            scanners=1,
+            duplicate_rate=0.4,
+            stdout=output,
+        )
+        report = json.loads(output.getvalue())
+
+        self.assertEqual(set(report["results"]), {"participant", "activity", "hardware"})
+
+        for result in report["results"].values():
+            self.assertEqual(result["scans"], 7)
+            self.assertEqual(result["statuses"], {"200": 5, "409": 2})
+            self.assertEqual(result["conflict_rate"], round(2 / 7, 4))
+            self.assertGreater(result["queries_per_scan"]["mean"], 0)
+            self.assertLessEqual(
+                result["latency_ms"]["p50"], result["latency_ms"]["p99"]
+            )
+
+        self.assertFalse(Event.objects.exists())
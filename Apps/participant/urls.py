@@ -8,6 +8,27 @@ urlpatterns = [
     path(
         "checkin/", views.ParticipantCheckInView.as_view(), name="participant-checkin"
     ),
+    path(
+        "checkin/roster/",
+        views.ParticipantCheckInRosterView.as_view(),
+        name="participant-checkin-roster",
+    ),
+    path(
+        "checkin/sync/",
+        views.ParticipantCheckInSyncView.as_view(),
+        name="participant-checkin-sync",
+    ),
+    path(
+        "transition/",
+        views.ParticipantTransitionView.as_view(),
+        name="participant-transition",
+    ),
+    path(
+        "export/", views.ParticipantExportView.as_view(), name="participant-export"
+    ),
+    path(
+        "import/", views.ParticipantImportView.as_view(), name="participant-import"
+    ),
     path("mine/", views.ParticipantMineView.as_view(), name="participant-Mine"),
     path("id/", views.ParticipantMineIdView.as_view(), name="participant-id"),
     path("<uuid:pk>/id/", views.ParticipantIdView.as_view(), name="participant-id"),
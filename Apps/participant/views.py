@@ -1,12 +1,22 @@
+import csv
+import io
 import json
+import os
+import uuid
 from django.forms import ValidationError
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.utils.http import parse_etags, quote_etag
 from django.views import View
 from Apps.event.services import EventService
+from Mybits2.streaming import stream_content
 from .forms import AdminForm
 
-from .services import ParticipantService
+from .services import (
+    CHECK_IN_SYNC_MAX_SCANS,
+    TRANSITION_STATUSES,
+    ParticipantService,
+)
 
 
 # Create your views here.
@@ -22,10 +32,10 @@ class ParticipantView(View):
         search = request.GET.get("search")
         participant_type = request.GET.get("type")
         status = request.GET.get("status")
+        cursor = request.GET.get("cursor")
 
         try:
-            event = EventService.get_event(event_id)
-            participants = ParticipantService.get_event_participants(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -33,25 +43,36 @@ class ParticipantView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event_id, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
-        if search:
-            participants = ParticipantService.filter_by_name_and_email(
-                search, participants
-            )
+        try:
+            if cursor:
+                cursor = ParticipantService.decode_cursor(cursor)
 
-        if participant_type:
-            participants = ParticipantService.filter_event_participants_by_type(
-                participant_type, participants
-            )
+        except ValueError:
+            return HttpResponse(status=400)
 
-        if status:
-            participants = ParticipantService.filter_event_participants_by_status(
-                status, participants
-            )
+        participants, next_cursor = ParticipantService.get_event_participants_page(
+            event_id,
+            search=search,
+            participant_type=participant_type,
+            status=status,
+            cursor=cursor,
+        )
 
-        return render(request, "participants.html", {"participants": participants})
+        next_page = None
+
+        if next_cursor:
+            query = request.GET.copy()
+            query["cursor"] = next_cursor
+            next_page = query.urlencode()
+
+        return render(
+            request,
+            "participants.html",
+            {"participants": participants, "next_page": next_page},
+        )
 
 
 class ParticipantCRUDView(View):
@@ -67,7 +88,7 @@ class ParticipantCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -84,7 +105,7 @@ class ParticipantCRUDView(View):
             form = ParticipantService.get_participant_form(participant)
             return render(request, "participantEdit.html", {"form": form})
 
-        elif ParticipantService.is_user_admin(event_id, request.user):
+        elif request.event_context.is_admin:
             participant_fields = ParticipantService.participant_to_dict(participant)
             under_review = ParticipantService.is_participant_under_review(participant)
             return render(
@@ -107,7 +128,7 @@ class ParticipantCRUDView(View):
         participant_id = kwargs.get("pk")
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             participant = ParticipantService.get_participant(event_id, participant_id)
 
         except ValueError:
@@ -145,7 +166,7 @@ class ParticipantCRUDView(View):
         participant_id = kwargs.get("pk")
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -174,7 +195,7 @@ class ParticipantApplicationView(View):
 
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -184,9 +205,7 @@ class ParticipantApplicationView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant:
             return redirect(
@@ -224,7 +243,7 @@ class ParticipantApplicationView(View):
         event_id = kwargs.get("event_id")
         participant_type = request.GET.get("type")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -295,7 +314,7 @@ class ParticipantIdView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -307,7 +326,7 @@ class ParticipantIdView(View):
 
         if request.user.is_authenticated is False or (
             request.user != participant.user
-            and not ParticipantService.is_user_admin(event_id, request.user)
+            and not request.event_context.is_admin
         ):
             return HttpResponse(status=403)
 
@@ -331,7 +350,7 @@ class ParticipantMineIdView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -339,9 +358,7 @@ class ParticipantMineIdView(View):
         if request.user.is_authenticated is False:
             return HttpResponse(status=403)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if not participant:
             return redirect("/event/" + str(event_id) + "/participant/apply/")
@@ -366,7 +383,7 @@ class ParticipantMineView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -374,9 +391,7 @@ class ParticipantMineView(View):
         if request.user.is_authenticated is False:
             return HttpResponse(status=403)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if not participant:
             return HttpResponse(status=400)
@@ -398,61 +413,178 @@ class ParticipantCheckInView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            EventService.get_event(event_id)
+            request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
 
         if (
             request.user.is_authenticated is False
-            or ParticipantService.is_user_admin(event_id, request.user) is False
+            or request.event_context.is_admin is False
         ):
             return HttpResponse(status=403)
 
         return render(
             request,
             "participantCheckIn.html",
-            {"event_id": event_id},
+            {"event_id": event_id, "sync_max_scans": CHECK_IN_SYNC_MAX_SCANS},
             status=200,
         )
 
     def post(self, request, *args, **kwargs):
         """
-        This method handles the check-in action of participants.
+        This method handles the check-in action of participants. A successful scan
+        only needs the admin and participant lookup plus one conditional UPDATE,
+        the event is only looked up to tell a missing event apart from an error.
         """
         event_id = kwargs.get("event_id")
 
         try:
-            EventService.get_event(event_id)
+            qr = json.loads(request.body).get("qrResult")
+
+        except Exception:
+            return self.event_error(request, 400)
+
+        if request.user.is_authenticated is False:
+            return self.event_error(request, 401)
+
+        try:
+            participant_id = uuid.UUID(str(qr))
 
         except ValueError:
+            participant_id = None
+
+        try:
+            is_admin, participant_type = ParticipantService.get_check_in_scan(
+                event_id, request.user, participant_id
+            )
+
+        except ValidationError:
+            return HttpResponse(status=404)
+
+        if not is_admin:
+            return self.event_error(request, 401)
+
+        if not participant_type:
             return HttpResponse(status=404)
 
+        result = ParticipantService.check_in_participant_by_id(
+            event_id, participant_type, participant_id
+        )
+
+        if result == "checked_in":
+            return HttpResponse(status=200)
+
+        if result == "attended":
+            return HttpResponse(status=409)
+
+        return HttpResponse(status=403)
+
+    def event_error(self, request, status):
+        """
+        This method returns the error status, or 404 if the event does not exist.
+        """
         try:
-            qr = json.loads(request.body).get("qrResult")
+            request.event_context.get_event()
 
-        except Exception:
-            return HttpResponse(status=400)
+        except ValueError:
+            return HttpResponse(status=404)
+
+        return HttpResponse(status=status)
+
+
+class ParticipantCheckInRosterView(View):
+    """
+    This view handles the roster downloaded by offline check-in kiosks.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        This method returns the signed roster of the event, or 304 if the kiosk
+        already has the current version.
+        """
+        event_id = kwargs.get("event_id")
+
+        try:
+            request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
 
         if (
             request.user.is_authenticated is False
-            or not ParticipantService.is_user_admin(event_id, request.user)
+            or request.event_context.is_admin is False
         ):
-            return HttpResponse(status=401)
+            return HttpResponse(status=403)
 
-        participant = ParticipantService.get_participant(event_id, qr)
+        roster = ParticipantService.get_check_in_roster(event_id)
+        etag = quote_etag(roster["version"])
 
-        if not participant:
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=304)
+
+        else:
+            response = HttpResponse(
+                status=200,
+                content=json.dumps(roster, separators=(",", ":")),
+                content_type="application/json",
+            )
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class ParticipantCheckInSyncView(View):
+    """
+    This view handles the scans queued by offline check-in kiosks.
+    """
+
+    def post(self, request, *args, **kwargs):
+        """
+        This method applies a batch of queued scans and returns the result of each.
+        The batch carries the version and signature of the roster the kiosk validated
+        the scans against, and is refused if they were not issued for the event.
+        """
+        event_id = kwargs.get("event_id")
+
+        try:
+            request.event_context.get_event()
+
+        except ValueError:
             return HttpResponse(status=404)
 
-        if ParticipantService.is_participant_accepted_or_attended(participant) is False:
-            return HttpResponse(status=403)
+        if (
+            request.user.is_authenticated is False
+            or not request.event_context.is_admin
+        ):
+            return HttpResponse(status=401)
 
-        if ParticipantService.check_in_participant(participant):
-            return HttpResponse(status=200)
+        try:
+            body = json.loads(request.body)
 
-        else:
-            return HttpResponse(status=409)
+        except ValueError:
+            return HttpResponse(status=400)
+
+        if not isinstance(body, dict):
+            return HttpResponse(status=400)
+
+        scans = body.get("scans")
+
+        if not isinstance(scans, list) or len(scans) > CHECK_IN_SYNC_MAX_SCANS:
+            return HttpResponse(status=400)
+
+        if not ParticipantService.verify_check_in_roster(
+            event_id, body.get("version"), body.get("signature")
+        ):
+            return HttpResponse(status=403)
+
+        results = ParticipantService.sync_check_ins(event_id, scans)
+        return HttpResponse(
+            status=200,
+            content=json.dumps({"results": results}),
+            content_type="application/json",
+        )
 
 
 class ParticipantAcceptView(View):
@@ -468,7 +600,7 @@ class ParticipantAcceptView(View):
         participant_id = kwargs.get("pk")
 
         try:
-            EventService.get_event(event_id)
+            request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -480,7 +612,7 @@ class ParticipantAcceptView(View):
 
         if (
             request.user.is_authenticated is False
-            or not ParticipantService.is_user_admin(event_id, request.user)
+            or not request.event_context.is_admin
         ):
             return HttpResponse(status=401)
 
@@ -507,7 +639,7 @@ class ParticipantRejectView(View):
         participant_id = kwargs.get("pk")
 
         try:
-            EventService.get_event(event_id)
+            request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -519,7 +651,7 @@ class ParticipantRejectView(View):
 
         if (
             request.user.is_authenticated is False
-            or not ParticipantService.is_user_admin(event_id, request.user)
+            or not request.event_context.is_admin
         ):
             return HttpResponse(status=401)
 
@@ -531,3 +663,159 @@ class ParticipantRejectView(View):
 
         else:
             return HttpResponse(status=409)
+
+
+class ParticipantTransitionView(View):
+    """
+    This view handles the review of a batch of participants.
+    """
+
+    def post(self, request, *args, **kwargs):
+        """
+        This method moves a list of participants, or the participants matching a filter,
+        to a new status.
+        """
+        event_id = kwargs.get("event_id")
+
+        try:
+            request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if (
+            request.user.is_authenticated is False
+            or not request.event_context.is_admin
+        ):
+            return HttpResponse(status=401)
+
+        try:
+            body = json.loads(request.body)
+            target_status = body.get("status")
+            participant_ids = body.get("ids")
+            filters = body.get("filter")
+
+            if participant_ids is not None:
+                participant_ids = [uuid.UUID(str(id)) for id in participant_ids]
+
+            elif isinstance(filters, dict):
+                participant_ids = ParticipantService.get_event_participant_ids(
+                    event_id,
+                    search=filters.get("search"),
+                    participant_type=filters.get("type"),
+                    status=filters.get("status"),
+                )
+
+            else:
+                return HttpResponse(status=400)
+
+        except (ValueError, TypeError, AttributeError):
+            return HttpResponse(status=400)
+
+        if target_status not in TRANSITION_STATUSES:
+            return HttpResponse(status=400)
+
+        results = ParticipantService.transition_participants(
+            event_id, participant_ids, target_status
+        )
+        return HttpResponse(
+            status=200,
+            content=json.dumps({"results": results}),
+            content_type="application/json",
+        )
+
+
+class ParticipantExportView(View):
+    """
+    This view handles the export of the participants of an event.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        This method streams every participant of the event as CSV or NDJSON.
+        """
+        event_id = kwargs.get("event_id")
+        export_format = request.GET.get("format", "csv")
+
+        try:
+            request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if request.user.is_authenticated is False:
+            return redirect("/user/login/?next=" + request.path)
+
+        if not request.event_context.is_admin:
+            return HttpResponse(status=403)
+
+        participants = ParticipantService.export_event_participants(event_id)
+
+        if export_format == "csv":
+            content = ParticipantService.participants_to_csv(participants)
+            content_type = "text/csv"
+
+        elif export_format == "ndjson":
+            content = ParticipantService.participants_to_ndjson(participants)
+            content_type = "application/x-ndjson"
+
+        else:
+            return HttpResponse(status=400)
+
+        response = StreamingHttpResponse(
+            stream_content(request, content), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="participants.{export_format}"'
+        )
+        return response
+
+
+class ParticipantImportView(View):
+    """
+    This view handles the import of participants into an event.
+    """
+
+    def post(self, request, *args, **kwargs):
+        """
+        This method imports the participants of the type given in the query string
+        from an uploaded CSV or JSONL file.
+        """
+        event_id = kwargs.get("event_id")
+        participant_type = request.GET.get("type")
+
+        try:
+            event = request.event_context.get_event()
+
+        except ValueError:
+            return HttpResponse(status=404)
+
+        if (
+            request.user.is_authenticated is False
+            or not request.event_context.is_admin
+        ):
+            return HttpResponse(status=401)
+
+        file = request.FILES.get("file")
+
+        if file is None or participant_type is None:
+            return HttpResponse(status=400)
+
+        import_format = request.GET.get("format") or os.path.splitext(file.name)[1][1:]
+
+        try:
+            rows = ParticipantService.read_import_rows(
+                io.TextIOWrapper(file, encoding="utf-8", newline=""), import_format
+            )
+            created, rejected = ParticipantService.import_participants(
+                event, participant_type, rows
+            )
+
+        except (ValueError, UnicodeDecodeError, csv.Error):
+            return HttpResponse(status=400)
+
+        return HttpResponse(
+            status=200,
+            content=json.dumps({"created": created, "rejected": rejected}),
+            content_type="application/json",
+        )
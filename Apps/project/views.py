@@ -2,8 +2,6 @@ from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.views import View
 
-from Apps.event.services import EventService
-from Apps.participant.services import ParticipantService
 from Apps.project.forms import ProjectForm, ValorationForm
 from Apps.project.services import ProjectService, ValorationService
 from Apps.team.services import TeamService
@@ -20,7 +18,7 @@ class ProjectView(View):
         search = request.GET.get("search")
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -28,8 +26,8 @@ class ProjectView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
-            participant = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        if not request.event_context.is_admin:
+            participant = request.event_context.participant
             team = TeamService.get_team_by_event_and_participant(event, participant)
 
             if not participant:
@@ -63,7 +61,7 @@ class ProjectCreateView(View):
         """
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -71,10 +69,10 @@ class ProjectCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect(f"/event/{event_id}/project/")
 
-        participant = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        participant = request.event_context.participant
         team = TeamService.get_team_by_event_and_participant(event, participant)
 
         if not participant:
@@ -97,7 +95,7 @@ class ProjectCreateView(View):
         """
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -105,10 +103,10 @@ class ProjectCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect(f"/event/{event_id}/project/")
 
-        participant = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        participant = request.event_context.participant
         team = TeamService.get_team_by_event_and_participant(event, participant)
 
         if not participant or not team:
@@ -134,7 +132,7 @@ class ProjectCRUDView(View):
         project_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             project = ProjectService.get_project(project_id)
 
         except ValueError:
@@ -143,11 +141,11 @@ class ProjectCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             project_dict = ProjectService.project_to_dict(project)
             return render(request, 'projectDetail.html', {'fields': project_dict})
 
-        participant = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        participant = request.event_context.participant
         team = TeamService.get_team_by_event_and_participant(event, participant)
 
         if not participant:
@@ -170,7 +168,7 @@ class ProjectCRUDView(View):
         project_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             project = ProjectService.get_project(project_id)
 
         except ValueError:
@@ -179,10 +177,10 @@ class ProjectCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect(f"/event/{event_id}/project/")
 
-        participant = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        participant = request.event_context.participant
         team = TeamService.get_team_by_event_and_participant(event, participant)
 
         if not participant:
@@ -210,7 +208,7 @@ class ProjectCRUDView(View):
         project_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             project = ProjectService.get_project(project_id)
 
         except ValueError:
@@ -219,10 +217,10 @@ class ProjectCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect(f"/event/{event_id}/project/")
 
-        participant = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        participant = request.event_context.participant
         team = TeamService.get_team_by_event_and_participant(event, participant)
 
         if not participant:
@@ -249,7 +247,7 @@ class ProjectValorationView(View):
         project_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             project = ProjectService.get_project(project_id)
 
         except ValueError:
@@ -258,7 +256,7 @@ class ProjectValorationView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = ValorationForm()
@@ -272,7 +270,7 @@ class ProjectValorationView(View):
         project_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             project = ProjectService.get_project(project_id)
 
         except ValueError:
@@ -281,10 +279,10 @@ class ProjectValorationView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
-        admin = ParticipantService.get_participant_by_event_and_user(event, request.user)
+        admin = request.event_context.participant
 
         form = ValorationForm(request.POST)
         if form.is_valid():
@@ -3,8 +3,6 @@ from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.views import View
 
-from Apps.event.services import EventService
-from Apps.participant.services import ParticipantService
 from Apps.team.forms import TeamForm
 from Apps.team.services import TeamService
 
@@ -23,7 +21,7 @@ class TeamView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -31,14 +29,12 @@ class TeamView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             teams = TeamService.get_all_teams(event_id)
 
             if search:
@@ -67,7 +63,7 @@ class TeamCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -75,14 +71,12 @@ class TeamCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect("/event/" + event_id + "/team/")
 
         team = TeamService.get_team_by_event_and_participant(event, participant)
@@ -100,7 +94,7 @@ class TeamCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -108,14 +102,12 @@ class TeamCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
         
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect("/event/" + event_id + "/team/")
 
         team = TeamService.get_team_by_event_and_participant(event, participant)
@@ -144,7 +136,7 @@ class TeamCRUDView(View):
         team_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -152,9 +144,7 @@ class TeamCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
@@ -164,7 +154,7 @@ class TeamCRUDView(View):
         if team is None:
             return HttpResponse(status=404)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             fields = TeamService.team_to_dict(team)
             participants = TeamService.get_team_participants(team)
             return render(request, "teamDetail.html", {"fields": fields, "participants": participants})
@@ -184,7 +174,7 @@ class TeamCRUDView(View):
         team_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -192,14 +182,12 @@ class TeamCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect("/event/" + event_id + "/team/")
 
         team = TeamService.get_team(team_id)
@@ -226,7 +214,7 @@ class TeamCRUDView(View):
         team_id = kwargs.get("pk")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -234,9 +222,7 @@ class TeamCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
@@ -266,7 +252,7 @@ class TeamJoinView(View):
         """
         event_id = kwargs.get("event_id")
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -274,12 +260,10 @@ class TeamJoinView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect("/event/" + event_id + "/team/")
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
@@ -296,7 +280,7 @@ class TeamJoinView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -309,12 +293,10 @@ class TeamJoinView(View):
         if request.user.is_authenticated is False:
             return HttpResponse(status=401)
         
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect("/event/" + event_id + "/team/")
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
         team = TeamService.get_team(qr)
 
         if not participant or not team:
@@ -341,7 +323,7 @@ class TeamIdView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -349,14 +331,12 @@ class TeamIdView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        participant = ParticipantService.get_participant_by_event_and_user(
-            event, request.user
-        )
+        participant = request.event_context.participant
 
         if participant is None:
             return redirect("/event/" + event_id + "/participant/apply/")
 
-        if ParticipantService.is_user_admin(event, request.user):
+        if request.event_context.is_admin:
             return redirect("/event/" + event_id + "/team/")
 
         team = TeamService.get_team_by_event_and_participant(event, participant)
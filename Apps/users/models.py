@@ -1,9 +1,11 @@
 import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
 from Apps.users.Enums.dietaryEnum import DietaryEnum
 from Apps.users.Enums.genderEnum import GenderEnum
+from Apps.users.search import user_search_vector
 from datetime import date
 
 
@@ -62,6 +64,13 @@ class CustomUser(AbstractUser):
         []
     )  # This is just for the superuser creation, the rest of the fields are required in the form and by the not null check in the model!
 
+    class Meta(AbstractUser.Meta):
+        # The trigram indexes for substring searches are created by migration
+        # 0003, only where the pg_trgm extension is available
+        indexes = [
+            GinIndex(user_search_vector(), name="user_search_idx"),
+        ]
+
     def clean(self):
         """
         Custom clean to validate each restriction of fields.
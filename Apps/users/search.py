@@ -0,0 +1,67 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import DecimalField, Q
+from django.db.models.functions import Cast
+
+USER_SEARCH_FIELDS = ("first_name", "last_name", "email", "username")
+SEARCH_CONFIG = "simple"
+
+USER_SUBSTRING_FIELDS = ("email", "username")
+
+# Shorter searches have no trigram to match, so they stay prefix only
+SUBSTRING_MIN_LENGTH = 3
+
+
+def user_search_vector(prefix=""):
+    """
+    Returns the full-text search vector over the names, email and username of a user.
+    The prefix allows building it through a relation, e.g. "user__".
+    """
+    return SearchVector(
+        *(prefix + field for field in USER_SEARCH_FIELDS), config=SEARCH_CONFIG
+    )
+
+
+def user_search_query(search):
+    """
+    Returns a prefix full-text query matching every word of the search,
+    or None if the search has no searchable words.
+    """
+    terms = re.findall(r"[\w@.+-]+", search)
+
+    if not terms:
+        return None
+
+    return SearchQuery(
+        " & ".join(term + ":*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+def user_search_filter(query, search, prefix=""):
+    """
+    Returns the filter of a user search: the full-text query, or the search found
+    anywhere in the email or username, such as an email domain, which the prefix
+    query cannot match. The trigram indexes of the users table serve the second part.
+    The prefix allows building it through a relation, e.g. "user__".
+    """
+    condition = Q(search=query)
+    search = search.strip()
+
+    if len(search) >= SUBSTRING_MIN_LENGTH:
+        for field in USER_SUBSTRING_FIELDS:
+            condition |= Q(**{prefix + field + "__icontains": search})
+
+    return condition
+
+
+def user_search_rank(query, prefix=""):
+    """
+    Returns the relevance of a user for a query, as an exact decimal so it can be
+    used in pagination cursors.
+    """
+    return Cast(
+        SearchRank(user_search_vector(prefix), query),
+        output_field=DecimalField(max_digits=12, decimal_places=8),
+    )
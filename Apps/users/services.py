@@ -1,8 +1,18 @@
+import uuid
+from decimal import Decimal, InvalidOperation
 from django.forms import ValidationError
 from django.db.models import Q
 
 from Apps.participant.services import ParticipantService
 from .models import CustomUser
+from .search import (
+    user_search_filter,
+    user_search_query,
+    user_search_rank,
+    user_search_vector,
+)
+
+USERS_PAGE_SIZE = 50
 
 
 class UserService:
@@ -58,12 +68,51 @@ class UserService:
     @staticmethod
     def find_by_name_and_email(search):
         """
-        Retrieve users by name or email.
+        Retrieve users by name, email or username, ordered by relevance.
         """
-        users = CustomUser.objects.filter(
-            Q(username__icontains=search)
-            | Q(email__icontains=search)
-            | Q(first_name__icontains=search)
-            | Q(last_name__icontains=search)
+        query = user_search_query(search)
+
+        if query is None:
+            return CustomUser.objects.none()
+
+        users = (
+            CustomUser.objects.annotate(
+                search=user_search_vector(), rank=user_search_rank(query)
+            )
+            .filter(user_search_filter(query, search))
+            .order_by("-rank", "id")
         )
         return users
+
+    @staticmethod
+    def get_users_page(users, cursor=None, page_size=USERS_PAGE_SIZE):
+        """
+        Retrieve a page of users ranked by relevance and the cursor of the next page.
+        """
+        if cursor:
+            rank, user_id = cursor
+            users = users.filter(Q(rank__lt=rank) | Q(rank=rank, id__gt=user_id))
+
+        users = list(users[: page_size + 1])
+
+        if len(users) > page_size:
+            users = users[:page_size]
+            return users, str(users[-1].rank) + "|" + str(users[-1].id)
+
+        return users, None
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Parse a users page cursor, raising ValueError if it is invalid.
+        """
+        rank, separator, user_id = cursor.partition("|")
+
+        if not separator:
+            raise ValueError("Invalid cursor")
+
+        try:
+            return Decimal(rank), uuid.UUID(user_id)
+
+        except InvalidOperation:
+            raise ValueError("Invalid cursor")
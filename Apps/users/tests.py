@@ -161,6 +161,19 @@ class ServicesUserTestCase(TestCase):
         self.assertNotIn(self.user2, users)
         self.assertNotIn(self.user3, users)
 
+    def test_find_by_name_and_email_domain(self):
+        """
+        Test the retrieval of users by a part of their email.
+        """
+        self.user2.email = "x@upc.edu"
+        self.user2.save()
+
+        users = UserService.find_by_name_and_email("upc.edu")
+        self.assertEqual(list(users), [self.user2])
+
+        users = UserService.find_by_name_and_email("@upc")
+        self.assertEqual(list(users), [self.user2])
+
     def test_find_by_name_and_email_not_found(self):
         """
         Test the retrieval of users by name or email.
@@ -168,6 +181,32 @@ class ServicesUserTestCase(TestCase):
         users = UserService.find_by_name_and_email("notfound")
         self.assertEqual(users.count(), 0)
 
+        users = UserService.find_by_name_and_email("&!()")
+        self.assertEqual(users.count(), 0)
+
+    def test_get_users_page(self):
+        """
+        Test the ranked pagination of a users search.
+        """
+        self.user2.first_name = "ab"
+        self.user2.save()
+        users, cursor = UserService.get_users_page(
+            UserService.find_by_name_and_email("a"), page_size=1
+        )
+        self.assertEqual(users, [self.user1])
+        self.assertIsNotNone(cursor)
+
+        users, cursor = UserService.get_users_page(
+            UserService.find_by_name_and_email("a"),
+            UserService.decode_cursor(cursor),
+            page_size=1,
+        )
+        self.assertEqual(users, [self.user2])
+        self.assertIsNone(cursor)
+
+        with self.assertRaises(ValueError):
+            UserService.decode_cursor("invalid")
+
     def test_create_user(self):
         """
         Test the creation of a user.
@@ -19,11 +19,30 @@ class UsersView(View):
 
     def get(self, request, *args, **kwargs):
         search = request.GET.get("search")
+        next_page = None
+
         if search:
-            users = UserService.find_by_name_and_email(search)
+            try:
+                cursor = request.GET.get("cursor")
+                cursor = UserService.decode_cursor(cursor) if cursor else None
+
+            except ValueError:
+                return HttpResponse(status=400)
+
+            users, next_cursor = UserService.get_users_page(
+                UserService.find_by_name_and_email(search), cursor
+            )
+
+            if next_cursor:
+                query = request.GET.copy()
+                query["cursor"] = next_cursor
+                next_page = query.urlencode()
+
         else:
             users = UserService.get_first_100_users()
-        return render(request, "users.html", {"users": users}, status=200)
+        return render(
+            request, "users.html", {"users": users, "next_page": next_page}, status=200
+        )
 
 
 class ProfileView(View):
@@ -3,7 +3,6 @@ from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.views import View
 
-from Apps.event.services import EventService
 from Apps.participant.services import ParticipantService
 from Apps.warehouse.forms import LuggageForm, WarehouseForm
 from Apps.warehouse.services import WarehouseService
@@ -23,7 +22,7 @@ class WarehouseView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -31,7 +30,7 @@ class WarehouseView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         if search:
@@ -55,7 +54,7 @@ class WarehouseCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -63,7 +62,7 @@ class WarehouseCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = WarehouseForm()
@@ -76,7 +75,7 @@ class WarehouseCreateView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
 
         except ValueError:
             return HttpResponse(status=404)
@@ -84,7 +83,7 @@ class WarehouseCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = WarehouseForm(request.POST)
@@ -105,7 +104,7 @@ class WarehouseCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
 
         except ValueError:
@@ -114,7 +113,7 @@ class WarehouseCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = WarehouseForm(instance=warehouse)
@@ -129,7 +128,7 @@ class WarehouseCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
 
         except ValueError:
@@ -138,7 +137,7 @@ class WarehouseCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = WarehouseForm(request.POST, instance=warehouse)
@@ -161,7 +160,7 @@ class WarehouseCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
 
         except ValueError:
@@ -170,7 +169,7 @@ class WarehouseCRUDView(View):
         if request.user.is_authenticated is False:
             return HttpResponse(status=403)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         if WarehouseService.delete_warehouse(warehouse):
@@ -192,7 +191,7 @@ class WarehouseLuggageView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
 
         except ValueError:
@@ -201,7 +200,7 @@ class WarehouseLuggageView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         luggage = WarehouseService.get_warehouse_luggage(warehouse)
@@ -223,7 +222,7 @@ class WarehouseLuggageCreateView(View):
         participant_id = kwargs.get("participant_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
             participant = ParticipantService.get_participant(event_id, participant_id)
 
@@ -236,7 +235,7 @@ class WarehouseLuggageCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = LuggageForm()
@@ -252,7 +251,7 @@ class WarehouseLuggageCreateView(View):
         participant_id = kwargs.get("participant_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
             participant = ParticipantService.get_participant(event_id, participant_id)
 
@@ -265,7 +264,7 @@ class WarehouseLuggageCreateView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = LuggageForm(request.POST, request.FILES)
@@ -299,7 +298,7 @@ class WarehouseLuggageCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             WarehouseService.get_warehouse(warehouse_id)
             luggage = WarehouseService.get_luggage(luggage_id)
 
@@ -309,7 +308,7 @@ class WarehouseLuggageCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = LuggageForm(instance=luggage)
@@ -325,7 +324,7 @@ class WarehouseLuggageCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
             luggage = WarehouseService.get_luggage(luggage_id)
 
@@ -335,7 +334,7 @@ class WarehouseLuggageCRUDView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         form = LuggageForm(request.POST, request.FILES, instance=luggage)
@@ -369,7 +368,7 @@ class WarehouseLuggageCRUDView(View):
         event_id = kwargs.get("event_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
             luggage = WarehouseService.get_luggage(luggage_id)
 
@@ -379,7 +378,7 @@ class WarehouseLuggageCRUDView(View):
         if request.user.is_authenticated is False:
             return HttpResponse(status=403)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         if WarehouseService.delete_luggage(luggage, warehouse):
@@ -401,7 +400,7 @@ class WarehouseLuggageByParticipantView(View):
         participant_id = kwargs.get("participant_id")
 
         try:
-            event = EventService.get_event(event_id)
+            event = request.event_context.get_event()
             warehouse = WarehouseService.get_warehouse(warehouse_id)
 
         except ValueError:
@@ -411,7 +410,7 @@ class WarehouseLuggageByParticipantView(View):
         if request.user.is_authenticated is False:
             return redirect("/user/login/?next=" + request.path)
 
-        if not ParticipantService.is_user_admin(event, request.user):
+        if not request.event_context.is_admin:
             return HttpResponse(status=403)
 
         participant = ParticipantService.get_participant(event_id, participant_id)
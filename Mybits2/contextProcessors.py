@@ -1,47 +1,15 @@
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
-from Apps.event.services import EventService
-from Apps.participant.services import ParticipantService
+from .middleware import EventContext
 
 
-def globalContext(request):
+def staticContext():
+    """
+    Builds the part of the global context that does not depend on the request.
+    """
     baseUrl = (settings.BASE_URL if hasattr(settings, "BASE_URL") else "http://localhost:8000")
 
-    if("/event/" in request.path and len(request.path) > 43):
-        event_id = request.path.split("/")[2]
-        extend_navigation = True
-        try:
-            event = EventService.get_event(event_id)
-
-        except Exception as e:
-            is_admin = False
-            activities_enabled = False
-            hardware_enabled = False
-            warehouse_enabled = False
-            judging_enabled = False
-
-        if ParticipantService.is_user_admin(event, request.user):
-            is_admin = True
-            activities_enabled = event.activities_enabled
-            hardware_enabled = event.hardware_enabled
-            warehouse_enabled = event.warehouse_enabled
-            judging_enabled = event.judging_enabled
-        
-        else:
-            is_admin = False
-            activities_enabled = False
-            hardware_enabled = event.hardware_enabled
-            warehouse_enabled = False
-            judging_enabled = False
-    
-    else:
-        extend_navigation = False
-        is_admin = False
-        activities_enabled = False
-        hardware_enabled = False
-        warehouse_enabled = False
-        judging_enabled = False
-
     return {
         "baseUrl": baseUrl,
         "app_name": "Mybits2",
@@ -65,15 +33,66 @@ def globalContext(request):
         "logout": baseUrl + "/user/logout/",
         "register": baseUrl + "/user/register/",
         "password_reset": baseUrl + "/password/reset/",
-        "extend_navigation": extend_navigation,
-        "is_admin": is_admin,
-        "activities_enabled": activities_enabled,
-        "hardware_enabled": hardware_enabled,
-        "warehouse_enabled": warehouse_enabled,
-        "judging_enabled": judging_enabled,
+    }
+
+
+STATIC_CONTEXT = staticContext()
+
+NO_EVENT_CONTEXT = {
+    "extend_navigation": False,
+    "event_url": None,
+    "is_admin": False,
+    "activities_enabled": False,
+    "hardware_enabled": False,
+    "warehouse_enabled": False,
+    "judging_enabled": False,
+}
+
+
+def globalContext(request):
+    """
+    Adds the static context and the navigation flags of the current event. The
+    event is the event_id of the resolved URL, and each flag only queries the
+    database if the template reads it.
+    """
+    event_context = getattr(request, "event_context", None)
+
+    if event_context is None or event_context.event_id is None:
+        resolver_match = getattr(request, "resolver_match", None)
+        event_id = resolver_match.kwargs.get("event_id") if resolver_match else None
+
+        if event_id is None:
+            return {**STATIC_CONTEXT, **NO_EVENT_CONTEXT}
+
+        event_context = EventContext(request, str(event_id))
+
+    def admin_flag(field):
+        return SimpleLazyObject(
+            lambda: bool(
+                event_context.event
+                and event_context.is_admin
+                and getattr(event_context.event, field)
+            )
+        )
+
+    return {
+        **STATIC_CONTEXT,
+        "extend_navigation": True,
+        "event_url": f"/event/{event_context.event_id}",
+        "is_admin": SimpleLazyObject(
+            lambda: bool(event_context.event and event_context.is_admin)
+        ),
+        "activities_enabled": admin_flag("activities_enabled"),
+        "hardware_enabled": SimpleLazyObject(
+            lambda: bool(
+                event_context.event and event_context.event.hardware_enabled
+            )
+        ),
+        "warehouse_enabled": admin_flag("warehouse_enabled"),
+        "judging_enabled": admin_flag("judging_enabled"),
     }
 
 def path_length(request):
     return {
         'path_length': len(request.path) if request and request.path else 0
-    }
\ No newline at end of file
+    }
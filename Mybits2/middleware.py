@@ -0,0 +1,79 @@
+from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
+
+from Apps.event.services import EventService
+from Apps.participant.services import ParticipantService
+
+
+class EventContext:
+    """
+    This class resolves the event of a request, the participant of the user in it
+    and whether the user is an admin of it. Each value is looked up the first time
+    it is read and then reused for the rest of the request.
+    """
+
+    def __init__(self, request, event_id):
+        self.request = request
+        self.event_id = event_id
+
+    def get_event(self):
+        """
+        This method returns the event of the request. Like EventService.get_event,
+        it raises ValueError when the event does not exist.
+        """
+        if self.event is None:
+            raise ValueError("Event not found")
+
+        return self.event
+
+    @cached_property
+    def event(self):
+        if self.event_id is None:
+            return None
+
+        try:
+            return EventService.get_event(self.event_id)
+
+        except (ValueError, ValidationError):
+            return None
+
+    @cached_property
+    def registry(self):
+        if self.event_id is None or not self.request.user.is_authenticated:
+            return []
+
+        try:
+            return ParticipantService.get_user_registry(
+                self.event_id, self.request.user
+            )
+
+        except ValidationError:
+            return []
+
+    @cached_property
+    def participant(self):
+        return ParticipantService.get_registry_participant(self.registry)
+
+    @cached_property
+    def is_admin(self):
+        return ParticipantService.is_admin_in_registry(self.registry)
+
+
+class EventContextMiddleware:
+    """
+    This middleware attaches an EventContext to every request, for the event_id of
+    its URL, so views and context processors share the same lookups.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.event_context = EventContext(request, None)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        event_id = view_kwargs.get("event_id")
+
+        if event_id is not None:
+            request.event_context = EventContext(request, str(event_id))
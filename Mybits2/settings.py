@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,6 +33,7 @@ ALLOWED_HOSTS = ["127.0.0.1", "0.0.0.0", "13.60.187.1", "172.31.39.160", "localh
 # Application definition
 
 INSTALLED_APPS = [
+    "daphne",
     "Mybits2",
     "Apps",
     "Apps.users",
@@ -56,6 +58,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "Mybits2.middleware.EventContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -81,6 +84,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "Mybits2.wsgi.application"
 
+ASGI_APPLICATION = "Mybits2.asgi.application"
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -97,6 +102,37 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The local memory cache is per process, so it only works with a single process.
+# WEB_CONCURRENCY (also read by gunicorn) counts every process serving requests,
+# daphne included. Above 1 the default is the database cache, shared by all of them
+# and created with "manage.py createcachetable".
+
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", default=1, cast=int)
+
+CACHE_BACKEND = config(
+    "CACHE_BACKEND",
+    default=(
+        "django.core.cache.backends.db.DatabaseCache"
+        if WEB_CONCURRENCY > 1
+        else "django.core.cache.backends.locmem.LocMemCache"
+    ),
+)
+
+if WEB_CONCURRENCY > 1 and CACHE_BACKEND.endswith("LocMemCache"):
+    raise ImproperlyConfigured(
+        "LocMemCache is per process, use a shared CACHE_BACKEND with several workers"
+    )
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config("CACHE_LOCATION", default="mybits2_cache"),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,35 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+STREAM_BATCH_SIZE = 500
+
+
+def stream_content(request, content, batch_size=STREAM_BATCH_SIZE):
+    """
+    Returns the content of a StreamingHttpResponse for the server handling the
+    request. Under ASGI, Django reads a synchronous iterator to the end before
+    sending anything, so the content is wrapped in an asynchronous iterator there.
+    """
+    if isinstance(request, ASGIRequest):
+        return stream_batches(iter(content), batch_size)
+
+    return content
+
+
+async def stream_batches(iterator, batch_size):
+    """
+    Yields the chunks of a synchronous iterator joined in batches. Each batch is
+    read in the thread of the request, so database cursors opened by the iterator
+    keep using the same connection.
+    """
+    read_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+
+    while True:
+        batch = await read_batch()
+
+        if not batch:
+            return
+
+        yield "".join(batch)
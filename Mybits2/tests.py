@@ -1,5 +1,11 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from Apps.event.models import Event
+from Apps.participant.services import ParticipantService
 from Apps.users.models import CustomUser
+from Mybits2.contextProcessors import STATIC_CONTEXT, globalContext
+from Mybits2.middleware import EventContext
 
 
 class ViewMybitsTestCase(TestCase):
@@ -30,3 +36,61 @@ class ViewMybitsTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'home.html')
 
+
+    def test_event_context_middleware(self):
+        """
+        Test the event, participant and admin lookups are shared by the request.
+        """
+        event = Event.objects.create(
+            name="Context Event",
+            AppName="ContextApp",
+            description="Context event",
+            location="Barcelona",
+            timezone="UTC",
+            start_date="2023-10-01T09:00:00Z",
+            end_date="2023-10-02T18:00:00Z",
+            hacker_deadline="2023-09-25T23:59:59Z",
+            mentor_deadline="2023-09-26T23:59:59Z",
+            volunteer_deadline="2023-09-27T23:59:59Z",
+            sponsor_deadline="2023-09-28T23:59:59Z",
+            terms_and_conditions_link="https://example.com/terms",
+        )
+        ParticipantService.create_default_admin(event, self.user)
+        self.client.login(username=self.user.email, password='testpassword')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/event/{event.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.wsgi_request.event_context.is_admin)
+        tables = [query["sql"].split(" FROM ")[1].split()[0] for query in queries
+                  if query["sql"].startswith("SELECT")]
+        self.assertEqual(tables.count('"event_event"'), 1)
+        self.assertEqual(tables.count('"participant_participantregistry"'), 1)
+
+        response = self.client.get("/event/00000000-0000-0000-0000-000000000000/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_global_context(self):
+        """
+        Test the event flags of the global context are lazy and never crash.
+        """
+        request = RequestFactory().get("/event/")
+        request.user = self.user
+        context = globalContext(request)
+        self.assertFalse(context["extend_navigation"])
+        self.assertIs(context["app_name"], STATIC_CONTEXT["app_name"])
+
+        request.event_context = EventContext(
+            request, "00000000-0000-0000-0000-000000000000"
+        )
+
+        with self.assertNumQueries(0):
+            context = globalContext(request)
+
+        self.assertTrue(context["extend_navigation"])
+        self.assertEqual(
+            context["event_url"], "/event/00000000-0000-0000-0000-000000000000"
+        )
+        self.assertFalse(context["is_admin"])
+        self.assertFalse(context["hardware_enabled"])